@@ -1,4 +1,5 @@
 from beanie import Link
+from pymongo import IndexModel
 from pydantic import EmailStr, Field
 from app.core.models.base import BaseDocument
 from app.core.constants.choices import (
@@ -36,6 +37,9 @@ class UserModel(BaseDocument, PasswordMixin, UserModelMixin, FileHandlerMixin):
 
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel([("email", 1)], unique=True),
+        ]
 
     @property
     async def profile_image_url(self) -> str:
@@ -51,6 +55,9 @@ class UserWhitelistTokenModel(BaseDocument):
 
     class Settings:
         name = "user_whitelist_tokens"
+        indexes = [
+            [("access_token_fingerprint", 1), ("user.$id", 1)],
+        ]
 
 
 
@@ -63,7 +63,7 @@ async def list_voices(
     """
     try:
         voice_service = RetellVoiceService()
-        voices = voice_service.list_voices(language=language, gender=gender)
+        voices = await voice_service.list_voices(language=language, gender=gender)
         return {
             "status": True,
             "message": "Voices fetched successfully",
@@ -348,7 +348,7 @@ async def create_or_update_workflow(
         existing.raw_payload = raw_payload
         existing.states_normalized = retell_states
         existing.engine_id = engine_id
-        await existing.save()
+        await existing.save_delta()
         workflow = existing
         db_message = "Workflow updated successfully"
     else:
@@ -433,7 +433,7 @@ async def update_phone_number(
     try:
         # Assuming you have a RetellAgentService class initialized
         retell_service = RetellAgentService()
-        phone_number_response = retell_service.update_agent_inbound(
+        phone_number_response = await retell_service.update_agent_inbound(
             inbound_agent_id=agent.agent_id,
             phone_number=payload.phone_number,
             nickname=payload.nickname,
@@ -1,9 +1,8 @@
 from uuid import UUID
-from retell import Retell
 from typing import List, Dict, Any
 from pydantic import ValidationError
 from app.auth.models import UserModel
-from app.config.settings import settings
+from app.config.retell import retell_gateway
 from app.core.exceptions.base import NotFoundException, AppException
 from app.core.exceptions.handlers import handle_retell_error
 from ..models import AgentModel, ResponseEngineModel
@@ -22,10 +21,10 @@ from .schemas import (
 
 class RetellVoiceService:
     def __init__(self):
-        self.client = Retell(api_key=settings.retell_api_key)
+        self.client = retell_gateway.client
 
-    def list_voices(self, language: str | None = None, gender: str | None = None) -> List[VoiceResponse]:
-        data = self.client.voice.list() or []
+    async def list_voices(self, language: str | None = None, gender: str | None = None) -> List[VoiceResponse]:
+        data = await self.client.voice.list() or []
         valid_voices: List[VoiceResponse] = []
 
         for v in data:
@@ -47,12 +46,12 @@ class RetellVoiceService:
 
 class RetellAgentService:
     def __init__(self):
-        self.client = Retell(api_key=settings.retell_api_key)
+        self.client = retell_gateway.client
 
     async def create_response_engine(self, payload):
         """Create a Response Engine in Retell"""
         try:
-            return self.client.llm.create(
+            return await self.client.llm.create(
                 start_speaker=payload.start_speaker,
                 general_prompt=payload.general_prompt,
                 knowledge_base_ids=payload.knowledge_base_ids,
@@ -65,7 +64,7 @@ class RetellAgentService:
     async def create_agent(self, llm_id: str, payload):
         """Create an Agent linked to a Response Engine in Retell"""
         try:
-            return self.client.agent.create(
+            return await self.client.agent.create(
                 response_engine={"llm_id": llm_id, "type": "retell-llm"},
                 agent_name=payload.agent_name,
                 voice_id=payload.voice_id,
@@ -77,7 +76,7 @@ class RetellAgentService:
     async def update_response_engine(self, engine_id: str, payload, existing_engine):
         """Update Response Engine on Retell"""
         try:
-            return self.client.llm.update(
+            return await self.client.llm.update(
                 llm_id=engine_id,
                 start_speaker=payload.start_speaker or "user",
                 general_prompt=payload.general_prompt or existing_engine.general_prompt,
@@ -92,7 +91,7 @@ class RetellAgentService:
     async def update_agent(self, agent_id: str, payload, existing_agent):
         """Update Agent on Retell"""
         try:
-            return self.client.agent.update(
+            return await self.client.agent.update(
                 agent_id=agent_id,
                 agent_name=payload.agent_name or existing_agent.agent_name,
                 voice_id=payload.voice_id or existing_agent.voice_id,
@@ -104,27 +103,25 @@ class RetellAgentService:
     async def delete_agent(self, agent_id: str):
         """Delete Agent from Retell"""
         try:
-            return self.client.agent.delete(agent_id)
+            return await self.client.agent.delete(agent_id)
         except Exception as e:
             raise handle_retell_error(e)
 
     async def delete_response_engine(self, engine_id: str):
         """Delete Response Engine from Retell"""
         try:
-            return self.client.llm.delete(engine_id)
+            return await self.client.llm.delete(engine_id)
         except Exception as e:
             raise handle_retell_error(e)
 
     async def update_retell_llm(self, engine_id: str, states: List[Dict[str, Any]], starting_state: str):
         """
-        Update Retell LLM. Wrap blocking call if client is sync.
+        Update Retell LLM states.
         """
         payload_states = states  # already sanitized by mapper
 
         try:
-            # If client is synchronous, perform in threadpool to avoid blocking event loop
-            # assuming self.client.llm.update is sync
-            result = self.client.llm.update(
+            result = await self.client.llm.update(
                 llm_id=engine_id, 
                 states=payload_states, 
                 starting_state=starting_state
@@ -134,11 +131,11 @@ class RetellAgentService:
             # raise or wrap in custom exception
             raise RuntimeError(f"Retell update failed: {exc}")
 
-    def update_agent_inbound(self, inbound_agent_id: str, phone_number: str, nickname: str):
+    async def update_agent_inbound(self, inbound_agent_id: str, phone_number: str, nickname: str):
         """
         Calls Retell API to update agent's phone number
         """
-        return self.client.phone_number.update(
+        return await self.client.phone_number.update(
             phone_number=phone_number,
             nickname=nickname,
             inbound_agent_id=inbound_agent_id,
@@ -212,11 +209,9 @@ class AgentService:
             setattr(engine, key, value)
         
         try:
-            engine = ResponseEngineModel.model_validate(engine.model_dump())
+            await engine.save_delta()
         except ValidationError as e:
             raise AppException(f"Invalid data: {e.errors()}")
-        else:
-            await engine.save()
 
         return APIBaseResponse(
             status=True,
@@ -245,11 +240,9 @@ class AgentService:
             setattr(agent, key, value)
         
         try:
-            agent = AgentModel.model_validate(agent.model_dump())
+            await agent.save_delta()
         except ValidationError as e:
             raise AppException(f"Invalid data: {e.errors()}")
-        else:
-            await agent.save()
 
         return APIBaseResponse(
             status=True,
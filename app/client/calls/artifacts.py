@@ -0,0 +1,92 @@
+"""
+Transcript arrays of calls, stored compressed in CallArtifactsModel apart from CallModel.
+
+`load_call_artifacts` is used by the call detail view. `backfill_call_artifacts`
+moves the arrays out of calls stored before the split; it can be stopped
+and rerun at any point:
+
+    python -m app.client.calls.artifacts
+    python -m app.client.calls.artifacts --batch-size 200
+"""
+import uuid
+import asyncio
+import argparse
+from datetime import datetime
+from pymongo import UpdateOne
+from app.client.models import CallModel, CallArtifactsModel
+from app.core.utils.compression import compress_json, decompress_json
+from app.config.database import init_db
+from app.config.logger import get_logger
+
+logger = get_logger("Call Artifacts")
+
+FIELDS = CallArtifactsModel.FIELDS
+
+
+async def load_call_artifacts(call_id: str) -> dict:
+    projection = {field: 1 for field in FIELDS}
+    artifacts = await CallArtifactsModel.get_motor_collection().find_one({"call_id": call_id}, projection=projection)
+    if artifacts is None:
+        # Not backfilled yet: still on the call itself
+        artifacts = await CallModel.get_motor_collection().find_one({"call_id": call_id}, projection=projection)
+    return {field: decompress_json((artifacts or {}).get(field)) or [] for field in FIELDS}
+
+
+async def backfill_call_artifacts(batch_size: int = 500) -> int:
+    """
+    Copy the arrays of each call still holding them into its artifacts
+    document, then remove them from the call. An artifacts document the
+    webhooks already wrote is newer and is left as is. Returns the calls moved.
+    """
+    calls = CallModel.get_motor_collection()
+    artifacts = CallArtifactsModel.get_motor_collection()
+    projection = {"call_id": 1, **{field: 1 for field in FIELDS}}
+    legacy = {"$or": [{field: {"$exists": True}} for field in FIELDS]}
+
+    moved = 0
+    last_id = None
+    while True:
+        # Walk _id in order so each batch starts where the last one stopped
+        query = {**legacy, "_id": {"$gt": last_id}} if last_id else legacy
+        batch = await calls.find(query, projection=projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return moved
+
+        now = datetime.utcnow()
+        await artifacts.bulk_write([
+            UpdateOne(
+                {"call_id": call["call_id"]},
+                {"$setOnInsert": {
+                    "_id": uuid.uuid4(),
+                    "created_at": now,
+                    "updated_at": now,
+                    **{field: compress_json(call.get(field) or []) for field in FIELDS},
+                }},
+                upsert=True,
+            )
+            for call in batch
+        ], ordered=False)
+        await calls.update_many(
+            {"_id": {"$in": [call["_id"] for call in batch]}},
+            {"$unset": {field: "" for field in FIELDS}},
+        )
+
+        moved += len(batch)
+        last_id = batch[-1]["_id"]
+        logger.info(f"Moved transcript arrays of {moved} calls")
+
+
+async def main(args):
+    await init_db()
+    moved = await backfill_call_artifacts(args.batch_size)
+    print(f"Moved transcript arrays of {moved} calls")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
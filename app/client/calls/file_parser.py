@@ -0,0 +1,285 @@
+"""
+Parsing of call spreadsheets for /calls/parse-file, run in the CPU pool.
+
+Every column is read as text, its type is inferred once from a sample of its
+values, and the whole column is converted in one vectorized step. Values
+that do not fit the inferred type are passed through unchanged, so phone
+numbers and zero-padded IDs are never rewritten as numbers or dates.
+
+Results go back to the API process as one NumPy string array per column,
+which pickles far smaller than a dict per row. `preview_call_file` reads
+only the first rows, and `spool_call_file` writes the sheet chunk by chunk
+as NDJSON for the streaming mode, so neither holds the whole sheet.
+"""
+import os
+import xlrd
+import msgspec
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from pathlib import Path
+from datetime import datetime
+from openpyxl import load_workbook
+from app.core.constants.choices import FileColumnTypeChoices
+from app.core.exceptions.base import AppException
+from app.client.campaign.readers import (
+    iter_csv_chunks,
+    iter_xlsx_chunks,
+    iter_xls_chunks,
+)
+
+SAMPLE_SIZE = 200  # non-empty values inspected per column
+MATCH_THRESHOLD = 0.9  # share of the sample that must fit a type
+
+INTEGER_PATTERN = r"[+-]?(?:0|[1-9]\d*)"
+FLOAT_PATTERN = r"[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?"
+PHONE_PATTERN = r"\+?[\d\s().\-]{7,20}"
+DATE_SHAPE_PATTERN = r".*(?:\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}|[A-Za-z]{3,}.*\d|\d.*[A-Za-z]{3,}).*"
+STOP_FILE = "stop"  # created by the API process when the client goes away
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%y",
+    "%Y/%m/%d",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+]
+
+
+def parse_call_file(contents: bytes, file_ext: str) -> dict[str, np.ndarray]:
+    """Read the file and normalize every column to strings."""
+    df = read_call_file(BytesIO(contents), file_ext)
+    types = infer_column_types(df)
+    return {column: normalize_column(df[column], types[column]) for column in df.columns}
+
+
+def read_call_file(source, file_ext: str, nrows: int | None = None) -> pd.DataFrame:
+    # Read as text (spreadsheet cells keep their native types) so nothing is coerced before inference
+    if file_ext == "csv":
+        df = pd.read_csv(source, dtype=str, keep_default_na=False, nrows=nrows)
+    elif file_ext in ["xls", "xlsx"]:
+        df = pd.read_excel(source, dtype=object, nrows=nrows)
+    else:
+        raise AppException("Invalid file type. Only CSV or Excel supported.")
+    return _clean_columns(df)
+
+
+def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = (
+        df.columns.astype(str).str.strip()
+        .str.lower()
+        .str.replace(" ", "_")
+    )
+    return df
+
+
+def preview_call_file(path: str, file_ext: str, rows: int) -> dict:
+    """Inferred column types and the first `rows` rows, with an estimate of the total row count."""
+    df = read_call_file(path, file_ext, nrows=rows)
+    types = infer_column_types(df)
+    columns = {column: normalize_column(df[column], types[column]) for column in df.columns}
+
+    if len(df) < rows:
+        total, exact = len(df), True
+    else:
+        total, exact = estimate_row_count(path, file_ext, rows), False
+    return {
+        "columns": [{"name": column, "type": types[column]} for column in df.columns],
+        "rows": columns_to_records(columns),
+        "estimated_total_rows": total,
+        "is_exact": exact,
+    }
+
+
+def estimate_row_count(path: str, file_ext: str, sampled_rows: int) -> int | None:
+    """
+    Data rows in the file without reading it: CSV extrapolates from the size
+    of the sampled rows, spreadsheets report their recorded sheet dimensions.
+    """
+    if file_ext == "csv":
+        with open(path, "rb") as file:
+            header = len(file.readline())
+            sampled = sum(len(file.readline()) for _ in range(sampled_rows))
+        if not sampled:
+            return 0
+        return round((os.path.getsize(path) - header) / (sampled / sampled_rows))
+    if file_ext == "xlsx":
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.worksheets[0].max_row
+        finally:
+            workbook.close()
+        return max_row - 1 if max_row else None
+    if file_ext == "xls":
+        book = xlrd.open_workbook(path, on_demand=True)
+        try:
+            return book.sheet_by_index(0).nrows - 1
+        finally:
+            book.release_resources()
+    return None
+
+
+def spool_chunk_path(spool_dir: str | Path, index: int) -> Path:
+    return Path(spool_dir) / f"{index:06d}.ndjson"
+
+
+def spool_call_file(path: str, file_ext: str, chunk_rows: int, spool_dir: str) -> int:
+    """
+    Parse the file into NDJSON chunks in `spool_dir`, one object per row.
+    Column types are inferred from the first chunk and kept for the rest,
+    so a column is formatted the same way throughout. Chunks are written
+    without waiting for the reader, so a slow client never holds the pool
+    worker; they are read back from disk. Returns the number of chunks.
+    """
+    readers = {"csv": iter_csv_chunks, "xlsx": iter_xlsx_chunks, "xls": iter_xls_chunks}
+    if file_ext not in readers:
+        raise AppException("Invalid file type. Only CSV or Excel supported.")
+    encoder = msgspec.json.Encoder()
+    spool = Path(spool_dir)
+    stop = spool / STOP_FILE
+
+    types = None
+    index = -1
+    with open(path, "rb") as file:
+        chunks = readers[file_ext](file, chunk_rows)
+        try:
+            for index, chunk in enumerate(chunks):
+                df = _clean_columns(chunk)
+                if types is None:
+                    types = infer_column_types(df)
+                records = columns_to_records(
+                    {column: normalize_column(df[column], types[column]) for column in df.columns}
+                )
+                if stop.exists():
+                    break
+
+                temporary = spool / f"{index:06d}.tmp"
+                temporary.write_bytes(b"".join(encoder.encode(record) + b"\n" for record in records))
+                os.replace(temporary, spool_chunk_path(spool, index))
+        finally:
+            chunks.close()
+    return index + 1
+
+
+def columns_to_records(columns: dict[str, np.ndarray]) -> list[dict]:
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*(columns[name].tolist() for name in names))]
+
+
+def infer_column_types(df: pd.DataFrame) -> dict[str, FileColumnTypeChoices]:
+    return {column: infer_column_type(df[column]) for column in df.columns}
+
+
+def infer_column_type(values: pd.Series) -> FileColumnTypeChoices:
+    """Type of the column, decided from a sample of its non-empty values."""
+    sample = values[values.notna()].head(SAMPLE_SIZE * 2)
+    text = _as_text(sample)
+    sample, text = sample[text != ""].head(SAMPLE_SIZE), text[text != ""].head(SAMPLE_SIZE)
+    if text.empty:
+        return FileColumnTypeChoices.TEXT
+
+    def share(matches: pd.Series) -> float:
+        return matches.mean()
+
+    if share(sample.map(lambda value: isinstance(value, datetime))) >= MATCH_THRESHOLD:
+        return FileColumnTypeChoices.DATE
+    if share(text.str.fullmatch(INTEGER_PATTERN)) >= MATCH_THRESHOLD and not _looks_like_phone(text):
+        return FileColumnTypeChoices.INTEGER
+    if share(text.str.fullmatch(DATE_SHAPE_PATTERN)) >= MATCH_THRESHOLD and _date_format(text):
+        return FileColumnTypeChoices.DATE
+    if share(text.str.fullmatch(PHONE_PATTERN) & _phone_digits(text)) >= MATCH_THRESHOLD:
+        return FileColumnTypeChoices.PHONE
+    if share(text.str.fullmatch(FLOAT_PATTERN)) >= MATCH_THRESHOLD:
+        return FileColumnTypeChoices.FLOAT
+    return FileColumnTypeChoices.TEXT
+
+
+def normalize_column(values: pd.Series, column_type: FileColumnTypeChoices) -> np.ndarray:
+    """Convert a whole column to strings; values that do not fit the type are kept as text."""
+    text = _as_text(values)
+    if column_type == FileColumnTypeChoices.DATE:
+        result = _format_dates(values, text)
+    elif column_type in (FileColumnTypeChoices.INTEGER, FileColumnTypeChoices.FLOAT):
+        result = _format_numbers(values, text)
+    else:
+        result = text
+    return np.array(result.tolist(), dtype=str)
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        # Spreadsheet cells: whole floats lose the ".0", timestamps use their ISO form
+        values = values.map(_cell_text)
+    return values.fillna("").astype(str).str.strip()
+
+
+def _cell_text(value) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _phone_digits(text: pd.Series) -> pd.Series:
+    digits = text.str.count(r"\d")
+    return (digits >= 7) & (digits <= 15)
+
+
+def _looks_like_phone(text: pd.Series) -> bool:
+    # Leading "+" or zero, or ten or more digits: an identifier, not a quantity
+    long_or_padded = text.str.match(r"^\+|^0\d") | (text.str.count(r"\d") >= 10)
+    return long_or_padded.mean() >= MATCH_THRESHOLD
+
+
+def _date_format(text: pd.Series) -> str | None:
+    """First known format that parses the sample; "mixed" if only the generic parser can."""
+    for date_format in DATE_FORMATS:
+        if pd.to_datetime(text, format=date_format, errors="coerce").notna().mean() >= MATCH_THRESHOLD:
+            return date_format
+    if pd.to_datetime(text, format="mixed", errors="coerce").notna().mean() >= MATCH_THRESHOLD:
+        return "mixed"
+    return None
+
+
+def _format_dates(values: pd.Series, text: pd.Series) -> pd.Series:
+    native = values.map(lambda value: isinstance(value, datetime))
+    result = text.copy()
+
+    # Spreadsheet date cells: "1st Oct, 2025"
+    if native.any():
+        dates = pd.to_datetime(values[native], errors="coerce")
+        day = dates.dt.day
+        suffix = np.select(
+            [day.between(11, 13), day % 10 == 1, day % 10 == 2, day % 10 == 3],
+            ["th", "st", "nd", "rd"],
+            default="th",
+        )
+        result[native] = (day.astype("Int64").astype(str) + suffix + " " + dates.dt.strftime("%b, %Y")).fillna("")
+
+    # Dates written as text: "Oct 01, 2025"
+    written = ~native & (text != "")
+    if written.any():
+        date_format = _date_format(text[written].head(SAMPLE_SIZE)) or "mixed"
+        dates = pd.to_datetime(text[written], format=date_format, errors="coerce")
+        parsed = dates.notna()
+        result[parsed[parsed].index] = dates[parsed].dt.strftime("%b %d, %Y")
+    return result
+
+
+def _format_numbers(values: pd.Series, text: pd.Series) -> pd.Series:
+    numbers = pd.to_numeric(text.where(text.str.fullmatch(FLOAT_PATTERN)), errors="coerce")
+    parsed = numbers.notna()
+    whole = parsed & (numbers % 1 == 0) & (numbers.abs() < 2 ** 53)
+
+    result = text.copy()
+    result[whole] = numbers[whole].astype("int64").astype(str)
+    fractional = parsed & ~whole
+    result[fractional] = numbers[fractional].astype(str)
+    return result
@@ -1,26 +1,33 @@
-from math import ceil
 from uuid import UUID
+from typing import Optional
 from decimal import Decimal
 from fastapi import (
     APIRouter, 
     status, 
+    Request,
     UploadFile,
     Query,
     File,
     Depends, 
 )
-from beanie.operators import RegEx
+from fastapi.responses import StreamingResponse
 from app.core.exceptions.base import (
     AppException,
+    NotFoundException,
+)
+from app.core.constants.choices import (
+    ParseFileModeChoices,
 )
 from app.core.dependencies.authorization import (
-    ProfileActive
+    ProfileActive,
+    SuperAdmin,
 )
 from app.auth.models import (
     UserModel
 )
 from ..models import (
     CallModel,
+    CallListView,
 )
 from .schemas import (
     APIBaseResponse,
@@ -31,12 +38,41 @@ from .schemas import (
     CampaignContactCallInitializeSchema,
     CallDisplayInfoResponseSchema,
     CallFullResponseSchema,
+    CallDashboardResponse,
+    CallBreakdownSchema,
+    CallCostSummarySchema,
+    FacetBucketSchema,
 )
 from .services import (
     RetellCallService,
     CallFileService,
     RetellWebhookService,
 )
+from .webhook_queue import (
+    retell_webhook_queue,
+)
+from .artifacts import (
+    load_call_artifacts,
+)
+from .webhook_decoder import (
+    decode_webhook,
+)
+from app.core.redis_utils.webhook_dedup.helpers import (
+    payload_digest,
+    claim_webhook,
+    release_webhook,
+    get_dedup_stats,
+)
+from app.core.utils.helpers import (
+    format_seconds_duration,
+    convert_decimal128_to_decimal,
+    convert_cents_to_usd,
+)
+from app.core.utils.pagination import paginate, paginate_with_facets
+from app.core.utils.search import search_condition
+from app.client.counters import read_counter, CALLS
+from app.config.settings import settings
+from app.config.process_pool import cpu_pool
 from app.config.logger import get_logger
 
 
@@ -50,10 +86,28 @@ calls_router = APIRouter()
     response_model=APIBaseResponse,
     status_code=status.HTTP_200_OK,
 )
-async def parse_file(file: UploadFile = File(...)):
+async def parse_file(
+    user: UserModel = Depends(ProfileActive()),
+    file: UploadFile = File(...),
+    mode: ParseFileModeChoices = Query(ParseFileModeChoices.FULL),
+    preview_rows: int = Query(settings.PARSE_FILE_PREVIEW_ROWS, ge=1, le=settings.PARSE_FILE_PREVIEW_MAX_ROWS),
+):
     """
     Upload Excel or CSV file → Get array of key-value objects
+    - preview: column types, the first `preview_rows` rows and an estimated row count
+    - stream: every row as NDJSON (one object per line)
     """
+    if mode == ParseFileModeChoices.PREVIEW:
+        preview = await CallFileService.preview_uploaded_file(file, preview_rows)
+        return APIBaseResponse(
+            status=True,
+            message="File preview parsed successfully",
+            data=preview
+        )
+    if mode == ParseFileModeChoices.STREAM:
+        rows = await CallFileService.stream_uploaded_file(file)
+        return StreamingResponse(rows, media_type="application/x-ndjson")
+
     records = await CallFileService.parse_uploaded_file(file)
     return APIBaseResponse(
         status=True,
@@ -62,6 +116,24 @@ async def parse_file(file: UploadFile = File(...)):
     )
 
 
+@calls_router.get(
+    "/parse-file/pool-stats",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def parse_pool_stats(
+    user: UserModel = Depends(ProfileActive()),
+):
+    """
+    Process pool running file parsing: queue depth, rejections and timings.
+    """
+    return APIBaseResponse(
+        status=True,
+        message="Parse pool stats retrieved successfully",
+        data=cpu_pool.stats(),
+    )
+
+
 
 @calls_router.post(
     "/initialize-call",
@@ -116,17 +188,76 @@ async def initialize_call_by_campaign_contact(
 
 # {{BASE_URL}}/api/clientside/calls/retell/webhook
 @calls_router.post("/retell/webhook")
-async def retell_webhook(payload: dict):
+async def retell_webhook(request: Request):
     """
     Handles Retell call lifecycle webhooks.
+    Exact repeats of an event are acknowledged without touching the database.
+    In "queue" mode the raw event is stored and acknowledged immediately.
     """
+    body = await request.body()
     try:
-        service = RetellWebhookService()
-        return await service.handle_event(payload)
+        payload = decode_webhook(body)
+        event = payload.event
+        call_id = payload.call.call_id
+
+        digest = payload_digest(body)
+        if not await claim_webhook(call_id, event, digest, len(body)):
+            logger.info(f"Duplicate webhook ignored (call_id={call_id}, event={event})")
+            return {"success": True, "message": "Duplicate event ignored"}
+
+        try:
+            if settings.RETELL_WEBHOOK_MODE == "queue":
+                await retell_webhook_queue.enqueue(body, call_id=call_id, event=event)
+                return {"success": True, "message": "Event queued"}
+
+            service = RetellWebhookService()
+            return await service.handle_event(payload)
+        except Exception:
+            # Let Retell's retry of a failed delivery through
+            await release_webhook(call_id, event, digest)
+            raise
     except Exception as e:
         raise AppException(str(e))
 
 
+@calls_router.get(
+    "/retell/webhook/dedup-stats",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def webhook_dedup_stats(
+    user: UserModel = Depends(SuperAdmin()),
+):
+    """
+    Duplicate webhook hit/miss counters and payload bytes skipped.
+    """
+    stats = await get_dedup_stats()
+    return APIBaseResponse(
+        status=True,
+        message="Webhook dedup stats retrieved successfully",
+        data=stats,
+    )
+
+
+@calls_router.post(
+    "/retell/webhook/requeue-dead-letters",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def requeue_dead_letter_webhooks(
+    user: UserModel = Depends(SuperAdmin()),
+):
+    """
+    Move webhook events that exhausted their retries back into the queue.
+    """
+    requeued = await retell_webhook_queue.requeue_dead_letters()
+    return APIBaseResponse(
+        status=True,
+        message="Dead letter webhooks requeued",
+        data={"requeued": requeued},
+    )
+
+
 
 @calls_router.get(
     "/list",
@@ -138,8 +269,104 @@ async def retrieve_my_calls(
     filters: CallFilterParams = Depends(),
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(True, description="false skips counting total_records"),
 ):
-    skip = (page - 1) * page_size
+    filter_conditions = _call_filter_conditions(user, filters)
+
+    # Unfiltered, the total is the user's call counter
+    total_records = None
+    if include_total and not filters.model_dump(exclude_none=True):
+        total_records = await read_counter(user.id, CALLS)
+
+    all_calls, meta = await paginate(
+        CallModel,
+        filter_conditions,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        projection_model=CallListView,
+        total_records=total_records,
+    )
+
+    serialized_calls = [
+        CallDisplayInfoResponseSchema.model_validate(call) for call in all_calls
+    ]
+
+    return PaginaionResponse(
+        status=True,
+        message="All calls retrieved successfully",
+        meta = PaginationMeta(**meta),
+        data= serialized_calls
+    )
+
+
+@calls_router.get(
+    "/dashboard",
+    response_model=CallDashboardResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Calls page with breakdowns and cost summary in one query",
+)
+async def retrieve_calls_dashboard(
+    user: UserModel = Depends(ProfileActive()),
+    filters: CallFilterParams = Depends(),
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+):
+    """
+    The /calls/list page together with the counts per call_status, direction,
+    user_sentiment and call_successful and the cost summary, all over the same
+    filters, from one aggregation instead of a query per panel.
+    """
+    facets = {
+        field: [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+        ]
+        for field in CallBreakdownSchema.model_fields
+    }
+    facets["summary"] = [{"$group": {
+        "_id": None,
+        "total_cents": {"$sum": "$combined_cost"},
+        "total_duration_seconds": {"$sum": "$total_duration"},
+    }}]
+
+    all_calls, meta, results = await paginate_with_facets(
+        CallModel,
+        _call_filter_conditions(user, filters),
+        facets,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        projection_model=CallListView,
+    )
+
+    breakdown = CallBreakdownSchema(**{
+        field: [FacetBucketSchema(value=bucket["_id"], count=bucket["count"]) for bucket in results[field]]
+        for field in CallBreakdownSchema.model_fields
+    })
+    summary = results["summary"][0] if results["summary"] else {}
+    total_cents = convert_decimal128_to_decimal(summary.get("total_cents"))
+    total_duration_seconds = summary.get("total_duration_seconds") or 0
+
+    return CallDashboardResponse(
+        status=True,
+        message="Calls dashboard retrieved successfully",
+        meta=PaginationMeta(**meta),
+        data=[CallDisplayInfoResponseSchema.model_validate(call) for call in all_calls],
+        breakdown=breakdown,
+        summary=CallCostSummarySchema(
+            total_duration_seconds=total_duration_seconds,
+            formatted_durations=format_seconds_duration(total_duration_seconds),
+            total_cost_usd=convert_cents_to_usd(total_cents),
+            total_cost_cents=total_cents,
+        ),
+    )
+
+
+def _call_filter_conditions(user: UserModel, filters: CallFilterParams) -> list:
     filter_conditions = [
         CallModel.user.id == user.id
     ]
@@ -151,55 +378,24 @@ async def retrieve_my_calls(
     if filters.campaign_contact_id:
         filter_conditions.append(CallModel.campaign_contact.id == filters.campaign_contact_id)
     if filters.agent_name:
-        filter_conditions.append(RegEx(CallModel.agent_name, f".*{filters.agent_name}.*", options="i"))
+        filter_conditions.append(search_condition(CallModel, "agent_name", filters.agent_name))
     if filters.direction:
         filter_conditions.append(CallModel.direction == filters.direction)
     if filters.call_status:
         filter_conditions.append(CallModel.call_status == filters.call_status)
     if filters.to_number:
-        filter_conditions.append(RegEx(CallModel.to_number, f".*{filters.to_number}.*", options="i"))
+        filter_conditions.append(search_condition(CallModel, "to_number", filters.to_number))
     if filters.from_number:
-        filter_conditions.append(RegEx(CallModel.from_number, f".*{filters.from_number}.*", options="i"))
+        filter_conditions.append(search_condition(CallModel, "from_number", filters.from_number))
     if filters.user_sentiment:
         filter_conditions.append(CallModel.user_sentiment == filters.user_sentiment)
     if filters.call_successful is not None:
         filter_conditions.append(CallModel.call_successful == filters.call_successful)
-
-    total_records = await CallModel.find(CallModel.user.id == user.id).count()
-
-    all_calls = (
-        await CallModel.find(
-            *filter_conditions
-        )
-        .sort(-CallModel.created_at)
-        .skip(skip)
-        .limit(page_size)
-        .to_list()
-    )
-
-    serialized_calls = [
-        CallDisplayInfoResponseSchema.model_validate(call) for call in all_calls
-    ]
-
-
-    # Calculate pagination flags
-    total_pages = ceil(total_records / page_size)
-    is_next = page < total_pages
-    is_previous = page > 1
-
-    return PaginaionResponse(
-        status=True,
-        message="All calls retrieved successfully",
-        meta = PaginationMeta(
-            page_size = page_size,
-            page = page,
-            total_records = total_records,
-            total_pages = total_pages,
-            is_next = is_next,
-            is_previous = is_previous,
-        ),
-        data= serialized_calls
-    )
+    if filters.start_timestamp_from:
+        filter_conditions.append(CallModel.start_timestamp >= filters.start_timestamp_from)
+    if filters.start_timestamp_to:
+        filter_conditions.append(CallModel.start_timestamp <= filters.start_timestamp_to)
+    return filter_conditions
 
 
 @calls_router.get(
@@ -209,15 +405,20 @@ async def retrieve_my_calls(
 )
 async def retrieve_my_calls(
     user: UserModel = Depends(ProfileActive()),
-    call_uuid : UUID = Query(..., description="call uuid")
+    call_uuid : UUID = Query(..., description="call uuid"),
+    include_artifacts: bool = Query(True, description="false leaves out the transcript arrays"),
 ):
     call = await CallModel.find_one(
         CallModel.id == call_uuid,
         CallModel.user.id == user.id,
         fetch_links=True 
     )
+    if not call:
+        raise NotFoundException("Call not found")
 
     serialized_calls = CallFullResponseSchema.model_validate(call)
+    if include_artifacts:
+        serialized_calls = serialized_calls.model_copy(update=await load_call_artifacts(call.call_id))
 
     return APIBaseResponse(
         status=True,
@@ -271,7 +472,7 @@ async def sync_call_fields():
                 call.combined_cost = combined_cost
                 call.total_duration = total_duration
                 call.total_duration_unit_price = total_duration_unit_price
-                await call.save()
+                await call.save_delta()
                 updated_count += 1
             else:
                 skipped_count += 1
@@ -35,11 +35,12 @@ class APIBaseResponse(BaseModel):
 
 class PaginationMeta(BaseModel):
     page_size: int
-    page: int
-    total_records: int
-    total_pages: int
+    page: Optional[int] = None  # None in cursor mode
+    total_records: Optional[int] = None  # None when include_total=false
+    total_pages: Optional[int] = None
     is_next: bool
     is_previous: bool
+    next_cursor: Optional[str] = None
 
 class PaginaionResponse(BaseModel):
     status: bool
@@ -125,6 +126,8 @@ class CallFilterParams(BaseModel):
     from_number: Optional[str] = None
     user_sentiment: Optional[UserSentimentChoices] = None
     call_successful : Optional[bool] = None
+    start_timestamp_from: Optional[datetime] = None
+    start_timestamp_to: Optional[datetime] = None
 
 
 class CallDisplayInfoResponseSchema(CallBaseResponseSchema):
@@ -141,6 +144,30 @@ class CallDisplayInfoResponseSchema(CallBaseResponseSchema):
     disconnection_reason: Optional[str]
 
 
+class FacetBucketSchema(BaseModel):
+    value: Any = None
+    count: int
+
+
+class CallBreakdownSchema(BaseModel):
+    call_status: List[FacetBucketSchema] = Field(default_factory=list)
+    direction: List[FacetBucketSchema] = Field(default_factory=list)
+    user_sentiment: List[FacetBucketSchema] = Field(default_factory=list)
+    call_successful: List[FacetBucketSchema] = Field(default_factory=list)
+
+
+class CallCostSummarySchema(BaseModel):
+    total_duration_seconds: int = 0
+    formatted_durations: str
+    total_cost_usd: Decimal
+    total_cost_cents: Decimal
+
+
+class CallDashboardResponse(PaginaionResponse):
+    breakdown: CallBreakdownSchema
+    summary: CallCostSummarySchema
+
+
 class CallFullResponseSchema(CallBaseResponseSchema):
     id: UUID
     call_id: str
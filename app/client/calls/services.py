@@ -1,37 +1,76 @@
+import os
 import json
-import numpy as np
-import pandas as pd
-from io import BytesIO
-from dateutil import parser
+import uuid
+import shutil
+import asyncio
+import hashlib
+import tempfile
+import msgspec
+from pathlib import Path
+from typing import AsyncIterator
+from enum import Enum
 from datetime import datetime
 from decimal import Decimal
-from retell import Retell
+from bson import DBRef, Decimal128
+from pydantic import TypeAdapter
 from retell import APIError
+from pymongo import UpdateOne
 from fastapi import UploadFile
+from app.config.retell import retell_gateway
 from app.config.settings import settings
+from app.config.process_pool import cpu_pool
+from .file_parser import (
+    STOP_FILE,
+    parse_call_file,
+    preview_call_file,
+    spool_call_file,
+    spool_chunk_path,
+    columns_to_records,
+)
+from .webhook_decoder import (
+    RetellWebhookPayload,
+    RetellCallPayload,
+    decode_raw,
+    format_payload,
+)
 from app.client.models import (
     CallModel, 
+    CallArtifactsModel,
     AgentModel,
+    AgentSummaryView,
+    CampaignModel,
+    CampaignAgentView,
     CampaignContactsModel
 )
 from app.auth.models import (
     UserModel
 )
+from app.core.constants.choices import (
+    CallStatusChoices,
+    ContactDialStatusChoices,
+)
 from app.core.exceptions.base import (
     AppException, 
     InternalServerErrorException,
     NotFoundException,
     ForbiddenException,
+    ToManyRequestExeption,
 )
 from app.core.utils.helpers import (
     parse_timestamp,
-    get_day_with_suffix,
     handle_retell_exception
 )
+from app.core.utils.compression import compress_json
+from app.core.utils.link_loader import LinkLoader
+from app.core.utils.search import search_keys
+from app.client.counters import increment_counter, CALLS
 from app.config.logger import get_logger
 
 logger = get_logger("Retell Call Service")
 
+# Call metadata naming the campaign contact, so webhooks can find it before the call id is stored
+CAMPAIGN_CONTACT_METADATA_KEY = "campaign_contact_id"
+
 
 
 class CallFileService:
@@ -45,78 +84,108 @@ class CallFileService:
             contents = await file.read()
             file_ext = file.filename.split(".")[-1].lower()
 
-            # Read file using pandas
-            if file_ext == "csv":
-                df = pd.read_csv(BytesIO(contents))
-            elif file_ext in ["xls", "xlsx"]:
-                df = pd.read_excel(BytesIO(contents))
-            else:
-                raise AppException("Invalid file type. Only CSV or Excel supported.")
+            # Parsing is CPU-bound; it runs in the process pool and comes back column-wise
+            columns = await cpu_pool.run(parse_call_file, contents, file_ext)
+            return columns_to_records(columns)
 
-            # Clean column names
-            df.columns = (
-                df.columns.str.strip()
-                .str.lower()
-                .str.replace(" ", "_")
-            )
-
-            # Replace NaN with empty string
-            df = df.replace({np.nan: ""})
-
-            # Convert DataFrame to list of dicts
-            records = df.astype(object).to_dict(orient="records")
-
-            # Clean and normalize values
-            for record in records:
-                for k, v in record.items():
-
-                    # Handle pandas datetime safely
-                    if isinstance(v, (datetime, pd.Timestamp)):
-                        if pd.isna(v):  # skip NaT
-                            record[k] = ""
-                        else:
-                            day = get_day_with_suffix(v.day)
-                            record[k] = f"{day} {v.strftime('%b, %Y')}"  # 1st Oct, 2025
-                        continue
-
-                    # Handle int
-                    if isinstance(v, (np.integer, int)):
-                        record[k] = str(int(v))
-                        continue
-
-                    # Handle float
-                    if isinstance(v, (np.floating, float)):
-                        record[k] = str(int(v)) if str(v).endswith(".0") else str(v)
-                        continue
-
-                    # Handle string
-                    if isinstance(v, str):
-                        val = v.strip()
-                        if val:
-                            try:
-                                parsed = parser.parse(val, fuzzy=True, dayfirst=False)
-                                record[k] = parsed.strftime("%b %d, %Y")
-                            except Exception:
-                                record[k] = val
-                        else:
-                            record[k] = ""
-                        continue
-
-                    # Handle NaN or None
-                    if pd.isna(v):
-                        record[k] = ""
-
-            return records
+        except ToManyRequestExeption:
+            raise
+        except Exception as e:
+            raise InternalServerErrorException(f"File parse failed: {str(e)}")
 
+    @staticmethod
+    async def preview_uploaded_file(file: UploadFile, rows: int) -> dict:
+        """
+        Column types, the first `rows` rows and an estimated row count;
+        only those rows are parsed, however long the file is.
+        """
+        path = await CallFileService._save_upload(file)
+        try:
+            return await cpu_pool.run(preview_call_file, path, CallFileService._file_ext(file), rows)
+        except AppException:
+            raise
         except Exception as e:
             raise InternalServerErrorException(f"File parse failed: {str(e)}")
+        finally:
+            os.unlink(path)
+
+    @staticmethod
+    async def stream_uploaded_file(file: UploadFile) -> AsyncIterator[bytes]:
+        """
+        Every row as NDJSON. The pool parses and encodes the file chunk by
+        chunk into a spool directory and is released once the file is done,
+        however slowly the client reads; the response streams the chunks from
+        disk as they land, so memory stays bounded. Waits for the first chunk
+        so that parse errors are raised before the response starts.
+        """
+        path = await CallFileService._save_upload(file)
+        spool_dir = tempfile.mkdtemp(prefix="parse_file_")
+        parsing = asyncio.ensure_future(cpu_pool.run(
+            spool_call_file, path, CallFileService._file_ext(file), settings.PARSE_FILE_STREAM_CHUNK_ROWS, spool_dir,
+        ))
+
+        async def cleanup():
+            Path(spool_dir, STOP_FILE).touch()
+            await asyncio.gather(parsing, return_exceptions=True)
+            shutil.rmtree(spool_dir, ignore_errors=True)
+            os.unlink(path)
+
+        chunks = CallFileService._spooled_chunks(parsing, spool_dir)
+        try:
+            first = await anext(chunks, b"")
+        except BaseException as e:
+            await cleanup()
+            if isinstance(e, AppException) or not isinstance(e, Exception):
+                raise
+            raise InternalServerErrorException(f"File parse failed: {str(e)}")
+
+        async def body():
+            try:
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await cleanup()
+
+        return body()
+
+    @staticmethod
+    async def _spooled_chunks(parsing: asyncio.Future, spool_dir: str) -> AsyncIterator[bytes]:
+        index = 0
+        while True:
+            chunk_path = spool_chunk_path(spool_dir, index)
+            if chunk_path.exists():
+                chunk = chunk_path.read_bytes()
+                chunk_path.unlink()
+                yield chunk
+                index += 1
+            elif parsing.done():
+                if index >= parsing.result():  # re-raises parse errors
+                    return
+            else:
+                await asyncio.wait({parsing}, timeout=0.05)
+
+    @staticmethod
+    async def _save_upload(file: UploadFile) -> str:
+        """Copy the upload to a temporary file the pool can open; the caller deletes it."""
+        def copy() -> str:
+            with tempfile.NamedTemporaryFile(suffix=Path(file.filename).suffix, delete=False) as target:
+                file.file.seek(0)
+                shutil.copyfileobj(file.file, target, length=1024 * 1024)
+                return target.name
+
+        return await asyncio.to_thread(copy)
+
+    @staticmethod
+    def _file_ext(file: UploadFile) -> str:
+        return file.filename.split(".")[-1].lower()
 
 
 
 
 class RetellCallService:
     def __init__(self):
-        self.client = Retell(api_key=settings.retell_api_key)
+        self.client = retell_gateway.client
 
     async def create_phone_call(self, *, user: UserModel, payload: dict) -> CallModel:
         """
@@ -125,7 +194,7 @@ class RetellCallService:
         logger.info("Creating Retell phone call...")
 
         try:
-            response = self.client.call.create_phone_call(
+            response = await self.client.call.create_phone_call(
                 from_number=payload["from_number"],
                 to_number=payload["to_number"],
                 override_agent_id=payload.get("override_agent_id"),
@@ -135,13 +204,17 @@ class RetellCallService:
             # logger.debug(f"Retell response: {json.dumps(response, indent=2)}")
 
             # --- Extract agent details
-            agent_id = response.agent_id
-            agent = await AgentModel.find_one(AgentModel.agent_id == agent_id)
+            agent = await AgentModel.find_one(
+                AgentModel.agent_id == response.agent_id,
+                projection_model=AgentSummaryView,
+            )
+            if not agent:
+                raise NotFoundException("Agent not found")
 
             # --- Create CallModel entry
             new_call = CallModel(
                 user=user,
-                agent=agent,
+                agent=DBRef(AgentModel.Settings.name, agent.id),
                 agent_name=response.agent_name,
                 agent_retell_id=response.agent_id,
                 call_id=response.call_id,
@@ -159,6 +232,7 @@ class RetellCallService:
             )
 
             await new_call.insert()
+            await increment_counter(user.id, CALLS)
 
             logger.info(f"Retell call created and saved | call_id={new_call.call_id}")
             return new_call
@@ -173,35 +247,27 @@ class RetellCallService:
             raise
 
 
-    async def create_phone_call_by_campaign_contact(self, *, user: UserModel, payload: dict) -> CallModel:
+    async def create_phone_call_by_campaign_contact(self, *, user: UserModel, payload: dict, loader: LinkLoader | None = None) -> CallModel:
         """
         Create a phone call in Retell and store it in DB.
+        The contact's campaign and agent are resolved through `loader`, so a
+        caller placing several calls can pass one to load each only once.
         """
         logger.info("Creating Retell phone call...")
+        loader = loader or LinkLoader()
         contact_uid = payload.get('contact_uid')
         campaign_contact = await CampaignContactsModel.find_one(
             CampaignContactsModel.id == contact_uid,
-            fetch_links=True
         )
         if not campaign_contact:
             raise NotFoundException("Campaign's contact not found in DB")
         
-        if campaign_contact.user.id != user.id:
+        if campaign_contact.user.ref.id != user.id:
             raise ForbiddenException("contact not assiciate with your campaign")
         
-        agent_id = getattr(
-            getattr(
-                getattr(
-                    campaign_contact, 
-                    "campaign", 
-                    None
-                ),
-                "agent",
-                None
-            ),
-            "agent_id",
-            None
-        )
+        campaign = await loader.load(CampaignModel, campaign_contact.campaign.ref.id, CampaignAgentView)
+        agent = campaign and await loader.load(AgentModel, campaign.agent.ref.id, AgentSummaryView)
+        agent_id = agent and agent.agent_id
 
         phone_number= getattr(campaign_contact, 'phone_number', None)
         if not agent_id :
@@ -222,23 +288,20 @@ class RetellCallService:
         dynamic_variables.update(clean_fields)
 
         try:
-            response = self.client.call.create_phone_call(
+            response = await self.client.call.create_phone_call(
                 from_number=payload["from_number"],
                 to_number=phone_number,
                 override_agent_id=agent_id,
                 retell_llm_dynamic_variables=dynamic_variables,
+                metadata={CAMPAIGN_CONTACT_METADATA_KEY: str(campaign_contact.id)},
             )
 
             # logger.debug(f"Retell response: {json.dumps(response, indent=2)}")
 
-            # --- Extract agent details
-            agent_id = response.agent_id
-            agent = await AgentModel.find_one(AgentModel.agent_id == agent_id)
-
             # --- Create CallModel entry
             new_call = CallModel(
                 user=user,
-                agent=agent,
+                agent=DBRef(AgentModel.Settings.name, agent.id),
                 agent_name=response.agent_name,
                 campaign_contact=campaign_contact,
                 agent_retell_id=response.agent_id,
@@ -257,6 +320,7 @@ class RetellCallService:
             )
 
             await new_call.insert()
+            await increment_counter(user.id, CALLS)
 
             # --- Increment call count for contact
             await campaign_contact.update({"$inc": {"no_of_calls": 1}})
@@ -275,6 +339,76 @@ class RetellCallService:
 
 
 class RetellWebhookService:
+    # Fields only written when a webhook creates the call
+    IDENTITY_FIELDS = ["agent_name", "call_type", "direction", "from_number", "to_number"]
+    # A call created without these would fail to load, so it is not created
+    REQUIRED_FIELDS = [name for name, field in CallModel.model_fields.items() if field.is_required()]
+    STARTED_FIELDS = [
+        "call_status",
+        "disconnection_reason",
+        "metadata",
+        "retell_llm_dynamic_variables",
+    ]
+    ENDED_FIELDS = [
+        "call_status",
+        "duration_ms",
+        "recording_url",
+        "recording_multi_channel_url",
+        "disconnection_reason",
+        "public_log_url",
+        "scrubbed_recording_url",
+        "scrubbed_recording_multi_channel_url",
+        "transcript",
+        "transcript_object",
+        "transcript_with_tool_calls",
+        "scrubbed_transcript_with_tool_calls",
+        "call_cost",
+        "llm_token_usage",
+        "retell_llm_dynamic_variables",
+    ]
+    ANALYZED_FIELDS = [
+        "call_status",
+        "duration_ms",
+        "call_analysis",
+        "call_cost",
+        "disconnection_reason",
+        "transcript_object",
+        "transcript_with_tool_calls",
+        "llm_token_usage",
+        "transcript",
+        "recording_url",
+        "recording_multi_channel_url",
+        "public_log_url",
+        "retell_llm_dynamic_variables",
+    ]
+    # Scalar fields checked against CallModel before a raw write
+    VALIDATED_FIELDS = [
+        "agent_name",
+        "call_type",
+        "direction",
+        "call_status",
+        "disconnection_reason",
+        "duration_ms",
+        "user_sentiment",
+        "call_successful",
+        "total_duration",
+    ]
+    # Large fields repeated by call_ended and call_analyzed; only rewritten when their digest changes
+    HASHED_FIELDS = [
+        "transcript",
+        "transcript_object",
+        "transcript_with_tool_calls",
+        "scrubbed_transcript_with_tool_calls",
+        "call_cost",
+    ]
+    # A late call_started must not move a call out of these
+    FINAL_STATUSES = [
+        CallStatusChoices.ENDED.value,
+        CallStatusChoices.ERROR.value,
+        CallStatusChoices.NOT_CONNECTED.value,
+    ]
+    _adapters: dict[str, TypeAdapter] = {}
+
     def __init__(self):
         self.handlers = {
             "call_started": self._handle_started,
@@ -283,57 +417,219 @@ class RetellWebhookService:
         }
         self.logger = get_logger("Retell Webhook Service")
 
-    async def handle_event(self, payload: dict):
+    async def handle_event(self, payload: RetellWebhookPayload):
         """Main entrypoint for webhook event handling."""
         self.logger.info("Received Retell webhook")
-        self.logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
-
-        event = payload.get("event")
-        call_data = payload.get("call", {})
-
-        if not event:
-            raise AppException("Missing 'event' in payload")
+        self.logger.opt(lazy=True).debug("Payload: {}", lambda: format_payload(payload))
 
-        call_id = call_data.get("call_id")
-        if not call_id:
-            raise AppException("Missing 'call_id' in payload")
+        event = payload.event
+        call_data = payload.call
+        call_id = call_data.call_id
 
-        existing = await CallModel.find_one(CallModel.call_id == call_id)
         handler = self.handlers.get(event)
 
         if not handler:
             self.logger.warning(f"Unhandled event type: {event}")
             return {"success": False, "message": f"Unhandled event: {event}"}
 
-        return await handler(call_data, existing, call_id)
+        return await handler(call_data, call_id)
 
     # Helpers
     def _parse_time(self, value):
         return parse_timestamp(value) or datetime.utcnow()
 
 
-    async def _get_agent_and_user(self, agent_id):
-        agent = await AgentModel.find_one(AgentModel.agent_id == agent_id, fetch_links=True)
+    async def _get_agent_refs(self, agent_id) -> tuple[DBRef, DBRef]:
+        """Return (agent, user) references for a Retell agent id without fetching links."""
+        agent = await AgentModel.find_one(AgentModel.agent_id == agent_id)
         if not agent:
             raise NotFoundException("Agent not found")
         if not agent.user:
             raise AppException("Agent not linked to any user")
 
-        user = await UserModel.get(agent.user.id)
-        return agent, user
+        return DBRef(AgentModel.get_collection_name(), agent.id), agent.user.ref
 
 
-    async def _update_fields(self, obj, data: dict, fields: list[str]):
-        for field in fields:
-            if field in data:
-                value = data[field]
-                # Don’t overwrite existing with None
-                if value is not None:
-                    setattr(obj, field, value)
-        await obj.save()
+    def _collect_fields(self, data: RetellCallPayload, fields: list[str]) -> dict:
+        # Don’t overwrite existing with None
+        return {field: data.get(field) for field in fields if data.get(field) is not None}
 
 
-    def _extract_call_analysis_fields(self, call_data: dict) -> dict:
+    @classmethod
+    def _adapter(cls, field: str) -> TypeAdapter:
+        if field not in cls._adapters:
+            cls._adapters[field] = TypeAdapter(CallModel.model_fields[field].annotation)
+        return cls._adapters[field]
+
+
+    def _encode(self, fields: dict) -> dict:
+        """Validate scalar fields against CallModel and convert values to BSON types."""
+        encoded = {}
+        for field, value in fields.items():
+            value = decode_raw(value)
+            if field in self.VALIDATED_FIELDS:
+                value = self._adapter(field).validate_python(value)
+            if isinstance(value, Enum):
+                value = value.value
+            elif isinstance(value, Decimal):
+                value = Decimal128(str(value))
+            encoded[field] = value
+        return encoded
+
+
+    @staticmethod
+    def _digest(value) -> str:
+        if isinstance(value, msgspec.Raw):
+            return hashlib.blake2b(value, digest_size=16).hexdigest()
+        canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+    def _split_hashed(self, fields: dict) -> tuple[dict, dict]:
+        """Split off the HASHED_FIELDS of `fields`, returned with their digests."""
+        fields = dict(fields)
+        hashed = {field: fields.pop(field) for field in self.HASHED_FIELDS if field in fields}
+        return fields, {field: (value, self._digest(value)) for field, value in hashed.items()}
+
+
+    @staticmethod
+    def _changed_filter(hashed: dict) -> dict:
+        # Matches only while at least one stored digest differs, so a miss means nothing changed
+        return {"$or": [{f"content_hashes.{field}": {"$ne": digest}} for field, (_, digest) in hashed.items()]}
+
+
+    @staticmethod
+    def _hashed_set(hashed: dict, encode) -> dict:
+        return {
+            **encode({field: value for field, (value, _) in hashed.items()}),
+            **{f"content_hashes.{field}": digest for field, (_, digest) in hashed.items()},
+        }
+
+
+    async def _upsert_call(self, call_id: str, call_data: RetellCallPayload, fields: dict, *, guard: dict | None = None) -> bool:
+        """
+        Write `fields` to the call with a single update, creating the call if needed;
+        transcript arrays go to its CallArtifactsModel instead.
+        With `guard`, fields are only applied to calls matching it and are
+        otherwise insert-only, so a late event never overwrites newer state.
+        Returns True when the call was created.
+        """
+        fields = dict(fields)
+        artifacts = {field: fields.pop(field) for field in CallArtifactsModel.FIELDS if field in fields}
+
+        created = await self._write_call(call_id, call_data, fields, guard=guard)
+        if artifacts:
+            await self._write_artifacts(call_id, artifacts)
+        return created
+
+
+    async def _write_call(self, call_id: str, call_data: RetellCallPayload, fields: dict, *, guard: dict | None = None) -> bool:
+        collection = CallModel.get_motor_collection()
+        now = datetime.utcnow()
+        fields, hashed = self._split_hashed(fields)
+        fields = self._encode(fields)
+
+        match = {"call_id": call_id, **(guard or {})}
+        updates = [UpdateOne(match, {"$set": {**fields, "updated_at": now}})]
+        if hashed:
+            # Same round trip; the large fields are only rewritten when a digest changed
+            updates.append(UpdateOne({**match, **self._changed_filter(hashed)}, {"$set": self._hashed_set(hashed, self._encode)}))
+        result = await collection.bulk_write(updates, ordered=True)
+        if result.matched_count:
+            return False
+
+        # Unknown call (or guard not met): upsert on the unique call_id so concurrent events cannot race
+        agent_ref, user_ref = await self._get_agent_refs(call_data.get("agent_id"))
+        on_insert = {
+            "_id": uuid.uuid4(),
+            "user": user_ref,
+            "agent": agent_ref,
+            "agent_retell_id": call_data.get("agent_id"),
+            "created_at": now,
+            **self._encode(self._collect_fields(call_data, self.IDENTITY_FIELDS)),
+            **search_keys(CallModel, {field: call_data.get(field) for field in CallModel.SEARCH_FIELDS}),
+        }
+        fields.update(self._hashed_set(hashed, self._encode))
+        update = {"$setOnInsert": on_insert, "$set": {"updated_at": now}}
+        if guard:
+            on_insert.update(fields)
+        else:
+            update["$set"].update(fields)
+
+        inserted = {"call_id": call_id, **on_insert, **update["$set"]}
+        missing = [field for field in self.REQUIRED_FIELDS if inserted.get(field) is None]
+        if missing:
+            raise AppException(f"Call {call_id} cannot be created without {', '.join(missing)}")
+
+        result = await collection.update_one({"call_id": call_id}, update, upsert=True)
+        if result.upserted_id is None:
+            return False
+        await increment_counter(user_ref.id, CALLS)
+        return True
+
+
+    async def _write_artifacts(self, call_id: str, fields: dict):
+        """
+        Write the transcript arrays that changed since the stored digests.
+        One ordered bulk write creates the document if it is missing, then
+        sets the arrays only where a digest differs, so a repeat costs one
+        round trip and no rewrite.
+        """
+        collection = CallArtifactsModel.get_motor_collection()
+        _, hashed = self._split_hashed(fields)
+        now = datetime.utcnow()
+        await collection.bulk_write([
+            UpdateOne(
+                {"call_id": call_id},
+                {"$setOnInsert": {"_id": uuid.uuid4(), "created_at": now, "updated_at": now}},
+                upsert=True,
+            ),
+            UpdateOne(
+                {"call_id": call_id, **self._changed_filter(hashed)},
+                {"$set": {**self._hashed_set(hashed, self._compress), "updated_at": now}},
+            ),
+        ], ordered=True)
+
+
+    @staticmethod
+    def _compress(fields: dict) -> dict:
+        return {field: compress_json(value) for field, value in fields.items()}
+
+
+    @staticmethod
+    def _campaign_contact_id(call_data) -> uuid.UUID | None:
+        metadata = call_data.get("metadata") or {}
+        try:
+            return uuid.UUID(str(metadata[CAMPAIGN_CONTACT_METADATA_KEY]))
+        except (KeyError, ValueError):
+            return None
+
+    async def _mark_campaign_contact_in_call(self, call_data, call_id: str):
+        """Record the call on the dialer's contact; the dialer may not have stored it yet."""
+        contact_id = self._campaign_contact_id(call_data)
+        if not contact_id:
+            return
+        await CampaignContactsModel.get_motor_collection().update_one(
+            {"_id": contact_id, "dial_status": ContactDialStatusChoices.DIALING.value},
+            {"$set": {"dial_status": ContactDialStatusChoices.IN_CALL.value, "last_call_id": call_id}},
+        )
+
+    async def _release_campaign_contact(self, call_data, call_id: str):
+        """
+        Free the campaign dialer slot held by this call, if it was placed by the dialer.
+        A contact still in `dialing` is found through the call metadata.
+        """
+        matches = [{"last_call_id": call_id, "dial_status": ContactDialStatusChoices.IN_CALL.value}]
+        contact_id = self._campaign_contact_id(call_data)
+        if contact_id:
+            matches.append({"_id": contact_id, "dial_status": ContactDialStatusChoices.DIALING.value})
+        await CampaignContactsModel.get_motor_collection().update_one(
+            {"$or": matches},
+            {"$set": {"dial_status": ContactDialStatusChoices.DONE.value, "last_call_id": call_id}},
+        )
+
+
+    def _extract_call_analysis_fields(self, call_data: RetellCallPayload) -> dict:
         """Extract sentiment and success fields from call_analysis safely."""
         analysis = call_data.get("call_analysis", {}) or {}
         return {
@@ -341,7 +637,7 @@ class RetellWebhookService:
             "call_successful": analysis.get("call_successful"),
         }
 
-    def _extract_call_cost_fields(self, call_data: dict) -> dict:
+    def _extract_call_cost_fields(self, call_data: RetellCallPayload) -> dict:
         """Extract cost-related fields safely."""
         cost = call_data.get("call_cost", {}) or {}
         return {
@@ -351,109 +647,46 @@ class RetellWebhookService:
         }
 
     # Event Handlers
-    async def _handle_started(self, call_data, existing, call_id):
-        start_time = self._parse_time(call_data.get("start_timestamp"))
-
-        if not existing:
-            agent, user = await self._get_agent_and_user(call_data["agent_id"])
-            call = CallModel(
-                user=user,
-                agent=agent,
-                call_id=call_id,
-                agent_name=call_data.get("agent_name"),
-                agent_retell_id=call_data.get("agent_id"),
-                call_type=call_data.get("call_type"),
-                direction=call_data.get("direction"),
-                call_status=call_data.get("call_status"),
-                disconnection_reason=call_data.get("disconnection_reason"),
-                from_number=call_data.get("from_number"),
-                to_number=call_data.get("to_number"),
-                start_timestamp=start_time,
-                metadata=call_data.get("metadata", {}),
-                retell_llm_dynamic_variables=call_data.get("retell_llm_dynamic_variables", {}),
-            )
-            await call.insert()
+    async def _handle_started(self, call_data, call_id):
+        fields = self._collect_fields(call_data, self.STARTED_FIELDS)
+        fields["start_timestamp"] = self._parse_time(call_data.get("start_timestamp"))
+
+        created = await self._upsert_call(
+            call_id,
+            call_data,
+            fields,
+            guard={"call_status": {"$nin": self.FINAL_STATUSES}},
+        )
+        await self._mark_campaign_contact_in_call(call_data, call_id)
+        if created:
             self.logger.info(f"New call created successfully (call_id={call_id})")
             return {"success": True, "message": "New call created"}
 
-        existing.start_timestamp = start_time
-        await self._update_fields(existing, call_data, ["call_status", "metadata", "retell_llm_dynamic_variables"])
         self.logger.info(f"Existing call updated successfully (call_id={call_id})")
         return {"success": True, "message": "Existing call updated"}
 
 
-    async def _handle_ended(self, call_data, existing, call_id):
-        if not existing:
-            return {"success": False, "message": "Call not found for call_ended event"}
-
-        existing.start_timestamp = self._parse_time(call_data.get("start_timestamp"))
-        existing.end_timestamp = self._parse_time(call_data.get("end_timestamp"))
-
-        await self._update_fields(existing, call_data, [
-            "call_status",
-            "duration_ms",
-            "recording_url",
-            "recording_multi_channel_url",
-            "disconnection_reason",
-            "public_log_url",
-            "scrubbed_recording_url",
-            "scrubbed_recording_multi_channel_url",
-            "transcript",
-            "transcript_object",
-            "transcript_with_tool_calls",
-            "scrubbed_transcript_with_tool_calls",
-            "call_cost",
-            "llm_token_usage",
-            "retell_llm_dynamic_variables",
-        ])
-        # Extract from call_cost
-        cost_fields = self._extract_call_cost_fields(call_data)
-        existing.combined_cost = cost_fields["combined_cost"]
-        existing.total_duration = cost_fields["total_duration"]
-        existing.total_duration_unit_price = cost_fields["total_duration_unit_price"]
-        await existing.save()
+    async def _handle_ended(self, call_data, call_id):
+        fields = self._collect_fields(call_data, self.ENDED_FIELDS)
+        fields["start_timestamp"] = self._parse_time(call_data.get("start_timestamp"))
+        fields["end_timestamp"] = self._parse_time(call_data.get("end_timestamp"))
+        fields.update(self._extract_call_cost_fields(call_data))
+
+        await self._upsert_call(call_id, call_data, fields)
+        await self._release_campaign_contact(call_data, call_id)
 
         self.logger.info(f"Call marked as ended successfully (call_id={call_id})")
         return {"success": True, "message": "Call updated as ended"}
 
 
-    async def _handle_analyzed(self, call_data, existing, call_id):
-        if not existing:
-            return {"success": False, "message": "Call not found for call_analyzed event"}
-
-        existing.start_timestamp = self._parse_time(call_data.get("start_timestamp"))
-        existing.end_timestamp = self._parse_time(call_data.get("end_timestamp"))
-
-        await self._update_fields(existing, call_data, [
-            "call_status",
-            "duration_ms",
-            "call_analysis",
-            "call_cost",
-            "disconnection_reason",
-            "transcript_object",
-            "transcript_with_tool_calls",
-            "llm_token_usage",
-            "transcript",
-            "recording_url",
-            "recording_multi_channel_url",
-            "public_log_url",
-            "retell_llm_dynamic_variables",
-        ])
-        # Extract from call_cost
-        cost_fields = self._extract_call_cost_fields(call_data)
-        existing.combined_cost = cost_fields["combined_cost"]
-        existing.total_duration = cost_fields["total_duration"]
-        existing.total_duration_unit_price = cost_fields["total_duration_unit_price"]
-
-        # Extract from call_analysis
-        analysis_fields = self._extract_call_analysis_fields(call_data)
-        existing.user_sentiment = analysis_fields["user_sentiment"]
-        existing.call_successful = analysis_fields["call_successful"]
-        await existing.save()
+    async def _handle_analyzed(self, call_data, call_id):
+        fields = self._collect_fields(call_data, self.ANALYZED_FIELDS)
+        fields["start_timestamp"] = self._parse_time(call_data.get("start_timestamp"))
+        fields["end_timestamp"] = self._parse_time(call_data.get("end_timestamp"))
+        fields.update(self._extract_call_cost_fields(call_data))
+        fields.update(self._extract_call_analysis_fields(call_data))
+
+        await self._upsert_call(call_id, call_data, fields)
 
         self.logger.info(f"Call analyzed data saved successfully (call_id={call_id})")
         return {"success": True, "message": "Call analysis updated successfully"}
-
-
-
-
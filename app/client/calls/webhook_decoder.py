@@ -0,0 +1,87 @@
+import msgspec
+from typing import Any, Optional
+from app.core.exceptions.base import AppException
+
+
+class RetellCallPayload(msgspec.Struct, kw_only=True):
+    """
+    The part of a Retell webhook `call` object that we persist.
+    Unknown keys are skipped without being decoded. The large transcript
+    arrays stay raw JSON slices until a handler actually writes them.
+    """
+
+    call_id: str
+    agent_id: Optional[str] = None
+    agent_name: Optional[str] = None
+    call_type: Optional[str] = None
+    direction: Optional[str] = None
+    call_status: Optional[str] = None
+    disconnection_reason: Optional[str] = None
+    from_number: Optional[str] = None
+    to_number: Optional[str] = None
+
+    start_timestamp: Optional[int] = None
+    end_timestamp: Optional[int] = None
+    duration_ms: Optional[int] = None
+
+    metadata: Optional[dict[str, Any]] = None
+    retell_llm_dynamic_variables: Optional[dict[str, Any]] = None
+
+    recording_url: Optional[str] = None
+    recording_multi_channel_url: Optional[str] = None
+    scrubbed_recording_url: Optional[str] = None
+    scrubbed_recording_multi_channel_url: Optional[str] = None
+    public_log_url: Optional[str] = None
+
+    transcript: Optional[str] = None
+    transcript_object: msgspec.Raw = msgspec.Raw()
+    transcript_with_tool_calls: msgspec.Raw = msgspec.Raw()
+    scrubbed_transcript_with_tool_calls: msgspec.Raw = msgspec.Raw()
+
+    call_cost: Optional[dict[str, Any]] = None
+    llm_token_usage: Optional[dict[str, Any]] = None
+    call_analysis: Optional[dict[str, Any]] = None
+
+    def get(self, field: str, default=None):
+        """Dict-style access; absent or null raw slices count as missing."""
+        value = getattr(self, field, None)
+        if isinstance(value, msgspec.Raw) and bytes(value) in (b"", b"null"):
+            value = None
+        return default if value is None else value
+
+
+class RetellWebhookPayload(msgspec.Struct):
+    event: str
+    call: RetellCallPayload
+
+
+_decoder = msgspec.json.Decoder(RetellWebhookPayload)
+
+
+def decode_webhook(body: bytes) -> RetellWebhookPayload:
+    """Decode a raw Retell webhook body, raising AppException when it is malformed."""
+    try:
+        return _decoder.decode(body)
+    except msgspec.DecodeError as e:
+        raise AppException(f"Invalid webhook payload: {e}")
+
+
+def decode_raw(value):
+    """Materialize a raw JSON slice; other values pass through unchanged."""
+    if isinstance(value, msgspec.Raw):
+        return msgspec.json.decode(value)
+    return value
+
+
+def format_payload(payload: RetellWebhookPayload) -> str:
+    """Indented JSON of the decoded fields, for debug logging."""
+    # An absent raw field is an empty slice, which would encode as invalid JSON
+    call = payload.call
+    absent = {
+        field: msgspec.Raw(b"null")
+        for field in call.__struct_fields__
+        if isinstance(getattr(call, field), msgspec.Raw) and not bytes(getattr(call, field))
+    }
+    if absent:
+        payload = msgspec.structs.replace(payload, call=msgspec.structs.replace(call, **absent))
+    return msgspec.json.format(msgspec.json.encode(payload), indent=2).decode()
@@ -0,0 +1,214 @@
+import zlib
+import asyncio
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.config.settings import settings
+from app.client.models import RetellWebhookEventModel
+from app.core.constants.choices import WebhookEventStatusChoices
+from app.config.logger import get_logger
+from .services import RetellWebhookService
+from .webhook_decoder import decode_webhook
+
+logger = get_logger("Retell Webhook Queue")
+
+
+class RetellWebhookQueue:
+    """
+    Durable queue for Retell webhooks.
+
+    The endpoint stores the raw body and returns immediately; a pool of
+    workers drains it. Events of one call always go to the same worker and
+    wait for any earlier unfinished event of that call, so they are applied
+    in arrival order. Failures are retried with exponential backoff and end
+    up as dead letters after `RETELL_WEBHOOK_MAX_ATTEMPTS`. Events put back
+    for later are dispatched again by a timer in this process; the poller
+    covers events of other processes and of restarts.
+    """
+
+    def __init__(self):
+        self._queues: list[asyncio.Queue] = []
+        self._tasks: list[asyncio.Task] = []
+        # Events queued or being processed here; the poller skips them
+        self._in_flight: set = set()
+        self.service = RetellWebhookService()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def collection(self):
+        return RetellWebhookEventModel.get_motor_collection()
+
+    # Ingestion
+    async def enqueue(self, body: bytes, *, call_id: str, event: str) -> RetellWebhookEventModel:
+        """Persist a raw, already validated webhook body and hand it to a worker."""
+        queued = RetellWebhookEventModel(call_id=call_id, event=event, payload=body)
+        await queued.insert()
+        self._dispatch(queued.id, call_id)
+        return queued
+
+    def _dispatch(self, event_id, call_id: str):
+        # Not running in this process: the poller of a running worker picks it up
+        if not self.running or event_id in self._in_flight:
+            return
+        self._in_flight.add(event_id)
+        index = zlib.crc32(call_id.encode()) % len(self._queues)
+        self._queues[index].put_nowait(event_id)
+
+    def _dispatch_later(self, queued: dict, delay: float):
+        # Once available again, without waiting for the poller
+        asyncio.get_running_loop().call_later(delay, self._dispatch, queued["_id"], queued["call_id"])
+
+    # Lifecycle
+    async def start(self):
+        if self.running:
+            return
+        self._queues = [asyncio.Queue() for _ in range(settings.RETELL_WEBHOOK_WORKERS)]
+        self._tasks = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+        self._tasks.append(asyncio.create_task(self._poller()))
+        logger.info(f"Webhook queue started with {len(self._queues)} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+        self._in_flight.clear()
+        logger.info("Webhook queue stopped")
+
+    async def requeue_dead_letters(self) -> int:
+        result = await self.collection.update_many(
+            {"status": WebhookEventStatusChoices.DEAD_LETTER},
+            {"$set": {
+                "status": WebhookEventStatusChoices.PENDING,
+                "attempts": 0,
+                "available_at": datetime.utcnow(),
+            }},
+        )
+        return result.modified_count
+
+    # Workers
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            event_id = await queue.get()
+            try:
+                await self._process(event_id)
+            except Exception as e:
+                logger.exception(f"Webhook worker error (event={event_id}): {e}")
+            finally:
+                self._in_flight.discard(event_id)
+                queue.task_done()
+
+    async def _poller(self):
+        """
+        Re-dispatch due retries, expired leases and events stored by other
+        processes. Events still queued or running here are not queued again.
+        """
+        while True:
+            try:
+                now = datetime.utcnow()
+                cursor = self.collection.find(
+                    {"$or": [
+                        {"status": WebhookEventStatusChoices.PENDING, "available_at": {"$lte": now}},
+                        {"status": WebhookEventStatusChoices.PROCESSING, "locked_until": {"$lt": now}},
+                    ], "_id": {"$nin": list(self._in_flight)}},
+                    projection={"_id": 1, "call_id": 1},
+                    sort=[("created_at", 1)],
+                    limit=500,
+                )
+                async for doc in cursor:
+                    self._dispatch(doc["_id"], doc["call_id"])
+            except Exception as e:
+                logger.exception(f"Webhook poller error: {e}")
+            await asyncio.sleep(settings.RETELL_WEBHOOK_POLL_INTERVAL)
+
+    async def _claim(self, event_id):
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "_id": event_id,
+                "$or": [
+                    {"status": WebhookEventStatusChoices.PENDING, "available_at": {"$lte": now}},
+                    {"status": WebhookEventStatusChoices.PROCESSING, "locked_until": {"$lt": now}},
+                ],
+            },
+            {"$set": {
+                "status": WebhookEventStatusChoices.PROCESSING,
+                "locked_until": now + timedelta(seconds=settings.RETELL_WEBHOOK_LEASE_SECONDS),
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _has_earlier_unfinished(self, queued: dict) -> bool:
+        earlier = await self.collection.find_one(
+            {
+                "call_id": queued["call_id"],
+                "_id": {"$ne": queued["_id"]},
+                "status": {"$in": [
+                    WebhookEventStatusChoices.PENDING,
+                    WebhookEventStatusChoices.PROCESSING,
+                ]},
+                "created_at": {"$lt": queued["created_at"]},
+            },
+            projection={"_id": 1},
+        )
+        return earlier is not None
+
+    async def _process(self, event_id):
+        queued = await self._claim(event_id)
+        if not queued:
+            return  # done, not due yet, or leased by another worker
+
+        if await self._has_earlier_unfinished(queued):
+            await self._release(queued, delay=1)
+            self._dispatch_later(queued, 1)
+            return
+
+        try:
+            await self.service.handle_event(decode_webhook(queued["payload"]))
+        except Exception as e:
+            await self._fail(queued, e)
+        else:
+            await self.collection.delete_one({"_id": queued["_id"]})
+
+    async def _release(self, queued: dict, delay: float):
+        await self.collection.update_one(
+            {"_id": queued["_id"]},
+            {"$set": {
+                "status": WebhookEventStatusChoices.PENDING,
+                "available_at": datetime.utcnow() + timedelta(seconds=delay),
+                "locked_until": None,
+            }},
+        )
+
+    async def _fail(self, queued: dict, error: Exception):
+        attempts = queued.get("attempts", 0) + 1
+        message = getattr(error, "message", None) or str(error)
+
+        if attempts >= settings.RETELL_WEBHOOK_MAX_ATTEMPTS:
+            status = WebhookEventStatusChoices.DEAD_LETTER
+            available_at = datetime.utcnow()
+            logger.error(f"Webhook moved to dead letters (call_id={queued['call_id']}, event={queued['event']}): {message}")
+        else:
+            status = WebhookEventStatusChoices.PENDING
+            delay = settings.RETELL_WEBHOOK_RETRY_BACKOFF * (2 ** (attempts - 1))
+            available_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f"Webhook failed, retry #{attempts} in {delay:.0f}s (call_id={queued['call_id']}): {message}")
+
+        await self.collection.update_one(
+            {"_id": queued["_id"]},
+            {"$set": {
+                "status": status,
+                "attempts": attempts,
+                "available_at": available_at,
+                "locked_until": None,
+                "last_error": message,
+            }},
+        )
+        if status == WebhookEventStatusChoices.PENDING:
+            self._dispatch_later(queued, delay)
+
+
+retell_webhook_queue = RetellWebhookQueue()
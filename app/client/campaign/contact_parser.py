@@ -0,0 +1,203 @@
+"""
+Parsing and normalization of contact import files, run in the CPU pool.
+
+`spool_contact_file` reads the upload chunk by chunk and writes each
+normalized chunk to a spool directory as pickled NumPy columns, which
+CampaignContactImportService upserts as they appear. It does not wait for
+the upserts, so the pool worker is only held for the parse; chunks waiting
+for the database queue up on disk.
+"""
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from app.core.exceptions.base import AppException
+from app.core.utils.helpers import PHONE_SEPARATORS, E164_PATTERN
+from app.config.settings import settings
+from .readers import (
+    iter_csv_chunks,
+    iter_xlsx_chunks,
+    iter_ods_chunks,
+    iter_xls_chunks,
+)
+
+STOP_FILE = "stop"  # created by the writer to abandon parsing
+MAX_FIXED_WIDTH = 64
+
+
+def spool_chunk_path(spool_dir: str | Path, index: int) -> Path:
+    return Path(spool_dir) / f"{index:06d}.pkl"
+
+
+def spool_contact_file(path: str, filename: str, chunk_size: int, skip_chunks: int, spool_dir: str) -> int:
+    """Parse the file into spooled chunks from `skip_chunks` on; returns the number of chunks."""
+    parser = ContactFileParser()
+    reader = parser.reader_for(filename)
+    spool = Path(spool_dir)
+    stop = spool / STOP_FILE
+
+    index = -1
+    with open(path, "rb") as file:
+        chunks = reader(file, chunk_size)
+        try:
+            for index, chunk in enumerate(chunks):
+                if index < skip_chunks:
+                    if parser.columns is None:
+                        parser.frame(chunk)  # still map the columns from the header
+                    continue
+
+                prepared = parser.prepare(chunk)
+                if stop.exists():
+                    break
+
+                temporary = spool / f"{index:06d}.tmp"
+                with temporary.open("wb") as handle:
+                    pickle.dump(prepared, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, spool_chunk_path(spool, index))
+        finally:
+            chunks.close()  # release the reader while the file is still open
+    return index + 1
+
+
+class ContactFileParser:
+    PHONE_KEYWORDS = ["phone", "mobile", "cell", "contact", "contact number", "telephone", "number"]
+    FIRST_NAME_KEYWORDS = ["first name", "fname", "given name"]
+    LAST_NAME_KEYWORDS = ["last name", "lname", "surname"]
+    NAME_KEYWORDS = ["name", "full name", "contact name"]
+    EMAIL_KEYWORDS = ["email", "e-mail", "mail address"]
+
+    # The model's own validator: the upserts bypass it, and a stored value it
+    # rejects would make the contact fail to load everywhere
+    EMAIL_ADAPTER = TypeAdapter(EmailStr)
+
+    READERS = {
+        ".csv": iter_csv_chunks,
+        ".xlsx": iter_xlsx_chunks,
+        ".ods": iter_ods_chunks,
+        ".xls": iter_xls_chunks,
+    }
+
+    def __init__(self):
+        self.columns: dict | None = None
+
+    @classmethod
+    def reader_for(cls, filename: str):
+        filename = filename.lower()
+        return next((reader for ext, reader in cls.READERS.items() if filename.endswith(ext)), None)
+
+    def prepare(self, chunk: pd.DataFrame) -> dict:
+        """
+        Normalize a chunk into NumPy string columns ("" where a value is missing),
+        keeping one row per valid E.164 number, plus the counts of rows dropped.
+        """
+        df = self.frame(chunk)
+        columns = self.columns
+
+        phones = self._normalize_phones(df[columns["phone"]])
+        valid = phones.notna()
+        duplicated = valid & phones.duplicated()
+        keep = valid & ~duplicated
+        df, phones = df[keep], phones[keep]
+
+        first_names, last_names = self._extract_names(df)
+        emails = self._clean(df[columns["email"]]) if columns["email"] else self._empty(df)
+        emails = self._validate_emails(emails)
+        dynamic = df[columns["dynamic"]].rename(columns=lambda col: col.replace(" ", "_"))
+
+        return {
+            "rows": len(chunk),
+            "skipped": int((~valid).sum()),
+            "duplicate": int(duplicated.sum()),
+            "phone_number": self._to_array(phones),
+            "first_name": self._to_array(first_names),
+            "last_name": self._to_array(last_names),
+            "email": self._to_array(emails),
+            "dynamic_variables": {col: self._to_array(dynamic[col]) for col in dynamic.columns},
+        }
+
+    def frame(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Normalized column names and no NaN; maps the columns on the first chunk."""
+        chunk.columns = [str(col).strip().lower() for col in chunk.columns]
+        if self.columns is None:
+            self.columns = self._resolve_columns(chunk.columns)
+        return chunk.fillna("")
+
+    @classmethod
+    def _validate_emails(cls, emails: pd.Series) -> pd.Series:
+        """Each email as EmailStr normalizes it, None where it is not valid."""
+        valid = {}
+        for email in emails[emails.astype(bool)].unique():
+            try:
+                valid[email] = cls.EMAIL_ADAPTER.validate_python(email)
+            except ValidationError:
+                pass
+        return emails.map(valid).where(lambda values: values.notna(), None)
+
+    @staticmethod
+    def _to_array(values: pd.Series) -> np.ndarray:
+        values = values.fillna("")
+        # Fixed-width unicode pickles as one buffer instead of an object per cell,
+        # but would pad every row to the longest value, so long text stays as objects
+        if values.empty or values.str.len().max() <= MAX_FIXED_WIDTH:
+            return np.array(values.tolist(), dtype=str)
+        return values.to_numpy(dtype=object)
+
+    def _resolve_columns(self, columns) -> dict:
+        """Map contact fields to file columns once; the rest become dynamic variables."""
+        mapping = {
+            "phone": self._find_column(columns, self.PHONE_KEYWORDS),
+            "first_name": self._find_column(columns, self.FIRST_NAME_KEYWORDS),
+            "last_name": self._find_column(columns, self.LAST_NAME_KEYWORDS),
+            "full_name": self._find_column(columns, self.NAME_KEYWORDS),
+            "email": self._find_column(columns, self.EMAIL_KEYWORDS),
+        }
+        if not mapping["phone"]:
+            raise AppException("No phone column found")
+
+        mapped = set(mapping.values())
+        mapping["dynamic"] = [col for col in columns if col not in mapped]
+        return mapping
+
+    @staticmethod
+    def _normalize_phones(values: pd.Series) -> pd.Series:
+        """Vectorized `normalize_phone_number`: E.164 numbers, None where invalid."""
+        country_code = settings.DEFAULT_PHONE_COUNTRY_CODE
+        number = values.str.replace(PHONE_SEPARATORS, "", regex=True)
+        number = number.where(~number.str.startswith("00"), "+" + number.str[2:])
+
+        national = ~number.str.startswith("+") & (number != "")
+        has_code = number.str.startswith(country_code) & (number.str.len() > 10)
+        local = national & ~has_code
+        number = number.where(~local, country_code + number.str.replace(r"^0", "", regex=True))
+        number = number.where(~national, "+" + number)
+        return number.where(number.str.match(E164_PATTERN), None)
+
+    def _find_column(self, columns, keywords):
+        for col in columns:
+            for key in keywords:
+                if key in col:
+                    return col
+        return None
+
+    @staticmethod
+    def _clean(values: pd.Series) -> pd.Series:
+        """Strip whitespace; empty strings become None."""
+        values = values.str.strip()
+        return values.where(values != "", None)
+
+    @staticmethod
+    def _empty(df: pd.DataFrame) -> pd.Series:
+        return pd.Series(None, index=df.index, dtype=object)
+
+    def _extract_names(self, df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
+        columns = self.columns
+        if columns["first_name"] or columns["last_name"]:
+            first = self._clean(df[columns["first_name"]]) if columns["first_name"] else self._empty(df)
+            last = self._clean(df[columns["last_name"]]) if columns["last_name"] else self._empty(df)
+            return first, last
+        if columns["full_name"]:
+            parts = df[columns["full_name"]].str.strip().str.split(" ", n=1, expand=True).reindex(columns=[0, 1])
+            return self._clean(parts[0].fillna("")), self._clean(parts[1].fillna(""))
+        return self._empty(df), self._empty(df)
@@ -0,0 +1,349 @@
+import os
+import uuid
+import socket
+import asyncio
+from zoneinfo import ZoneInfo
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.config.settings import settings
+from app.auth.models import UserModel
+from app.client.models import (
+    CampaignModel,
+    CampaignDialerModel,
+    CampaignContactsModel,
+)
+from app.client.calls.services import RetellCallService
+from app.core.constants.choices import (
+    CampaignDialerStatusChoices,
+    ContactDialStatusChoices,
+)
+from app.core.exceptions.base import AppException, NotFoundException
+from app.core.utils.link_loader import LinkLoader
+from app.config.logger import get_logger
+
+logger = get_logger("Campaign Dialer")
+
+
+class CampaignDialer:
+    """
+    Dials campaign contacts server-side.
+
+    Every tick the supervisor leases each running campaign, so only one
+    process dials it at a time, and starts new calls while staying under the
+    campaign's calls-per-second pace and its cap on calls in progress.
+    Calls in progress are contacts in `dialing`/`in_call`; the `call_ended`
+    webhook moves them to `done`, which frees capacity. The lease holder also
+    clears stale contacts of its campaign every CAMPAIGN_DIALER_CLEANUP_SECONDS:
+    claims left in `dialing` by a process that stopped mid-call are retried,
+    and calls whose `call_ended` never arrived are marked `failed`.
+    """
+
+    ACTIVE_STATUSES = [
+        ContactDialStatusChoices.DIALING.value,
+        ContactDialStatusChoices.IN_CALL.value,
+    ]
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: asyncio.Task | None = None
+        self._calls: set[asyncio.Task] = set()
+        self._buckets: dict[uuid.UUID, tuple[float, float]] = {}  # campaign -> (tokens, refilled at)
+        self._cleaned_at: dict[uuid.UUID, float] = {}  # campaign -> last stale contact cleanup
+
+    @property
+    def contacts(self):
+        return CampaignContactsModel.get_motor_collection()
+
+    @property
+    def dialers(self):
+        return CampaignDialerModel.get_motor_collection()
+
+    # Control
+    async def start_campaign(self, *, user: UserModel, campaign: CampaignModel, config: dict) -> CampaignDialerModel:
+        """Create or reconfigure the campaign's dialer and set it running."""
+        dialer = await CampaignDialerModel.find_one(CampaignDialerModel.campaign.id == campaign.id)
+        if dialer and dialer.status == CampaignDialerStatusChoices.RUNNING:
+            raise AppException("Dialer is already running for this campaign")
+
+        state = {
+            **config,
+            "status": CampaignDialerStatusChoices.RUNNING,
+            "started_at": datetime.utcnow(),
+            "completed_at": None,
+        }
+        if not dialer:
+            dialer = CampaignDialerModel(user=user, campaign=campaign, **state)
+            await dialer.insert()
+        else:
+            await dialer.set(state)
+
+        # Contacts created before the dialer existed carry no dial state
+        await self.contacts.update_many(
+            {"campaign.$id": campaign.id, "dial_status": {"$exists": False}, "no_of_calls": {"$gt": 0}},
+            {"$set": {"dial_status": ContactDialStatusChoices.DONE.value}},
+        )
+        await self.contacts.update_many(
+            {"campaign.$id": campaign.id, "dial_status": {"$exists": False}},
+            {"$set": {"dial_status": ContactDialStatusChoices.PENDING.value}},
+        )
+        logger.info(f"Dialer started (campaign={campaign.id})")
+        return dialer
+
+    async def pause_campaign(self, campaign_id: uuid.UUID) -> CampaignDialerModel:
+        dialer = await self.get_dialer(campaign_id)
+        if dialer.status != CampaignDialerStatusChoices.RUNNING:
+            raise AppException("Dialer is not running")
+
+        await dialer.set({
+            "status": CampaignDialerStatusChoices.PAUSED,
+            "lease_owner": None,
+            "lease_until": None,
+        })
+        logger.info(f"Dialer paused (campaign={campaign_id})")
+        return dialer
+
+    async def resume_campaign(self, campaign_id: uuid.UUID) -> CampaignDialerModel:
+        dialer = await self.get_dialer(campaign_id)
+        if dialer.status != CampaignDialerStatusChoices.PAUSED:
+            raise AppException("Dialer is not paused")
+
+        await dialer.set({"status": CampaignDialerStatusChoices.RUNNING})
+        logger.info(f"Dialer resumed (campaign={campaign_id})")
+        return dialer
+
+    async def get_progress(self, campaign_id: uuid.UUID) -> dict:
+        """Number of contacts per dial status."""
+        counts = {choice.value: 0 for choice in ContactDialStatusChoices}
+        cursor = self.contacts.aggregate([
+            {"$match": {"campaign.$id": campaign_id}},
+            {"$group": {"_id": "$dial_status", "count": {"$sum": 1}}},
+        ])
+        async for row in cursor:
+            counts[row["_id"] or ContactDialStatusChoices.PENDING.value] = row["count"]
+        return counts
+
+    async def get_dialer(self, campaign_id: uuid.UUID) -> CampaignDialerModel:
+        dialer = await CampaignDialerModel.find_one(CampaignDialerModel.campaign.id == campaign_id)
+        if not dialer:
+            raise NotFoundException("Dialer not found for this campaign")
+        return dialer
+
+    # Lifecycle
+    async def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Campaign dialer started ({self.worker_id})")
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        # Let calls being placed finish, then hand the leases over
+        await asyncio.gather(*self._calls, return_exceptions=True)
+        await self.dialers.update_many(
+            {"lease_owner": self.worker_id},
+            {"$set": {"lease_owner": None, "lease_until": None}},
+        )
+        logger.info("Campaign dialer stopped")
+
+    async def _clear_stale_contacts(self, dialer: CampaignDialerModel):
+        """
+        Put contacts back to `pending` that were claimed more than
+        CAMPAIGN_DIALER_CLAIM_TIMEOUT_SECONDS ago and never reached `in_call`,
+        i.e. whose call was not placed or has not started, and mark `failed`
+        the ones still `in_call` after CAMPAIGN_DIALER_CALL_TIMEOUT_SECONDS.
+        """
+        now = asyncio.get_running_loop().time()
+        if now - self._cleaned_at.get(dialer.id, float("-inf")) < settings.CAMPAIGN_DIALER_CLEANUP_SECONDS:
+            return
+        self._cleaned_at[dialer.id] = now
+
+        campaign_id = dialer.campaign.ref.id
+        utcnow = datetime.utcnow()
+        reset = await self.contacts.update_many(
+            {
+                "campaign.$id": campaign_id,
+                "dial_status": ContactDialStatusChoices.DIALING.value,
+                "last_dialed_at": {"$lt": utcnow - timedelta(seconds=settings.CAMPAIGN_DIALER_CLAIM_TIMEOUT_SECONDS)},
+            },
+            {"$set": {"dial_status": ContactDialStatusChoices.PENDING.value}},
+        )
+        timed_out = await self.contacts.update_many(
+            {
+                "campaign.$id": campaign_id,
+                "dial_status": ContactDialStatusChoices.IN_CALL.value,
+                "last_dialed_at": {"$lt": utcnow - timedelta(seconds=settings.CAMPAIGN_DIALER_CALL_TIMEOUT_SECONDS)},
+            },
+            {"$set": {
+                "dial_status": ContactDialStatusChoices.FAILED.value,
+                "last_error": "No call_ended webhook received",
+            }},
+        )
+        if timed_out.modified_count:
+            await self.dialers.update_one({"_id": dialer.id}, {"$inc": {"failed_count": timed_out.modified_count}})
+        if reset.modified_count or timed_out.modified_count:
+            logger.warning(
+                f"Cleared stale contacts (campaign={campaign_id}): {reset.modified_count} claims reset, "
+                f"{timed_out.modified_count} calls timed out"
+            )
+
+    async def _run(self):
+        while True:
+            try:
+                await self._tick()
+            except Exception as e:
+                logger.exception(f"Dialer tick failed: {e}")
+            await asyncio.sleep(settings.CAMPAIGN_DIALER_TICK_SECONDS)
+
+    async def _tick(self):
+        running = await CampaignDialerModel.find(
+            CampaignDialerModel.status == CampaignDialerStatusChoices.RUNNING
+        ).to_list()
+
+        for dialer in running:
+            if await self._acquire(dialer):
+                await self._dial_campaign(dialer)
+
+    async def _acquire(self, dialer: CampaignDialerModel) -> bool:
+        """Take or renew the campaign lease; False while another process holds it."""
+        now = datetime.utcnow()
+        result = await self.dialers.update_one(
+            {
+                "_id": dialer.id,
+                "status": CampaignDialerStatusChoices.RUNNING.value,
+                "$or": [
+                    {"lease_owner": self.worker_id},
+                    {"lease_until": None},
+                    {"lease_until": {"$lt": now}},
+                ],
+            },
+            {"$set": {
+                "lease_owner": self.worker_id,
+                "lease_until": now + timedelta(seconds=settings.CAMPAIGN_DIALER_LEASE_SECONDS),
+            }},
+        )
+        return bool(result.matched_count)
+
+    # Dialing
+    async def _dial_campaign(self, dialer: CampaignDialerModel):
+        campaign_id = dialer.campaign.ref.id
+        await self._clear_stale_contacts(dialer)
+        if not self._within_calling_hours(dialer):
+            return
+
+        active = await self._count_active(campaign_id)
+        capacity = dialer.max_concurrent_calls - active
+        budget = min(capacity, self._available_tokens(dialer))
+
+        # Shared by this tick's calls: the campaign, agent and user are loaded once
+        loader = LinkLoader()
+        dialed = 0
+        while dialed < budget:
+            contact = await self._claim_contact(campaign_id)
+            if not contact:
+                break
+            task = asyncio.create_task(self._place_call(dialer, contact["_id"], loader))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+            dialed += 1
+        self._spend_tokens(dialer, dialed)
+
+        if not dialed and not active and not await self._has_pending(campaign_id):
+            await self.dialers.update_one(
+                {"_id": dialer.id, "status": CampaignDialerStatusChoices.RUNNING.value},
+                {"$set": {
+                    "status": CampaignDialerStatusChoices.COMPLETED.value,
+                    "completed_at": datetime.utcnow(),
+                    "lease_owner": None,
+                    "lease_until": None,
+                }},
+            )
+            self._buckets.pop(dialer.id, None)
+            self._cleaned_at.pop(dialer.id, None)
+            logger.info(f"Dialer completed (campaign={campaign_id})")
+
+    def _within_calling_hours(self, dialer: CampaignDialerModel) -> bool:
+        if not dialer.calling_hours_start or not dialer.calling_hours_end:
+            return True
+
+        now = datetime.now(ZoneInfo(dialer.timezone)).strftime("%H:%M")
+        start, end = dialer.calling_hours_start, dialer.calling_hours_end
+        if start <= end:
+            return start <= now < end
+        return now >= start or now < end  # window spans midnight
+
+    def _available_tokens(self, dialer: CampaignDialerModel) -> int:
+        """Token bucket refilled at `calls_per_second`, holding at most one second of calls."""
+        now = asyncio.get_running_loop().time()
+        tokens, refilled_at = self._buckets.get(dialer.id, (1.0, now))
+        capacity = max(1.0, dialer.calls_per_second)
+        tokens = min(capacity, tokens + (now - refilled_at) * dialer.calls_per_second)
+        self._buckets[dialer.id] = (tokens, now)
+        return int(tokens)
+
+    def _spend_tokens(self, dialer: CampaignDialerModel, count: int):
+        tokens, refilled_at = self._buckets[dialer.id]
+        self._buckets[dialer.id] = (tokens - count, refilled_at)
+
+    async def _count_active(self, campaign_id) -> int:
+        # Calls whose end webhook never arrived stop blocking capacity after the timeout
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.CAMPAIGN_DIALER_CALL_TIMEOUT_SECONDS)
+        return await self.contacts.count_documents({
+            "campaign.$id": campaign_id,
+            "dial_status": {"$in": self.ACTIVE_STATUSES},
+            "last_dialed_at": {"$gte": cutoff},
+        })
+
+    async def _has_pending(self, campaign_id) -> bool:
+        pending = await self.contacts.find_one(
+            {"campaign.$id": campaign_id, "dial_status": ContactDialStatusChoices.PENDING.value},
+            projection={"_id": 1},
+        )
+        return pending is not None
+
+    async def _claim_contact(self, campaign_id) -> dict | None:
+        return await self.contacts.find_one_and_update(
+            {"campaign.$id": campaign_id, "dial_status": ContactDialStatusChoices.PENDING.value},
+            {"$set": {
+                "dial_status": ContactDialStatusChoices.DIALING.value,
+                "last_dialed_at": datetime.utcnow(),
+            }},
+            sort=[("created_at", 1)],
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _place_call(self, dialer: CampaignDialerModel, contact_id, loader: LinkLoader):
+        try:
+            user = await loader.load(UserModel, dialer.user.ref.id)
+            call = await RetellCallService().create_phone_call_by_campaign_contact(
+                user=user,
+                payload={"contact_uid": contact_id, "from_number": dialer.from_number},
+                loader=loader,
+            )
+        except Exception as e:
+            message = getattr(e, "message", None) or str(e)
+            logger.warning(f"Dialer call failed (contact={contact_id}): {message}")
+            await self.contacts.update_one(
+                {"_id": contact_id},
+                {"$set": {"dial_status": ContactDialStatusChoices.FAILED.value, "last_error": message}},
+            )
+            await self.dialers.update_one({"_id": dialer.id}, {"$inc": {"failed_count": 1}})
+            return
+
+        await self.contacts.update_one(
+            {"_id": contact_id, "dial_status": ContactDialStatusChoices.DIALING.value},
+            {"$set": {
+                "dial_status": ContactDialStatusChoices.IN_CALL.value,
+                "last_call_id": call.call_id,
+                "last_error": None,
+            }},
+        )
+        await self.dialers.update_one({"_id": dialer.id}, {"$inc": {"dialed_count": 1}})
+
+
+campaign_dialer = CampaignDialer()
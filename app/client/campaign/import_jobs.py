@@ -0,0 +1,237 @@
+import os
+import uuid
+import shutil
+import socket
+import asyncio
+from pathlib import Path
+from datetime import datetime, timedelta
+from fastapi import UploadFile
+from pymongo import ReturnDocument
+from app.config.settings import settings
+from app.auth.models import UserModel
+from app.client.models import ContactImportJobModel
+from app.core.constants.choices import ImportJobStatusChoices
+from app.config.logger import get_logger
+from .services import CampaignContactImportService
+
+logger = get_logger("Contact Import Jobs")
+
+
+class ContactImportJobService:
+    """Accepts an upload as a persisted import job for the background worker."""
+
+    def __init__(self, user: UserModel, campaign_uid: uuid.UUID, file: UploadFile):
+        self.user = user
+        self.campaign_uid = campaign_uid
+        self.file = file
+
+    async def create_job(self) -> ContactImportJobModel:
+        service = CampaignContactImportService(user=self.user, campaign_uid=self.campaign_uid, file=self.file)
+        await service.validate_campaign()
+        service.validate_file()
+
+        job_id = uuid.uuid4()
+        file_path = Path(settings.CONTACT_IMPORT_DIR) / f"{job_id}{Path(self.file.filename).suffix.lower()}"
+
+        def copy():
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            with file_path.open("wb") as target:
+                shutil.copyfileobj(self.file.file, target, length=1024 * 1024)
+
+        await asyncio.to_thread(copy)
+
+        job = ContactImportJobModel(
+            id=job_id,
+            user=self.user,
+            campaign=service.campaign,
+            filename=self.file.filename,
+            file_path=str(file_path),
+        )
+        await job.insert()
+        contact_import_worker.notify()
+        return job
+
+
+class LeaseLost(Exception):
+    """The job's lease was taken over by another worker."""
+
+
+class ContactImportWorker:
+    """
+    Runs import jobs in the background.
+
+    A job is leased while it runs and the lease is renewed on a timer, so a
+    job whose worker died is picked up again once the lease expires and
+    resumes after its last committed chunk. A worker that finds its lease
+    gone stops importing and leaves the job to the new owner.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    @property
+    def collection(self):
+        return ContactImportJobModel.get_motor_collection()
+
+    def notify(self):
+        self._wakeup.set()
+
+    # Lifecycle
+    async def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(settings.CONTACT_IMPORT_WORKERS)]
+        logger.info(f"Contact import worker started ({self.worker_id})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Jobs cut short here are resumed by the next worker to start
+        await self.collection.update_many(
+            {"lease_owner": self.worker_id, "status": ImportJobStatusChoices.PROCESSING.value},
+            {"$set": {"lease_owner": None, "lease_until": None}},
+        )
+        logger.info("Contact import worker stopped")
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self._claim()
+                if job:
+                    await self._process(job)
+                    continue
+            except Exception as e:
+                logger.exception(f"Contact import worker error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.CONTACT_IMPORT_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> dict | None:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": ImportJobStatusChoices.PENDING.value},
+                {"status": ImportJobStatusChoices.PROCESSING.value, "lease_until": None},
+                {"status": ImportJobStatusChoices.PROCESSING.value, "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": ImportJobStatusChoices.PROCESSING.value,
+                    "lease_owner": self.worker_id,
+                    "lease_until": self._lease_expiry(),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _lease_expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=settings.CONTACT_IMPORT_LEASE_SECONDS)
+
+    # Processing
+    async def _process(self, job: dict):
+        job_id = job["_id"]
+        if not job.get("started_at"):
+            await self.collection.update_one({"_id": job_id}, {"$set": {"started_at": datetime.utcnow()}})
+        if job["chunks_committed"]:
+            logger.info(f"Resuming import job {job_id} after chunk {job['chunks_committed']}")
+
+        async def commit_chunk(index: int, report: dict):
+            result = await self.collection.update_one(
+                {"_id": job_id, "lease_owner": self.worker_id},
+                {
+                    "$set": {"chunks_committed": index + 1, "lease_until": self._lease_expiry()},
+                    "$inc": {
+                        "rows_processed": report["rows"],
+                        "rows_inserted": report["inserted"],
+                        "rows_updated": report["updated"],
+                        "rows_duplicate": report["duplicate"],
+                        "rows_skipped": report["skipped"],
+                    },
+                },
+            )
+            if not result.matched_count:
+                raise LeaseLost()
+
+        importing = asyncio.create_task(self._import(job, commit_chunk))
+        renewing = asyncio.create_task(self._renew_lease(job_id, importing))
+        try:
+            await importing
+        except LeaseLost:
+            logger.warning(f"Import job {job_id} lost its lease, left to the new owner")
+            return
+        except asyncio.CancelledError:
+            if renewing.done() and not renewing.cancelled() and renewing.result():
+                logger.warning(f"Import job {job_id} lost its lease, left to the new owner")
+                return
+            raise
+        except Exception as e:
+            await self._fail(job, e)
+            return
+        finally:
+            importing.cancel()
+            renewing.cancel()
+            await asyncio.gather(importing, renewing, return_exceptions=True)
+
+        await self._finish(job, ImportJobStatusChoices.COMPLETED)
+        logger.info(f"Import job {job_id} completed")
+
+    async def _import(self, job: dict, commit_chunk):
+        user = await UserModel.get(job["user"].id)
+        with open(job["file_path"], "rb") as handle:
+            upload = UploadFile(file=handle, filename=job["filename"])
+            service = CampaignContactImportService(
+                user=user,
+                campaign_uid=job["campaign"].id,
+                file=upload,
+            )
+            await service.import_contacts(skip_chunks=job["chunks_committed"], on_chunk=commit_chunk)
+
+    async def _renew_lease(self, job_id, importing: asyncio.Task) -> bool:
+        """Extend the lease until the import ends; cancel it and return True if the lease is gone."""
+        while True:
+            await asyncio.sleep(settings.CONTACT_IMPORT_LEASE_SECONDS / 3)
+            result = await self.collection.update_one(
+                {"_id": job_id, "lease_owner": self.worker_id},
+                {"$set": {"lease_until": self._lease_expiry()}},
+            )
+            if not result.matched_count:
+                importing.cancel()
+                return True
+
+    async def _fail(self, job: dict, error: Exception):
+        message = getattr(error, "message", None) or str(error)
+        logger.warning(f"Import job {job['_id']} failed (attempt {job['attempts']}): {message}")
+        await self.collection.update_one({"_id": job["_id"]}, {"$push": {"errors": message}})
+
+        if job["attempts"] >= settings.CONTACT_IMPORT_MAX_ATTEMPTS:
+            await self._finish(job, ImportJobStatusChoices.FAILED)
+        else:
+            # Leave it to be claimed again once the lease runs out
+            await self.collection.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"lease_owner": None, "lease_until": self._lease_expiry()}},
+            )
+
+    async def _finish(self, job: dict, status: ImportJobStatusChoices):
+        await self.collection.update_one(
+            {"_id": job["_id"]},
+            {"$set": {
+                "status": status.value,
+                "finished_at": datetime.utcnow(),
+                "lease_owner": None,
+                "lease_until": None,
+            }},
+        )
+        Path(job["file_path"]).unlink(missing_ok=True)
+
+
+contact_import_worker = ContactImportWorker()
@@ -0,0 +1,106 @@
+"""
+One-off migration of stored contact numbers to E.164, ahead of the unique
+(campaign, phone_number) index.
+
+Contacts written before numbers were normalized keep their original format,
+so a re-import of the same number would not match them, and two spellings
+of one number become duplicates once normalized. For each campaign this:
+
+- rewrites every number that normalizes to its E.164 form (numbers that do
+  not are left as they are);
+- merges contacts that share a number: the one with the most calls (then the
+  oldest) is kept, the calls of the others are relinked to it and they are
+  deleted;
+
+and then converts the index to unique. Safe to re-run:
+
+    python -m app.client.campaign.phone_backfill
+"""
+import asyncio
+from bson import DBRef
+from pymongo import UpdateOne
+from app.client.models import CallModel, CampaignContactsModel
+from app.client.counters import increment_counter, CONTACTS, CAMPAIGN_CONTACTS
+from app.core.utils.helpers import normalize_phone_number
+from app.core.utils.search import search_keys
+
+PROJECTION = {"campaign": 1, "user": 1, "phone_number": 1, "no_of_calls": 1, "created_at": 1}
+
+
+def _keeper_order(contact: dict):
+    # Most calls first, then the oldest, so dial history is what survives
+    return -(contact.get("no_of_calls") or 0), contact.get("created_at") is None, contact.get("created_at")
+
+
+async def normalize_campaign_phones(campaign_ref) -> dict:
+    """Normalize and merge the numbers of one campaign's contacts."""
+    contacts_collection = CampaignContactsModel.get_motor_collection()
+    report = {"normalized": 0, "merged": 0}
+
+    groups: dict[str, list[dict]] = {}
+    async for contact in contacts_collection.find({"campaign": campaign_ref}, projection=PROJECTION):
+        number = normalize_phone_number(contact.get("phone_number")) or contact.get("phone_number")
+        groups.setdefault(number, []).append(contact)
+
+    removed_by_user: dict = {}
+    updates = []
+    for number, contacts in groups.items():
+        keeper, *duplicates = sorted(contacts, key=_keeper_order)
+        if duplicates:
+            duplicate_ids = [contact["_id"] for contact in duplicates]
+            await CallModel.get_motor_collection().update_many(
+                {"campaign_contact.$id": {"$in": duplicate_ids}},
+                {"$set": {"campaign_contact": DBRef(CampaignContactsModel.Settings.name, keeper["_id"])}},
+            )
+            await contacts_collection.delete_many({"_id": {"$in": duplicate_ids}})
+            report["merged"] += len(duplicates)
+            for contact in duplicates:
+                user_id = contact["user"].id if contact.get("user") else None
+                removed_by_user[user_id] = removed_by_user.get(user_id, 0) + 1
+
+        if number != keeper.get("phone_number"):
+            updates.append(UpdateOne(
+                {"_id": keeper["_id"]},
+                {"$set": {"phone_number": number, **search_keys(CampaignContactsModel, {"phone_number": number})}},
+            ))
+
+    # After the deletes, so a rewritten number never collides with a duplicate
+    if updates:
+        await contacts_collection.bulk_write(updates, ordered=False)
+        report["normalized"] += len(updates)
+
+    for user_id, removed in removed_by_user.items():
+        await increment_counter(user_id, CONTACTS, -removed)
+    await increment_counter(campaign_ref.id, CAMPAIGN_CONTACTS, -report["merged"])
+    return report
+
+
+async def normalize_contact_phones() -> dict:
+    """Run `normalize_campaign_phones` over every campaign that has contacts."""
+    report = {"campaigns": 0, "normalized": 0, "merged": 0}
+    campaigns = CampaignContactsModel.get_motor_collection().aggregate([
+        {"$match": {"campaign": {"$ne": None}}},
+        {"$group": {"_id": "$campaign"}},
+    ])
+    async for group in campaigns:
+        campaign_report = await normalize_campaign_phones(group["_id"])
+        report["campaigns"] += 1
+        report["normalized"] += campaign_report["normalized"]
+        report["merged"] += campaign_report["merged"]
+    return report
+
+
+async def main():
+    from app.config.database import init_db, convert_unique_indexes
+
+    database = await init_db(require_unique_indexes=False)
+    report = await normalize_contact_phones()
+    print(f"{report['campaigns']} campaigns: {report['normalized']} numbers normalized, "
+          f"{report['merged']} duplicate contacts merged")
+    failures = await convert_unique_indexes(database)
+    for failure in failures:
+        print(f"failed: {failure}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+Streaming readers for contact import files.
+
+Each reader takes the open upload and yields DataFrames of at most
+`chunk_size` rows with every value as text, so memory use is bounded by the
+chunk size rather than the file size.
+"""
+import zipfile
+import pandas as pd
+from datetime import datetime
+from typing import IO, Iterator
+from xml.etree.ElementTree import iterparse
+from openpyxl import load_workbook
+
+ODS_TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+ODS_OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+ODS_TABLE = f"{{{ODS_TABLE_NS}}}table"
+ODS_ROW = f"{{{ODS_TABLE_NS}}}table-row"
+ODS_CELL = f"{{{ODS_TABLE_NS}}}table-cell"
+ODS_COVERED_CELL = f"{{{ODS_TABLE_NS}}}covered-table-cell"
+ODS_VALUE_ATTRIBUTES = {
+    "float": "value",
+    "percentage": "value",
+    "currency": "value",
+    "date": "date-value",
+    "time": "time-value",
+    "boolean": "boolean-value",
+}
+
+
+def iter_csv_chunks(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+
+def iter_xlsx_chunks(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """First worksheet, read row by row through openpyxl's read-only mode."""
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        yield from _chunk_rows(rows, chunk_size)
+    finally:
+        workbook.close()
+
+
+def iter_ods_chunks(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """First sheet, parsed incrementally from the document's content.xml."""
+    with zipfile.ZipFile(file) as archive, archive.open("content.xml") as content:
+        yield from _chunk_rows(_iter_ods_rows(content), chunk_size)
+
+
+def iter_xls_chunks(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    # The legacy binary format can only be loaded whole (and is capped at 65,536 rows)
+    frame = pd.read_excel(file, dtype=str).fillna("")
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size]
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return str(value)
+    return str(value).strip()
+
+
+def _chunk_rows(rows: Iterator[tuple], chunk_size: int) -> Iterator[pd.DataFrame]:
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [_cell_text(value) or f"Unnamed: {index}" for index, value in enumerate(header)]
+    width = len(columns)
+
+    batch = []
+    for row in rows:
+        values = [_cell_text(value) for value in row[:width]]
+        if not any(values):
+            continue  # blank spreadsheet rows
+        values.extend([""] * (width - len(values)))
+        batch.append(values)
+        if len(batch) >= chunk_size:
+            yield pd.DataFrame(batch, columns=columns, dtype=str)
+            batch = []
+
+    if batch:
+        yield pd.DataFrame(batch, columns=columns, dtype=str)
+
+
+def _iter_ods_rows(content: IO[bytes]) -> Iterator[list]:
+    stack = []
+    for event, element in iterparse(content, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            continue
+
+        stack.pop()
+        if element.tag == ODS_TABLE:
+            return  # only the first sheet
+        if element.tag != ODS_ROW:
+            continue
+
+        row = []
+        for cell in element:
+            if cell.tag not in (ODS_CELL, ODS_COVERED_CELL):
+                continue
+            repeat = int(cell.get(f"{{{ODS_TABLE_NS}}}number-columns-repeated", 1))
+            row.extend([_ods_cell_value(cell)] * min(repeat, 1024))
+
+        # Trailing empty rows are stored once with a huge repeat count; skip them
+        if any(row):
+            repeat = int(element.get(f"{{{ODS_TABLE_NS}}}number-rows-repeated", 1))
+            for _ in range(repeat):
+                yield row
+
+        # Drop parsed rows so the tree never holds more than one
+        if stack:
+            stack[-1].remove(element)
+
+
+def _ods_cell_value(cell) -> str:
+    value_type = cell.get(f"{{{ODS_OFFICE_NS}}}value-type")
+    attribute = ODS_VALUE_ATTRIBUTES.get(value_type)
+    if attribute:
+        value = cell.get(f"{{{ODS_OFFICE_NS}}}{attribute}", "")
+        if value_type == "float" and value.endswith(".0"):
+            value = value[:-2]
+        return value
+    return "\n".join("".join(paragraph.itertext()) for paragraph in cell).strip()
@@ -1,5 +1,5 @@
-from math import ceil
 from uuid import UUID
+from typing import Optional
 from fastapi import (
     APIRouter, 
     status, 
@@ -10,6 +10,7 @@ from fastapi import (
     UploadFile
 )
 from beanie.operators import RegEx
+from pymongo.errors import DuplicateKeyError
 from app.core.exceptions.base import (
     AppException,
     NotFoundException
@@ -22,8 +23,10 @@ from app.auth.models import (
 )
 from ..models import (
     AgentModel,
+    AgentSummaryView,
     CampaignModel,
     CampaignContactsModel,
+    ContactImportJobModel,
 )
 from .schemas import (
     APIBaseResponse,
@@ -40,11 +43,24 @@ from .schemas import (
     CampaignContactModifyPayloadSchema,
 
     CampaignInfoSchema,
+
+    ContactImportJobInfoSchema,
+
+    CampaignDialerStartPayloadSchema,
+    CampaignDialerActionPayloadSchema,
+    CampaignDialerInfoSchema,
+)
+from .import_jobs import (
+    ContactImportJobService
 )
-from .services import (
-    CampaignContactImportService
+from .dialer import (
+    campaign_dialer
 )
 
+from app.core.utils.pagination import paginate
+from app.core.utils.link_loader import LinkLoader
+from app.core.utils.search import search_condition, search_keys
+from app.client.counters import increment_counter, read_counter, CAMPAIGNS, CONTACTS, CAMPAIGN_CONTACTS
 from app.config.logger import get_logger
 
 
@@ -77,6 +93,7 @@ async def create_campaign(
         name=payload.name
     )
     await campaign.insert()
+    await increment_counter(user.id, CAMPAIGNS)
 
     return APIBaseResponse(
         status=True,
@@ -95,9 +112,9 @@ async def retrieve_my_campaigns(
     filters: CampaignFilterParams = Depends(),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(True, description="false skips counting total_records"),
 ):
-    skip = (page - 1) * page_size
-
     filter_conditions = [
         CampaignModel.user.id == user.id
     ]
@@ -113,36 +130,30 @@ async def retrieve_my_campaigns(
     else:
         filter_conditions.append(CampaignModel.is_deleted == False)
 
-    total_records = await CampaignModel.find(*filter_conditions).count()
-
-    all_campaigns = (
-        await CampaignModel.find(*filter_conditions, fetch_links=True)
-        .sort(-CampaignModel.created_at)
-        .skip(skip)
-        .limit(page_size)
-        .to_list()
+    # Unfiltered, the total is the user's campaign counter (live campaigns only)
+    total_records = None
+    if include_total and not filters.model_dump(exclude_none=True, exclude={"is_deleted"}) and not filters.is_deleted:
+        total_records = await read_counter(user.id, CAMPAIGNS)
+
+    all_campaigns, meta = await paginate(
+        CampaignModel,
+        filter_conditions,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        total_records=total_records,
     )
+    await LinkLoader().resolve(all_campaigns, "agent", AgentSummaryView)
 
     serialized_campaigns = [
         CampaignInfoSchema.model_validate(campaign) for campaign in all_campaigns
     ]
 
-    # Calculate pagination flags
-    total_pages = ceil(total_records / page_size)
-    is_next = page < total_pages
-    is_previous = page > 1
-
     return PaginaionResponse(
         status = True,
         message = "All campaigns retrieved successfully",
-        meta = PaginationMeta(
-            page_size = page_size,
-            page = page,
-            total_records = total_records,
-            total_pages = total_pages,
-            is_next = is_next,
-            is_previous = is_previous,
-        ),
+        meta = PaginationMeta(**meta),
         data = serialized_campaigns
     )
 
@@ -218,6 +229,7 @@ async def delete_campaign(
         )
 
     await campaign.set({"is_deleted": True})
+    await increment_counter(user.id, CAMPAIGNS, -1)
 
     return APIBaseResponse(
         status=True,
@@ -244,19 +256,19 @@ async def create_campaign_contact(
     if not campaign:
         raise NotFoundException("Campaign not found")
     
-    # check if contact already exists in same campaign
-    if await CampaignContactsModel.find(
-        CampaignContactsModel.phone_number == payload.phone_number
-    ).count() > 0:
-        raise AppException("This phone Number already exists in this campaign")
-
     data = payload.dict(exclude={"campaign_uid"})
     campaign_contact = CampaignContactsModel(
         user=user,
         campaign=campaign,
         **data
     )
-    await campaign_contact.insert()
+    # the unique (campaign, phone_number) index rejects a number already in this campaign
+    try:
+        await campaign_contact.insert()
+    except DuplicateKeyError:
+        raise AppException("This phone Number already exists in this campaign")
+    await increment_counter(user.id, CONTACTS)
+    await increment_counter(campaign.id, CAMPAIGN_CONTACTS)
 
     return APIBaseResponse(
         status=True,
@@ -275,9 +287,9 @@ async def retrieve_my_campaigns_contacts(
     filters: CampaignContactFilterParams = Depends(),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(True, description="false skips counting total_records"),
 ):
-    skip = (page - 1) * page_size
-
     filter_conditions = [
         CampaignContactsModel.user.id == user.id
     ]
@@ -285,46 +297,45 @@ async def retrieve_my_campaigns_contacts(
     if filters.id:
         filter_conditions.append(CampaignContactsModel.id == filters.id)
     if filters.campaign_id:
+        # Also guards the campaign's contact counter below
+        campaign = await CampaignModel.find_one(
+            CampaignModel.id == filters.campaign_id,
+            CampaignModel.user.id == user.id,
+        )
+        if not campaign:
+            raise NotFoundException("Campaign not found")
         filter_conditions.append(CampaignContactsModel.campaign.id == filters.campaign_id)
-    if filters.phone_number:
-        filter_conditions.append(RegEx(CampaignContactsModel.phone_number, f".*{filters.phone_number}.*", options="i"))
-    if filters.first_name:
-        filter_conditions.append(RegEx(CampaignContactsModel.first_name, f".*{filters.first_name}.*", options="i"))
-    if filters.last_name:
-        filter_conditions.append(RegEx(CampaignContactsModel.last_name, f".*{filters.last_name}.*", options="i"))
-    if filters.email:
-        filter_conditions.append(RegEx(CampaignContactsModel.email, f".*{filters.email}.*", options="i"))
-
-    total_records = await CampaignContactsModel.find(*filter_conditions).count()
-
-    all_campaigns_contacts = (
-        await CampaignContactsModel.find(*filter_conditions, fetch_links=True)
-        .sort(-CampaignContactsModel.created_at)
-        .skip(skip)
-        .limit(page_size)
-        .to_list()
+    for field in CampaignContactsModel.SEARCH_FIELDS:
+        if getattr(filters, field):
+            filter_conditions.append(search_condition(CampaignContactsModel, field, getattr(filters, field)))
+
+    # Unfiltered, or filtered by campaign only, the total is a contact counter
+    total_records = None
+    if include_total:
+        active = filters.model_dump(exclude_none=True)
+        if not active:
+            total_records = await read_counter(user.id, CONTACTS)
+        elif list(active) == ["campaign_id"]:
+            total_records = await read_counter(filters.campaign_id, CAMPAIGN_CONTACTS)
+
+    all_campaigns_contacts, meta = await paginate(
+        CampaignContactsModel,
+        filter_conditions,
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        total_records=total_records,
     )
 
     serialized_campaigns_contacts = [
         CampaignContactResponseSchema.model_validate(campaign_contact) for campaign_contact in all_campaigns_contacts
     ]
 
-    # Calculate pagination flags
-    total_pages = ceil(total_records / page_size)
-    is_next = page < total_pages
-    is_previous = page > 1
-
     return PaginaionResponse(
         status = True,
         message = "All campaigns retrieved successfully",
-        meta = PaginationMeta(
-            page_size = page_size,
-            page = page,
-            total_records = total_records,
-            total_pages = total_pages,
-            is_next = is_next,
-            is_previous = is_previous,
-        ),
+        meta = PaginationMeta(**meta),
         data = serialized_campaigns_contacts
     )
 
@@ -358,10 +369,14 @@ async def modify_campaign_contact(
     update_data = payload.model_dump(exclude_unset=True)
     # update_data = payload.model_dump(exclude_unset=True, exclude_none=True)
     update_data.pop("campaign_contact_uid", None)
+    update_data.update(search_keys(CampaignContactsModel, update_data))
 
     # Step 3: Perform dynamic update only for provided fields
     if update_data:
-        await campaign_contact.set(update_data)
+        try:
+            await campaign_contact.set(update_data)
+        except DuplicateKeyError:
+            raise AppException("This phone Number already exists in this campaign")
 
     return APIBaseResponse(
         status=True,
@@ -390,6 +405,8 @@ async def delete_campaign_contact(
         raise AppException("Cannot delete contact because a conversation has already started")
 
     await campaign_contact.delete()
+    await increment_counter(user.id, CONTACTS, -1)
+    await increment_counter(campaign_contact.campaign.ref.id, CAMPAIGN_CONTACTS, -1)
     return APIBaseResponse(
         status=True,
         message="Campaign contact deleted successfully",
@@ -399,20 +416,151 @@ async def delete_campaign_contact(
 @campaign_router.post(
     "/contact/import",
     response_model=APIBaseResponse,
-    status_code=status.HTTP_201_CREATED,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def import_campaign_contacts(
     campaign_uid: UUID = Form(..., description="Campaign UUID"),
     file: UploadFile = File(..., description="CSV or Excel file"),
     user: UserModel = Depends(dependency=ProfileActive())
 ):
+    """
+    Queue the file for import; poll `/contact/import/status` for progress.
+    """
+    service = ContactImportJobService(user=user, campaign_uid=campaign_uid, file=file)
+    job = await service.create_job()
+
+    return APIBaseResponse(
+        status=True,
+        message="Contact import started",
+        data={"job_id": str(job.id)}
+    )
+
+
+@campaign_router.get(
+    "/contact/import/status",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def retrieve_contact_import_status(
+    job_uid: UUID = Query(..., description="Import job UUID"),
+    user: UserModel = Depends(dependency=ProfileActive())
+):
+    job = await ContactImportJobModel.find_one(
+        ContactImportJobModel.id == job_uid,
+        ContactImportJobModel.user.id == user.id
+    )
+    if not job:
+        raise NotFoundException("Import job not found")
+
+    return APIBaseResponse(
+        status=True,
+        message="Contact import status retrieved successfully",
+        data=ContactImportJobInfoSchema.model_validate(job)
+    )
+
+
+
+#### Campaign Dialer ####
+
+async def _get_active_campaign(campaign_uid: UUID, user: UserModel) -> CampaignModel:
+    campaign = await CampaignModel.find_one(
+        CampaignModel.id == campaign_uid,
+        CampaignModel.user.id == user.id,
+        CampaignModel.is_deleted == False
+    )
+    if not campaign:
+        raise NotFoundException("Campaign not found")
+    return campaign
+
+
+@campaign_router.post(
+    "/dialer/start",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK
+)
+async def start_campaign_dialer(
+    payload: CampaignDialerStartPayloadSchema,
+    user : UserModel = Depends(ProfileActive())
+):
+    """
+    Start calling the campaign's pending contacts server-side.
+    """
+    campaign = await _get_active_campaign(payload.campaign_uid, user)
+    dialer = await campaign_dialer.start_campaign(
+        user=user,
+        campaign=campaign,
+        config=payload.model_dump(exclude={"campaign_uid"}),
+    )
+
+    return APIBaseResponse(
+        status=True,
+        message="Campaign dialer started successfully",
+        data=CampaignDialerInfoSchema.model_validate(dialer)
+    )
+
+
+@campaign_router.post(
+    "/dialer/pause",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK
+)
+async def pause_campaign_dialer(
+    payload: CampaignDialerActionPayloadSchema,
+    user : UserModel = Depends(ProfileActive())
+):
+    """
+    Stop placing new calls; calls in progress are not affected.
+    """
+    campaign = await _get_active_campaign(payload.campaign_uid, user)
+    dialer = await campaign_dialer.pause_campaign(campaign.id)
 
-    service = CampaignContactImportService(user=user, campaign_uid=campaign_uid, file=file)
-    total_imported = await service.import_contacts()
+    return APIBaseResponse(
+        status=True,
+        message="Campaign dialer paused successfully",
+        data=CampaignDialerInfoSchema.model_validate(dialer)
+    )
+
+
+@campaign_router.post(
+    "/dialer/resume",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK
+)
+async def resume_campaign_dialer(
+    payload: CampaignDialerActionPayloadSchema,
+    user : UserModel = Depends(ProfileActive())
+):
+    campaign = await _get_active_campaign(payload.campaign_uid, user)
+    dialer = await campaign_dialer.resume_campaign(campaign.id)
 
     return APIBaseResponse(
         status=True,
-        message=f"{total_imported} contacts imported successfully",
+        message="Campaign dialer resumed successfully",
+        data=CampaignDialerInfoSchema.model_validate(dialer)
     )
 
 
+@campaign_router.get(
+    "/dialer/status",
+    response_model=APIBaseResponse,
+    status_code=status.HTTP_200_OK
+)
+async def retrieve_campaign_dialer_status(
+    campaign_uid: UUID = Query(..., description="Campaign UUID"),
+    user : UserModel = Depends(ProfileActive())
+):
+    """
+    Dialer settings and progress, with the number of contacts per dial status.
+    """
+    campaign = await _get_active_campaign(campaign_uid, user)
+    dialer = await campaign_dialer.get_dialer(campaign.id)
+    contacts = await campaign_dialer.get_progress(campaign.id)
+
+    return APIBaseResponse(
+        status=True,
+        message="Campaign dialer status retrieved successfully",
+        data={
+            "dialer": CampaignDialerInfoSchema.model_validate(dialer),
+            "contacts": contacts,
+        }
+    )
@@ -1,13 +1,21 @@
 from uuid import UUID
 from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from pydantic import (
     BaseModel,
     EmailStr,
     Field, 
+    computed_field,
+    field_validator,
+    model_validator,
+)
+from app.core.utils.helpers import (
+    normalize_phone_number
 )
 from typing import (
     Optional, 
     Dict,
+    List,
     Any
 )
 
@@ -21,11 +29,12 @@ class APIBaseResponse(BaseModel):
 
 class PaginationMeta(BaseModel):
     page_size: int
-    page: int
-    total_records: int
-    total_pages: int
+    page: Optional[int] = None  # None in cursor mode
+    total_records: Optional[int] = None  # None when include_total=false
+    total_pages: Optional[int] = None
     is_next: bool
     is_previous: bool
+    next_cursor: Optional[str] = None
 
 class PaginaionResponse(BaseModel):
     status: bool
@@ -90,6 +99,12 @@ class CampaignModifyPayloadSchema(BaseModel):
 
 #### Campaign Contact ####
 
+def validate_e164(value: str) -> str:
+    phone_number = normalize_phone_number(value)
+    if not phone_number:
+        raise ValueError("Invalid phone number")
+    return phone_number
+
 
 class CampaignContactCreatePayloadSchema(BaseModel):
     campaign_uid : UUID = Field(..., description="Campaign UUID")
@@ -99,6 +114,11 @@ class CampaignContactCreatePayloadSchema(BaseModel):
     email: Optional[EmailStr] = None
     dynamic_variables: Optional[Dict[str, Any]]  = None
 
+    @field_validator("phone_number")
+    @classmethod
+    def validate_phone_number(cls, value: str) -> str:
+        return validate_e164(value)
+
 
 class CampaignContactResponseSchema(BaseModel):
     id : UUID
@@ -139,4 +159,100 @@ class CampaignContactModifyPayloadSchema(BaseModel):
     email: Optional[EmailStr] = None
     dynamic_variables: Optional[Dict[str, Any]]  = None
 
+    @field_validator("phone_number")
+    @classmethod
+    def validate_phone_number(cls, value: str) -> str:
+        return validate_e164(value)
+
+
+
+#### Contact Import ####
+
+class ContactImportJobInfoSchema(BaseModel):
+    id: UUID
+    filename: str
+    status: str
+    chunks_committed: int
+    rows_processed: int
+    rows_inserted: int
+    rows_updated: int
+    rows_duplicate: int
+    rows_skipped: int
+    errors: List[str]
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def rows_per_sec(self) -> Optional[float]:
+        if not self.started_at:
+            return None
+        elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else None
+
+    class Config:
+        from_attributes = True
+        json_encoders = {
+            UUID: str,
+            datetime: lambda v: v.strftime("%d %b %Y, %I:%M %p")
+            if isinstance(v, datetime)
+            else v,
+        }
+
 
+#### Campaign Dialer ####
+
+HH_MM_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+
+
+class CampaignDialerStartPayloadSchema(BaseModel):
+    campaign_uid : UUID = Field(..., description="Campaign UUID")
+    from_number: str = Field(..., description="Caller number used for every call")
+    calls_per_second: float = Field(default=1.0, gt=0, le=20, description="New calls started per second")
+    max_concurrent_calls: int = Field(default=10, ge=1, le=500, description="Cap on calls in progress at once")
+    calling_hours_start: Optional[str] = Field(default=None, pattern=HH_MM_PATTERN, description="HH:MM")
+    calling_hours_end: Optional[str] = Field(default=None, pattern=HH_MM_PATTERN, description="HH:MM")
+    timezone: str = Field(default="UTC", description="IANA timezone of the calling hours")
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone '{value}'")
+        return value
+
+    @model_validator(mode="after")
+    def validate_calling_hours(self):
+        if bool(self.calling_hours_start) != bool(self.calling_hours_end):
+            raise ValueError("calling_hours_start and calling_hours_end must be set together")
+        return self
+
+
+class CampaignDialerActionPayloadSchema(BaseModel):
+    campaign_uid : UUID = Field(..., description="Campaign UUID")
+
+
+class CampaignDialerInfoSchema(BaseModel):
+    id: UUID
+    status: str
+    from_number: str
+    calls_per_second: float
+    max_concurrent_calls: int
+    calling_hours_start: Optional[str] = None
+    calling_hours_end: Optional[str] = None
+    timezone: str
+    dialed_count: int
+    failed_count: int
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        json_encoders = {
+            UUID: str,
+            datetime: lambda v: v.strftime("%d %b %Y, %I:%M %p")
+            if isinstance(v, datetime)
+            else v,
+        }
@@ -1,21 +1,42 @@
 import io
-import pandas as pd
+import os
+import uuid
+import pickle
+import shutil
+import asyncio
+import tempfile
+from bson import DBRef
+from pathlib import Path
+from contextlib import contextmanager
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime
 from fastapi import UploadFile
 from uuid import UUID
 from app.client.models import CampaignModel, CampaignContactsModel, UserModel
+from app.core.constants.choices import ContactDialStatusChoices
 from app.core.exceptions.base import AppException, NotFoundException
+from app.config.process_pool import cpu_pool
+from app.config.settings import settings
+from app.client.counters import increment_counter, CONTACTS, CAMPAIGN_CONTACTS
+from app.core.utils.search import search_field, search_keys
+from .contact_parser import (
+    ContactFileParser,
+    STOP_FILE,
+    spool_chunk_path,
+    spool_contact_file,
+)
 from math import ceil
 
 
 class CampaignContactImportService:
-    PHONE_KEYWORDS = ["phone", "mobile", "cell", "contact", "contact number", "telephone", "number"]
-    FIRST_NAME_KEYWORDS = ["first name", "fname", "given name"]
-    LAST_NAME_KEYWORDS = ["last name", "lname", "surname"]
-    NAME_KEYWORDS = ["name", "full name", "contact name"]
-    EMAIL_KEYWORDS = ["email", "e-mail", "mail address"]
+    MAX_FILE_SIZE_MB = settings.CONTACT_IMPORT_MAX_FILE_SIZE_MB
+    CHUNK_SIZE = 20000  # rows per chunk
+    INSERT_BATCH_SIZE = 1000
 
-    MAX_FILE_SIZE_MB = 200
-    CHUNK_SIZE = 5000  # rows per batch
+    # rows: read from the file, inserted: new contacts, updated: contacts already in
+    # the campaign, duplicate: phone number repeated within a chunk, skipped: no valid phone
+    REPORT_KEYS = ("rows", "inserted", "updated", "duplicate", "skipped")
 
     def __init__(self, user: UserModel, campaign_uid: UUID, file: UploadFile):
         self.user = user
@@ -23,12 +44,17 @@ class CampaignContactImportService:
         self.file = file
         self.campaign = None
 
-    async def import_contacts(self) -> int:
-        await self._validate_campaign()
-        total = await self._process_file()
-        return total
-
-    async def _validate_campaign(self):
+    async def import_contacts(self, *, skip_chunks: int = 0, on_chunk=None) -> dict:
+        """
+        Import the file and return the report counts (see REPORT_KEYS).
+        `skip_chunks` resumes after chunks already committed; `on_chunk` is
+        awaited with (chunk_index, chunk_report) after each chunk.
+        """
+        await self.validate_campaign()
+        self.validate_file()
+        return await self._process_file(skip_chunks=skip_chunks, on_chunk=on_chunk)
+
+    async def validate_campaign(self):
         campaign = await CampaignModel.find_one(
             CampaignModel.id == self.campaign_uid,
             CampaignModel.user.id == self.user.id
@@ -37,8 +63,9 @@ class CampaignContactImportService:
             raise NotFoundException("Campaign not found")
         self.campaign = campaign
 
-    async def _process_file(self) -> int:
-        filename = self.file.filename.lower()
+    def validate_file(self):
+        if ContactFileParser.reader_for(self.file.filename) is None:
+            raise AppException("Invalid file format.")
 
         # --- Validate file size ---
         self.file.file.seek(0, io.SEEK_END)
@@ -47,87 +74,143 @@ class CampaignContactImportService:
             raise AppException(f"File too large ({size_mb:.1f} MB). Limit {self.MAX_FILE_SIZE_MB} MB.")
         self.file.file.seek(0)
 
-        buffer = io.BytesIO(self.file.file.read())
-
-        if filename.endswith(".csv"):
-            reader = pd.read_csv(buffer, chunksize=self.CHUNK_SIZE)
-        elif filename.endswith((".xls", ".xlsx")):
-            reader = pd.read_excel(buffer)
-        elif filename.endswith(".ods"):
-            reader = pd.read_excel(buffer, engine="odf")
+    async def _process_file(self, *, skip_chunks: int = 0, on_chunk=None) -> dict:
+        """
+        Parsing runs in the CPU pool, which spools normalized chunks to disk
+        and returns as soon as the file is parsed; they are upserted here one
+        at a time as they appear, so the event loop only does I/O and the
+        database sets the pace without holding a pool worker.
+        """
+        report = dict.fromkeys(self.REPORT_KEYS, 0)
+        with self._source_path() as path, tempfile.TemporaryDirectory(prefix="contact_import_") as spool_dir:
+            parsing = asyncio.ensure_future(cpu_pool.run(
+                spool_contact_file, path, self.file.filename, self.CHUNK_SIZE, skip_chunks, spool_dir,
+            ))
+            try:
+                async for index, chunk in self._spooled_chunks(parsing, spool_dir, skip_chunks):
+                    chunk_report = await self._upsert_chunk(chunk)
+                    for key, count in chunk_report.items():
+                        report[key] += count
+                    if on_chunk:
+                        await on_chunk(index, chunk_report)
+            finally:
+                Path(spool_dir, STOP_FILE).touch()
+                await asyncio.gather(parsing, return_exceptions=True)
+
+        return report
+
+    async def _spooled_chunks(self, parsing: asyncio.Future, spool_dir: str, index: int):
+        while True:
+            chunk_path = spool_chunk_path(spool_dir, index)
+            if chunk_path.exists():
+                with chunk_path.open("rb") as handle:
+                    chunk = pickle.load(handle)
+                chunk_path.unlink()
+                yield index, chunk
+                index += 1
+            elif parsing.done():
+                if index >= parsing.result():  # re-raises parse errors
+                    return
+            else:
+                await asyncio.wait({parsing}, timeout=0.05)
+
+    @contextmanager
+    def _source_path(self):
+        """The upload's path on disk; uploads held in memory are written to a temporary file."""
+        name = getattr(self.file.file, "name", None)
+        if isinstance(name, str) and os.path.isfile(name):
+            yield name
+            return
+
+        with tempfile.NamedTemporaryFile(suffix=Path(self.file.filename).suffix) as temporary:
+            self.file.file.seek(0)
+            shutil.copyfileobj(self.file.file, temporary, length=1024 * 1024)
+            temporary.flush()
+            yield temporary.name
+
+    async def _upsert_chunk(self, chunk: dict) -> dict:
+        """
+        Upsert a parsed chunk's contacts on the unique (campaign, phone_number) index;
+        a number already in the campaign updates that contact instead.
+        """
+        report = {key: chunk.get(key, 0) for key in self.REPORT_KEYS}
+        phones = chunk["phone_number"].tolist()
+        if not phones:
+            return report
+
+        first_names, last_names, emails = (
+            [value or None for value in chunk[field].tolist()]
+            for field in ("first_name", "last_name", "email")
+        )
+        dynamic = chunk["dynamic_variables"]
+        if dynamic:
+            names = list(dynamic)
+            dynamic_variables = [dict(zip(names, row)) for row in zip(*(dynamic[name].tolist() for name in names))]
         else:
-            raise AppException("Invalid file format.")
-
-        total_inserted = 0
-        chunks = [reader] if not isinstance(reader, pd.io.parsers.TextFileReader) else reader
-
-        for chunk in chunks:
-            df = self._normalize_columns(chunk)
-            inserted = await self._insert_chunk(df)
-            total_inserted += inserted
-
-        return total_inserted
-
-    def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        df.columns = [col.strip().lower() for col in df.columns]
-        return df
-
-    async def _insert_chunk(self, df: pd.DataFrame) -> int:
-        phone_col = self._find_column(df.columns, self.PHONE_KEYWORDS)
-        if not phone_col:
-            raise AppException("No phone column found")
-
-        first_name_col = self._find_column(df.columns, self.FIRST_NAME_KEYWORDS)
-        last_name_col = self._find_column(df.columns, self.LAST_NAME_KEYWORDS)
-        full_name_col = self._find_column(df.columns, self.NAME_KEYWORDS)
-        email_col = self._find_column(df.columns, self.EMAIL_KEYWORDS)
-
-        contacts = []
-        for _, row in df.iterrows():
-            phone = str(row.get(phone_col, "")).strip()
-            if not phone:
-                continue
-
-            first_name, last_name = self._extract_name(row, first_name_col, last_name_col, full_name_col)
-            email = str(row.get(email_col, "")).strip() if email_col else None
-
-            data = {
-                "user": self.user,
-                "campaign": self.campaign,
-                "phone_number": phone,
-                "first_name": first_name or None,
-                "last_name": last_name or None,
-                "email": email or None,
-                "dynamic_variables": {
-                    col.replace(" ", "_"): row.get(col)
-                    for col in df.columns
-                    if col not in {phone_col, first_name_col, last_name_col, full_name_col, email_col}
-                },
-            }
-            contacts.append(CampaignContactsModel(**data))
-
-        # Batch insert in DB (safe for large sets)
-        if contacts:
-            for i in range(0, len(contacts), 1000):
-                batch = contacts[i:i + 1000]
-                await CampaignContactsModel.insert_many(batch)
-
-        return len(contacts)
-
-    def _find_column(self, columns, keywords):
-        for col in columns:
-            for key in keywords:
-                if key in col:
-                    return col
-        return None
-
-    def _extract_name(self, row, first_name_col, last_name_col, full_name_col):
-        if first_name_col or last_name_col:
-            first_name = str(row.get(first_name_col, "")).strip() if first_name_col else None
-            last_name = str(row.get(last_name_col, "")).strip() if last_name_col else None
-            return first_name, last_name
-        if full_name_col:
-            full = str(row.get(full_name_col, "")).strip()
-            parts = full.split(" ", 1)
-            return parts[0], parts[1] if len(parts) > 1 else None
-        return None, None
+            dynamic_variables = [None] * len(phones)
+
+        # Values from the file overwrite an existing contact; dial state and call counts are kept
+        now = datetime.utcnow()
+        user_ref = DBRef(UserModel.get_collection_name(), self.user.id)
+        campaign_ref = DBRef(CampaignModel.get_collection_name(), self.campaign.id)
+        rows = list(zip(phones, first_names, last_names, emails, dynamic_variables))
+
+        # Unordered batches: one round trip each, the unique index settles races.
+        # Operations are built per batch so the loop gets back control between them.
+        collection = CampaignContactsModel.get_motor_collection()
+        inserted = report["inserted"]
+        for i in range(0, len(rows), self.INSERT_BATCH_SIZE):
+            batch = [
+                self._upsert_operation(row, campaign_ref=campaign_ref, user_ref=user_ref, now=now)
+                for row in rows[i:i + self.INSERT_BATCH_SIZE]
+            ]
+            try:
+                result = await collection.bulk_write(batch, ordered=False)
+                report["inserted"] += result.upserted_count
+                report["updated"] += result.matched_count
+            except BulkWriteError as e:
+                # Another import upserted the same number first
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                report["inserted"] += e.details.get("nUpserted", 0)
+                report["updated"] += e.details.get("nMatched", 0)
+                report["duplicate"] += len(errors)
+
+        inserted = report["inserted"] - inserted
+        await increment_counter(self.user.id, CONTACTS, inserted)
+        await increment_counter(self.campaign.id, CAMPAIGN_CONTACTS, inserted)
+        return report
+
+    @staticmethod
+    def _upsert_operation(row: tuple, *, campaign_ref: DBRef, user_ref: DBRef, now: datetime) -> UpdateOne:
+        phone, first_name, last_name, email, variables = row
+        values = {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "dynamic_variables": variables,
+        }
+        on_insert = {
+            "_id": uuid.uuid4(),
+            "created_at": now,
+            "user": user_ref,
+            "no_of_calls": 0,
+            "dial_status": ContactDialStatusChoices.PENDING.value,
+            **search_keys(CampaignContactsModel, {"phone_number": phone}),
+        }
+        update = {"updated_at": now}
+        keys = search_keys(CampaignContactsModel, values)
+        for field, value in values.items():
+            target = update if value is not None else on_insert
+            if value is None:
+                value = {} if field == "dynamic_variables" else None
+            target[field] = value
+            # Search keys go with their field: replaced with a new value, empty on insert without one
+            if search_field(field) in keys:
+                target[search_field(field)] = keys[search_field(field)]
+        return UpdateOne(
+            {"campaign": campaign_ref, "phone_number": phone},
+            {"$set": update, "$setOnInsert": on_insert},
+            upsert=True,
+        )
@@ -0,0 +1,204 @@
+"""
+Materialized list totals per user and per campaign, kept in RecordCounterModel.
+
+List pages without filters read their `total_records` from here instead of
+counting the owner's documents on every request. The write paths that
+create or remove calls, campaigns and contacts adjust the counts with $inc.
+A count is only trusted once the reconciler has set it from a real count;
+until then, and whenever filters are active, the list counts as before.
+
+The reconciler recounts every counter in the background and corrects drift,
+e.g. from a write that failed between the document and its counter update.
+It runs every RECORD_COUNTERS_RECONCILE_INTERVAL_SECONDS in whichever process
+takes its lease (TaskLeaseModel), not in every worker, and not at startup
+unless RECORD_COUNTERS_RECONCILE_ON_STARTUP is set. To run it once by hand:
+
+    python -m app.client.counters
+"""
+import os
+import uuid
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from app.config.settings import settings
+from app.client.models import (
+    CallModel,
+    CampaignModel,
+    CampaignContactsModel,
+    RecordCounterModel,
+    TaskLeaseModel,
+)
+from app.config.database import init_db
+from app.config.logger import get_logger
+
+logger = get_logger("Record Counters")
+
+CALLS = "calls"
+CAMPAIGNS = "campaigns"
+CONTACTS = "contacts"
+CAMPAIGN_CONTACTS = "campaign_contacts"
+
+RECONCILE_TASK = "reconcile_record_counters"
+LEASE_POLL_SECONDS = 5 * 60  # how often each process checks whether a run is due
+
+# (counter, model, owner link field, filter)
+COUNTERS = [
+    (CALLS, CallModel, "user", {}),
+    (CAMPAIGNS, CampaignModel, "user", {"is_deleted": False}),
+    (CONTACTS, CampaignContactsModel, "user", {}),
+    (CAMPAIGN_CONTACTS, CampaignContactsModel, "campaign", {}),
+]
+
+
+async def increment_counter(owner_id: uuid.UUID | None, name: str, by: int = 1):
+    if owner_id is None or not by:
+        return
+    now = datetime.utcnow()
+    await RecordCounterModel.get_motor_collection().update_one(
+        {"_id": owner_id},
+        {
+            "$inc": {f"counts.{name}": by},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"created_at": now},
+        },
+        upsert=True,
+    )
+
+
+async def read_counter(owner_id: uuid.UUID, name: str) -> int | None:
+    """The owner's count, or None until it has been reconciled."""
+    counter = await RecordCounterModel.get_motor_collection().find_one(
+        {"_id": owner_id},
+        projection={f"counts.{name}": 1, f"reconciled.{name}": 1},
+    )
+    if not counter or name not in counter.get("reconciled", {}):
+        return None
+    return max(0, counter.get("counts", {}).get(name, 0))
+
+
+async def reconcile_counters() -> int:
+    """
+    Set every counter from a real count. Returns the counters written.
+
+    Each count is written only if the counter still holds the value read
+    before counting, so an $inc landing meanwhile is never overwritten; that
+    counter is left for the next run.
+    """
+    collection = RecordCounterModel.get_motor_collection()
+    written = 0
+    for name, model, owner, query in COUNTERS:
+        now = datetime.utcnow()
+        before = {
+            counter["_id"]: counter.get("counts", {}).get(name)
+            async for counter in collection.find({}, projection={f"counts.{name}": 1})
+        }
+        # Grouped by the whole link (DBRef); its id is the owner's _id
+        counts = {
+            group["_id"].id: group["count"]
+            async for group in model.get_motor_collection().aggregate([
+                {"$match": {**query, owner: {"$ne": None}}},
+                {"$group": {"_id": f"${owner}", "count": {"$sum": 1}}},
+            ])
+        }
+        # Owners with nothing left still hold their last count; zero them
+        stale = collection.find(
+            {f"reconciled.{name}": {"$exists": True}, "_id": {"$nin": list(counts)}},
+            projection={"_id": 1},
+        )
+        counts.update({counter["_id"]: 0 async for counter in stale})
+
+        operations = []
+        for owner_id, count in counts.items():
+            if owner_id in before:
+                operations.append(UpdateOne(
+                    {"_id": owner_id, f"counts.{name}": before[owner_id]},
+                    {"$set": {f"counts.{name}": count, f"reconciled.{name}": now, "updated_at": now}},
+                ))
+            else:
+                # A counter created meanwhile by $inc is left as it is
+                operations.append(UpdateOne(
+                    {"_id": owner_id},
+                    {"$setOnInsert": {
+                        f"counts.{name}": count,
+                        f"reconciled.{name}": now,
+                        "created_at": now,
+                        "updated_at": now,
+                    }},
+                    upsert=True,
+                ))
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            written += result.modified_count + result.upserted_count
+    return written
+
+
+class CounterReconciler:
+    """Runs `reconcile_counters` on an interval, in one process at a time."""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                if await self._acquire():
+                    written = await reconcile_counters()
+                    logger.info(f"Reconciled {written} record counters")
+            except Exception as e:
+                logger.exception(f"Record counter reconciliation failed: {e}")
+            await asyncio.sleep(min(LEASE_POLL_SECONDS, settings.RECORD_COUNTERS_RECONCILE_INTERVAL_SECONDS))
+
+    async def _acquire(self) -> bool:
+        """Take the run that is due, if any; its lease lasts until the next one."""
+        collection = TaskLeaseModel.get_motor_collection()
+        now = datetime.utcnow()
+        first_run = None if settings.RECORD_COUNTERS_RECONCILE_ON_STARTUP else now + self._interval()
+        await collection.update_one(
+            {"name": RECONCILE_TASK},
+            {"$setOnInsert": {
+                "_id": uuid.uuid4(),
+                "lease_owner": None,
+                "lease_until": first_run,
+                "created_at": now,
+                "updated_at": now,
+            }},
+            upsert=True,
+        )
+        result = await collection.update_one(
+            {
+                "name": RECONCILE_TASK,
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+            },
+            {"$set": {"lease_owner": self.worker_id, "lease_until": now + self._interval(), "updated_at": now}},
+        )
+        return bool(result.matched_count)
+
+    @staticmethod
+    def _interval() -> timedelta:
+        return timedelta(seconds=settings.RECORD_COUNTERS_RECONCILE_INTERVAL_SECONDS)
+
+
+counter_reconciler = CounterReconciler()
+
+
+async def main():
+    await init_db()
+    print(f"Reconciled {await reconcile_counters()} record counters")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,14 @@
 import httpx
 import io
-from retell import Retell
 from fastapi import HTTPException, status
 from app.config.settings import settings
+from app.config.retell import retell_gateway
 from app.core.exceptions.base import InternalServerErrorException
 
 from app.config.logger import get_logger
 
 logger = get_logger("Knowledge Base service")
 
-client = Retell(api_key=settings.retell_api_key)
-
 
 class RetellService:
     BASE_URL = "https://api.retellai.com"
@@ -30,8 +28,9 @@ class RetellService:
         payload = {"website_url": str(website_url)}
 
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(endpoint, json=payload, headers=headers)
+            response = await retell_gateway.http_client.post(
+                endpoint, json=payload, headers=headers, timeout=30
+            )
 
             if response.status_code != 200:
                 raise HTTPException(
@@ -68,7 +67,7 @@ class RetellKnowledgeBaseService:
             if file_objects:
                 kwargs["knowledge_base_files"] = file_objects
 
-            response = client.knowledge_base.create(**kwargs)
+            response = await retell_gateway.client.knowledge_base.create(**kwargs)
             return response
 
         except Exception as e:
@@ -88,7 +87,7 @@ class RetellKnowledgeBaseService:
         Deletes a specific source from Retell Knowledge Base.
         """
         try:
-            response = client.knowledge_base.delete_source(
+            response = await retell_gateway.client.knowledge_base.delete_source(
                 source_id=source_id,
                 knowledge_base_id=knowledge_base_id,
             )
@@ -104,7 +103,7 @@ class RetellKnowledgeBaseService:
         Delete a knowledge base from Retell platform.
         """
         try:
-            response = client.knowledge_base.delete(knowledge_base_id)
+            response = await retell_gateway.client.knowledge_base.delete(knowledge_base_id)
             return response
         except Exception as e:
             logger.info(f"e __________________ {e}")
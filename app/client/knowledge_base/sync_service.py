@@ -1,7 +1,6 @@
 import json
-from retell import Retell
 from beanie.operators import And
-from app.config.settings import settings
+from app.config.retell import retell_gateway
 from app.client.models import KnowledgeBaseModel, KnowledgeBaseSourceModel
 from app.core.constants.choices import KnowledgeBaseSourceTypeChoices, KnowledgeBaseStatusChoices
 from app.config.logger import get_logger
@@ -11,8 +10,6 @@ logger = get_logger("Retell Sync KnowledgeBase Service")
 
 
 class RetellSyncService:
-    client = Retell(api_key=settings.retell_api_key)
-
     @staticmethod
     async def sync_in_progress_knowledge_bases():
         """
@@ -53,7 +50,7 @@ class RetellSyncService:
             try:
                 logger.info(f"{log_prefix} Syncing KB: {kb.knowledge_base_id}")
 
-                kb_data = RetellSyncService.client.knowledge_base.retrieve(kb.knowledge_base_id)
+                kb_data = await retell_gateway.client.knowledge_base.retrieve(kb.knowledge_base_id)
                 json_dict = json.loads(kb_data.model_dump_json())
 
                 # Update KB status if changed
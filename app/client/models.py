@@ -1,10 +1,14 @@
+import uuid
 from datetime import datetime
 from bson.decimal128 import Decimal128
 from decimal import Decimal, InvalidOperation
 from beanie import Link, before_event, Delete
-from pydantic import EmailStr, Field, model_validator
-from typing import Optional, List, Dict, Any
+from pymongo import IndexModel
+from pydantic import BaseModel, EmailStr, Field, model_validator, field_validator
+from typing import Optional, List, Dict, Any, ClassVar
 from app.core.models.base import BaseDocument
+from app.core.utils.compression import decompress_json
+from app.core.models.mixins import SearchKeysMixin
 from app.auth.models import UserModel
 from app.core.constants.choices import (
     KnowledgeBaseStatusChoices,
@@ -17,6 +21,11 @@ from app.core.constants.choices import (
     CallTypeChoices,
     CallDisconnectionReasonChoices,
     UserSentimentChoices,
+    WebhookEventStatusChoices,
+    CampaignDialerStatusChoices,
+    ContactDialStatusChoices,
+    ImportJobStatusChoices,
+    SearchFieldTypeChoices,
 
 )
 from app.config.logger import get_logger
@@ -33,6 +42,11 @@ class KnowledgeBaseModel(BaseDocument):
 
     class Settings:
         name = "knowledge_bases"
+        indexes = [
+            IndexModel([("knowledge_base_id", 1)], unique=True),
+            [("user.$id", 1), ("created_at", -1)],  # list
+            [("status", 1), ("user.$id", 1)],  # Retell sync, global and per user
+        ]
 
 
     @before_event(Delete)
@@ -59,6 +73,10 @@ class KnowledgeBaseSourceModel(BaseDocument):
 
     class Settings:
         name = "knowledge_base_sources"
+        indexes = [
+            IndexModel([("source_id", 1)], unique=True),
+            [("knowledge_base.$id", 1), ("created_at", -1)],
+        ]
 
 
 
@@ -83,6 +101,11 @@ class ResponseEngineModel(BaseDocument):
 
     class Settings:
         name = "response_engines"
+        use_state_management = True  # save_delta
+        indexes = [
+            IndexModel([("engine_id", 1)], unique=True),
+            [("knowledge_base_ids", 1)],  # $pull when a knowledge base is deleted
+        ]
 
 
 class AgentModel(BaseDocument):
@@ -103,6 +126,11 @@ class AgentModel(BaseDocument):
 
     class Settings:
         name = "agents"
+        use_state_management = True  # save_delta
+        indexes = [
+            IndexModel([("agent_id", 1)], unique=True),
+            [("user.$id", 1), ("created_at", -1)],  # list
+        ]
 
 
 class MeetingWorkflowModel(BaseDocument):
@@ -117,6 +145,10 @@ class MeetingWorkflowModel(BaseDocument):
 
     class Settings:
         name = "meeting_workflows"
+        use_state_management = True  # save_delta
+        indexes = [
+            [("agent.$id", 1)],
+        ]
 
 
 
@@ -129,23 +161,89 @@ class CampaignModel(BaseDocument):
 
     class Settings:
         name = "campaigns"
+        indexes = [
+            [("user.$id", 1), ("is_deleted", 1), ("created_at", -1), ("_id", -1)],  # list pages
+        ]
 
 
-class CampaignContactsModel(BaseDocument):
+class CampaignDialerModel(BaseDocument):
+    """
+    Server-side dialer state of a campaign. Survives restarts; the process
+    holding the lease is the only one dialing the campaign.
+    """
 
     user : Link[UserModel]
     campaign : Link[CampaignModel]
-    phone_number : str = Field(..., description="Phone Number")
+    from_number : str = Field(..., description="Caller number used for every call")
+    status : CampaignDialerStatusChoices = Field(default=CampaignDialerStatusChoices.RUNNING)
+
+    # Pacing
+    calls_per_second : float = Field(default=1.0, description="New calls started per second")
+    max_concurrent_calls : int = Field(default=10, description="Cap on calls in progress at once")
+    calling_hours_start : Optional[str] = Field(default=None, description="HH:MM, local to `timezone`")
+    calling_hours_end : Optional[str] = Field(default=None, description="HH:MM, local to `timezone`")
+    timezone : str = Field(default="UTC")
+
+    # Progress
+    dialed_count : int = 0
+    failed_count : int = 0
+    started_at : Optional[datetime] = None
+    completed_at : Optional[datetime] = None
+
+    # Lease of the process currently dialing
+    lease_owner : Optional[str] = None
+    lease_until : Optional[datetime] = None
+
+    class Settings:
+        name = "campaign_dialers"
+        indexes = [
+            [("campaign.$id", 1)],
+            [("status", 1)],
+        ]
+
+
+class CampaignContactsModel(BaseDocument, SearchKeysMixin):
+
+    user : Link[UserModel]
+    campaign : Link[CampaignModel]
+    phone_number : str = Field(..., description="Phone Number (E.164)")
     first_name : Optional[str] = Field(default=None, description="First Name of the Contatct")
     last_name : Optional[str] = Field(default=None, description="Last Name of the Contatct")
     email : Optional[EmailStr] = Field(default=None, description="Email of the Contatct")
     no_of_calls : int = Field(default=0, description="No of calls per contact")
     dynamic_variables: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Custom dynamic fields for contact")
 
+    # Dialer state
+    dial_status: ContactDialStatusChoices = Field(default=ContactDialStatusChoices.PENDING, description="Campaign dialer state")
+    last_call_id: Optional[str] = Field(default=None, description="Retell call ID of the latest dialer call")
+    last_dialed_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    # Search keys, see app.core.utils.search
+    phone_number_search: List[str] = Field(default_factory=list)
+    first_name_search: List[str] = Field(default_factory=list)
+    last_name_search: List[str] = Field(default_factory=list)
+    email_search: List[str] = Field(default_factory=list)
+
+    SEARCH_FIELDS: ClassVar[Dict[str, SearchFieldTypeChoices]] = {
+        "phone_number": SearchFieldTypeChoices.PHONE,
+        "first_name": SearchFieldTypeChoices.TEXT,
+        "last_name": SearchFieldTypeChoices.TEXT,
+        "email": SearchFieldTypeChoices.TEXT,
+    }
+
     class Settings:
         name = "campaign_contacts"
         indexes = [
-            [("campaign", 1), ("phone_number", 1)],  # unique per campaign
+            IndexModel([("campaign", 1), ("phone_number", 1)], unique=True),  # unique per campaign
+            [("campaign.$id", 1), ("dial_status", 1), ("created_at", 1)],  # dialer
+            [("last_call_id", 1)],
+            [("user.$id", 1), ("created_at", -1), ("_id", -1)],  # list pages
+            [("campaign.$id", 1), ("created_at", -1), ("_id", -1)],
+            [("user.$id", 1), ("phone_number_search", 1)],  # search
+            [("user.$id", 1), ("first_name_search", 1)],
+            [("user.$id", 1), ("last_name_search", 1)],
+            [("user.$id", 1), ("email_search", 1)],
         ]
 
     async def increment_call_count(self):
@@ -154,7 +252,42 @@ class CampaignContactsModel(BaseDocument):
         await self.save()
 
 
-class CallModel(BaseDocument):
+class ContactImportJobModel(BaseDocument):
+    """
+    Background import of a contacts file into a campaign.
+    Progress is committed per chunk so a crashed job resumes after the last committed chunk.
+    """
+
+    user : Link[UserModel]
+    campaign : Link[CampaignModel]
+    filename : str = Field(..., description="Original upload name")
+    file_path : str = Field(..., description="Stored copy of the upload, removed when the job finishes")
+    status : ImportJobStatusChoices = Field(default=ImportJobStatusChoices.PENDING)
+
+    # Progress
+    chunks_committed : int = Field(default=0, description="Chunks fully written; resume point")
+    rows_processed : int = 0
+    rows_inserted : int = Field(default=0, description="New contacts")
+    rows_updated : int = Field(default=0, description="Contacts already in the campaign, refreshed from the file")
+    rows_duplicate : int = Field(default=0, description="Phone number repeated within the file")
+    rows_skipped : int = Field(default=0, description="Rows without a valid phone number")
+    errors : List[str] = Field(default_factory=list)
+    attempts : int = 0
+    started_at : Optional[datetime] = None
+    finished_at : Optional[datetime] = None
+
+    # Lease of the worker processing the job
+    lease_owner : Optional[str] = None
+    lease_until : Optional[datetime] = None
+
+    class Settings:
+        name = "contact_import_jobs"
+        indexes = [
+            [("status", 1), ("created_at", 1)],
+        ]
+
+
+class CallModel(BaseDocument, SearchKeysMixin):
     """
     Stores all Retell phone call details, synced from webhooks or Retell API.
     """
@@ -195,11 +328,8 @@ class CallModel(BaseDocument):
     public_log_url: Optional[str] = None
     knowledge_base_retrieved_contents_url: Optional[str] = None
 
-    # Transcript
+    # Transcript (the per-utterance arrays live in CallArtifactsModel)
     transcript: Optional[str] = None
-    transcript_object: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
-    transcript_with_tool_calls: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
-    scrubbed_transcript_with_tool_calls: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
 
     # Consting
     call_cost: Optional[Dict[str, Any]] = Field(default_factory=dict)
@@ -213,8 +343,31 @@ class CallModel(BaseDocument):
     user_sentiment : Optional[UserSentimentChoices] = Field(default=None,description="User Sentiment Enums")
     call_successful : Optional[bool] = Field(default=None,description="User Call Successful or Unsuccessful")
 
+    # Webhook write-avoidance: content digest per large field, see RetellWebhookService.HASHED_FIELDS
+    content_hashes: Dict[str, str] = Field(default_factory=dict)
+
+    # Search keys, see app.core.utils.search
+    agent_name_search: List[str] = Field(default_factory=list)
+    from_number_search: List[str] = Field(default_factory=list)
+    to_number_search: List[str] = Field(default_factory=list)
+
+    SEARCH_FIELDS: ClassVar[Dict[str, SearchFieldTypeChoices]] = {
+        "agent_name": SearchFieldTypeChoices.TEXT,
+        "from_number": SearchFieldTypeChoices.PHONE,
+        "to_number": SearchFieldTypeChoices.PHONE,
+    }
+
     class Settings:
         name = "calls"
+        use_state_management = True  # save_delta
+        indexes = [
+            IndexModel([("call_id", 1)], unique=True),  # webhook upserts
+            [("user.$id", 1), ("created_at", -1), ("_id", -1)],  # list pages
+            [("user.$id", 1), ("start_timestamp", -1)],  # dashboard date range
+            [("user.$id", 1), ("agent_name_search", 1)],  # search
+            [("user.$id", 1), ("from_number_search", 1)],
+            [("user.$id", 1), ("to_number_search", 1)],
+        ]
 
     def __repr__(self):
         return f"<Call {self.call_id} ({self.call_status})>"
@@ -245,4 +398,147 @@ class CallModel(BaseDocument):
         return data
 
 
+class CallArtifactsModel(BaseDocument):
+    """
+    Large, rarely read transcript arrays of a call, kept out of CallModel so
+    queries over calls do not page them in. Written by the Retell webhooks
+    and only loaded by the call detail view.
+
+    The arrays are stored compressed (see app.core.utils.compression) and
+    decompressed when the document is loaded.
+    """
+
+    call_id: str = Field(..., description="Retell call ID of the CallModel")
+    transcript_object: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
+    transcript_with_tool_calls: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
+    scrubbed_transcript_with_tool_calls: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
+
+    # Digest per array, compared by the webhooks to skip unchanged rewrites
+    content_hashes: Dict[str, str] = Field(default_factory=dict)
+
+    FIELDS: ClassVar[List[str]] = [
+        "transcript_object",
+        "transcript_with_tool_calls",
+        "scrubbed_transcript_with_tool_calls",
+    ]
+
+    @field_validator(*FIELDS, mode="before")
+    @classmethod
+    def decompress_arrays(cls, value):
+        return decompress_json(value)
+
+    class Settings:
+        name = "call_artifacts"
+        indexes = [
+            IndexModel([("call_id", 1)], unique=True),
+        ]
+
+
+class CallProjection(BaseModel):
+    """
+    Base for the partial views of CallModel that list endpoints load with
+    `.project()`, so transcripts and analysis payloads stay in Mongo.
+    """
+    id: uuid.UUID = Field(alias="_id")
+    call_id: str
+    created_at: datetime  # pagination cursor
+    agent_name: Optional[str] = None
+    direction: Optional[CallDirectionChoices] = None
+    call_status: Optional[CallStatusChoices] = None
+    disconnection_reason: Optional[CallDisconnectionReasonChoices] = None
+    from_number: Optional[str] = None
+    to_number: Optional[str] = None
+    duration_ms: Optional[int] = None
+    combined_cost: Optional[Decimal] = None
+    user_sentiment: Optional[UserSentimentChoices] = None
+    call_successful: Optional[bool] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def convert_decimal128_to_decimal(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: Decimal(str(value)) if isinstance(value, Decimal128) else value for key, value in data.items()}
+
+
+class CallListView(CallProjection):
+    """Row of /calls/list."""
+    updated_at: Optional[datetime] = None
+    call_type: Optional[CallTypeChoices] = None
+    total_duration: Optional[int] = None
+    total_duration_unit_price: Optional[Decimal] = None
+
+
+class CallPriceView(CallProjection):
+    """Row of /pricing/calls."""
+    start_timestamp: Optional[datetime] = None
+    end_timestamp: Optional[datetime] = None
+    call_analysis: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    call_cost: Optional[Dict[str, Any]] = Field(default_factory=dict)
+
+
+class AgentSummaryView(BaseModel):
+    """Agent fields shown next to the documents that link to it, loaded by LinkLoader."""
+    id: uuid.UUID = Field(alias="_id")
+    agent_id: str
+    agent_name: str
+
 
+class CampaignAgentView(BaseModel):
+    """The agent link of a campaign, for placing calls to its contacts."""
+    id: uuid.UUID = Field(alias="_id")
+    agent: Link[AgentModel]
+
+
+class RecordCounterModel(BaseDocument):
+    """
+    Number of calls, campaigns and contacts owned by one user or campaign
+    (its `_id` is the owner's), read by list pages instead of counting.
+    Maintained by app.client.counters.
+    """
+
+    counts: Dict[str, int] = Field(default_factory=dict)
+    # When each count was last set from a real count; a count is trusted only once it has been
+    reconciled: Dict[str, datetime] = Field(default_factory=dict)
+
+    class Settings:
+        name = "record_counters"
+
+
+class TaskLeaseModel(BaseDocument):
+    """
+    Schedule of a periodic background task that must run in one process at
+    a time. The process that moves `lease_until` forward runs the task; the
+    others wait until it has passed.
+    """
+
+    name: str = Field(..., description="Task name")
+    lease_owner: Optional[str] = None
+    lease_until: Optional[datetime] = Field(default=None, description="Next run is due after this time")
+
+    class Settings:
+        name = "task_leases"
+        indexes = [
+            IndexModel([("name", 1)], unique=True),
+        ]
+
+
+class RetellWebhookEventModel(BaseDocument):
+    """
+    Durable queue entry for a raw Retell webhook, drained by background workers.
+    Entries are removed once processed; exhausted ones stay as dead letters.
+    """
+
+    call_id: str = Field(..., description="Retell call ID, used for per-call ordering")
+    event: str = Field(..., description="Webhook event name")
+    payload: bytes = Field(..., description="Raw webhook body as received")
+    status: WebhookEventStatusChoices = Field(default=WebhookEventStatusChoices.PENDING)
+    attempts: int = Field(default=0, description="Number of failed processing attempts")
+    available_at: datetime = Field(default_factory=datetime.utcnow, description="Not processed before this time")
+    locked_until: Optional[datetime] = Field(default=None, description="Worker lease expiry while processing")
+    last_error: Optional[str] = None
+
+    class Settings:
+        name = "retell_webhook_events"
+        indexes = [
+            [("status", 1), ("available_at", 1)],
+            [("call_id", 1), ("created_at", 1)],
+        ]
@@ -1,7 +1,8 @@
-from math import ceil
+from typing import Optional
 from fastapi import (
     APIRouter, 
     status, 
+    Query,
     Depends, 
 )
 from app.core.exceptions.base import (
@@ -14,7 +15,8 @@ from app.auth.models import (
     UserModel
 )
 from ..models import (
-    CallModel
+    CallModel,
+    CallPriceView,
 )
 from .schemas import (
     APIBaseResponse,
@@ -29,6 +31,8 @@ from app.core.utils.helpers import (
     convert_cents_to_usd,
 
 )
+from app.core.utils.pagination import paginate
+from app.client.counters import read_counter, CALLS
 from app.config.logger import get_logger
 
 logger = get_logger('Pricing route')
@@ -47,36 +51,26 @@ async def list_user_calls(
     user: UserModel = Depends(ProfileActive()),
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
+    include_total: bool = Query(True, description="false skips counting total_records"),
 ):
-    skip = (page - 1) * page_size
-    total_records = await CallModel.find(CallModel.user.id == user.id).count()
-
-    calls = (
-        await CallModel.find(CallModel.user.id == user.id)
-        .sort(-CallModel.created_at)
-        .skip(skip)
-        .limit(page_size)
-        .to_list()
+    calls, meta = await paginate(
+        CallModel,
+        [CallModel.user.id == user.id],
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        projection_model=CallPriceView,
+        total_records=await read_counter(user.id, CALLS) if include_total else None,
     )
 
     serialized = [CallPriceResponseSchema.model_validate(c) for c in calls]
 
-    # Calculate pagination flags
-    total_pages = ceil(total_records / page_size)
-    is_next = page < total_pages
-    is_previous = page > 1
-
     return PaginaionResponse(
         status=True,
         message="Fetched call list successfully",
-        meta = PaginationMeta(
-            page_size = page_size,
-            page = page,
-            total_records = total_records,
-            total_pages = total_pages,
-            is_next = is_next,
-            is_previous = is_previous,
-        ),
+        meta = PaginationMeta(**meta),
         data= serialized
     )
 
@@ -26,11 +26,12 @@ class APIBaseResponse(BaseModel):
 
 class PaginationMeta(BaseModel):
     page_size: int
-    page: int
-    total_records: int
-    total_pages: int
+    page: Optional[int] = None  # None in cursor mode
+    total_records: Optional[int] = None  # None when include_total=false
+    total_pages: Optional[int] = None
     is_next: bool
     is_previous: bool
+    next_cursor: Optional[str] = None
 
 class PaginaionResponse(BaseModel):
     status: bool
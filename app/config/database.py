@@ -1,5 +1,7 @@
-from beanie import init_beanie
+from beanie.odm.utils.init import Initializer
 from bson.codec_options import CodecOptions, UuidRepresentation
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
 import motor.motor_asyncio
 from app.auth.models import (
     UserModel,
@@ -12,13 +14,140 @@ from app.client.models import (
     AgentModel,
     MeetingWorkflowModel,
     CallModel,
+    CallArtifactsModel,
+    RecordCounterModel,
     CampaignModel,
-    CampaignContactsModel
+    CampaignContactsModel,
+    CampaignDialerModel,
+    ContactImportJobModel,
+    RetellWebhookEventModel,
+    TaskLeaseModel,
 )
 from app.config.settings import settings
+from app.config.logger import get_logger
 
+logger = get_logger("Database")
 
-async def init_db():
+
+# IMPORTANT: list all models here
+DOCUMENT_MODELS = [
+    UserModel,
+    UserWhitelistTokenModel,
+    KnowledgeBaseModel,
+    KnowledgeBaseSourceModel,
+    ResponseEngineModel,
+    AgentModel,
+    MeetingWorkflowModel,
+    CallModel,
+    CallArtifactsModel,
+    RecordCounterModel,
+    CampaignModel,
+    CampaignContactsModel,
+    CampaignDialerModel,
+    ContactImportJobModel,
+    RetellWebhookEventModel,
+    TaskLeaseModel,
+]
+
+# Indexes that became unique. MongoDB (6.0+) converts an existing index in
+# place with collMod, so the collection keeps its index throughout; while
+# duplicates remain the conversion fails and the index stays as it was.
+UNIQUE_CONVERSIONS = [
+    # duplicates are merged by `python -m app.client.campaign.phone_backfill`
+    (CampaignContactsModel, "campaign_1_phone_number_1"),
+]
+
+
+async def convert_unique_indexes(database) -> list[str]:
+    """Make the UNIQUE_CONVERSIONS indexes unique. Returns the failures."""
+    failures = []
+    for model, name in UNIQUE_CONVERSIONS:
+        collection_name = model.Settings.name
+        existing = (await database[collection_name].index_information()).get(name)
+        if not existing or existing.get("unique"):
+            continue
+        try:
+            # prepareUnique rejects new duplicates while the existing ones are checked
+            await database.command("collMod", collection_name, index={"name": name, "prepareUnique": True})
+            await database.command("collMod", collection_name, index={"name": name, "unique": True})
+            logger.info(f"Converted {collection_name}.{name} to unique")
+        except OperationFailure as e:
+            failures.append(f"{collection_name}.{name}: {e}")
+            logger.error(f"Unique conversion failed {collection_name}.{name}: {e}")
+    return failures
+
+
+def declared_indexes(model) -> list[IndexModel]:
+    """The index catalogue in the model's Settings."""
+    indexes = []
+    for index in model.Settings.__dict__.get("indexes", []):
+        if isinstance(index, str):
+            index = [(index, 1)]
+        indexes.append(index if isinstance(index, IndexModel) else IndexModel(index))
+    return indexes
+
+
+async def missing_indexes(database) -> list[str]:
+    missing = []
+    for model in DOCUMENT_MODELS:
+        existing = await database[model.Settings.name].index_information()
+        missing += [
+            f"{model.Settings.name}.{index.document['name']}"
+            for index in declared_indexes(model)
+            if index.document["name"] not in existing
+        ]
+    for model, name in UNIQUE_CONVERSIONS:
+        existing = (await database[model.Settings.name].index_information()).get(name)
+        if existing and not existing.get("unique"):
+            missing.append(f"{model.Settings.name}.{name} (not unique yet)")
+    return missing
+
+
+async def sync_indexes(database, prune: bool = False, unique_only: bool = False) -> list[str]:
+    """
+    Build the declared indexes that do not exist yet, one at a time so a
+    failing build (e.g. duplicates under a unique index) does not stop the rest.
+    With `unique_only`, only the unique ones. With `prune`, indexes no longer
+    declared are dropped. Returns the failures.
+    """
+    failures = await convert_unique_indexes(database)
+    for model in DOCUMENT_MODELS:
+        collection = database[model.Settings.name]
+        existing = await collection.index_information()
+        declared = declared_indexes(model)
+
+        for index in declared:
+            name = index.document["name"]
+            if name in existing or (unique_only and not index.document.get("unique")):
+                continue
+            try:
+                await collection.create_indexes([index])
+                logger.info(f"Built index {model.Settings.name}.{name}")
+            except OperationFailure as e:
+                failures.append(f"{model.Settings.name}.{name}: {e}")
+                logger.error(f"Index build failed {model.Settings.name}.{name}: {e}")
+
+        if prune:
+            names = {index.document["name"] for index in declared}
+            for name in set(existing) - names - {"_id_"}:
+                await collection.drop_index(name)
+                logger.info(f"Dropped undeclared index {model.Settings.name}.{name}")
+    return failures
+
+
+class _Initializer(Initializer):
+    """Beanie's initializer without its index builds, which are left to sync_indexes."""
+
+    async def init_indexes(self, cls, allow_index_dropping: bool = False):
+        pass
+
+
+async def init_db(require_unique_indexes: bool = True):
+    """
+    Connect and initialize Beanie. Missing unique indexes are built first and
+    the app does not start without them; `require_unique_indexes=False` is for
+    the maintenance commands that repair the data they need.
+    """
     client = motor.motor_asyncio.AsyncIOMotorClient(
         settings.mongo_uri,
         uuidRepresentation="standard",
@@ -27,21 +156,19 @@ async def init_db():
     database = client.get_database(settings.mongo_db).with_options(
         codec_options=CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
     )
-    database = client[settings.mongo_db]
-
-    # IMPORTANT: list all models here
-    await init_beanie(
-        database,
-        document_models=[
-            UserModel,
-            UserWhitelistTokenModel,
-            KnowledgeBaseModel,
-            KnowledgeBaseSourceModel,
-            ResponseEngineModel,
-            AgentModel,
-            MeetingWorkflowModel,
-            CallModel,
-            CampaignModel,
-            CampaignContactsModel
-        ]
-    )
+
+    # Unique indexes back the webhook upserts and contact dedup
+    failures = await sync_indexes(database, unique_only=True)
+    if failures and require_unique_indexes:
+        raise RuntimeError(f"Unique indexes could not be built, see `python -m app.config.indexes sync`: {failures}")
+
+    # The others are built out of band (python -m app.config.indexes sync), not by every worker at boot
+    if settings.MONGO_SYNC_INDEXES_ON_STARTUP:
+        await sync_indexes(database)
+    else:
+        missing = await missing_indexes(database)
+        if missing:
+            logger.warning(f"{len(missing)} declared indexes are missing, run `python -m app.config.indexes sync`: {missing}")
+
+    await _Initializer(database=database, document_models=DOCUMENT_MODELS)
+    return database
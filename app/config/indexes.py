@@ -0,0 +1,174 @@
+"""
+Index management, run out of band (on deploy) instead of at every worker boot;
+only the unique indexes are built by `init_db`, which needs them.
+
+    python -m app.config.indexes sync            # build declared indexes that are missing
+    python -m app.config.indexes sync --prune    # ... and drop the ones no longer declared
+    python -m app.config.indexes check           # explain() every query shape, fail on a COLLSCAN
+
+The catalogue itself is `Settings.indexes` on each model. QUERY_SHAPES
+mirrors the filters and sorts the routes and background workers send; when
+a query changes, change its shape here so `check` keeps covering it.
+"""
+import sys
+import uuid
+import asyncio
+import argparse
+from bson import DBRef
+from datetime import datetime
+from app.auth.models import UserModel, UserWhitelistTokenModel
+from app.client.models import (
+    KnowledgeBaseModel,
+    KnowledgeBaseSourceModel,
+    ResponseEngineModel,
+    AgentModel,
+    MeetingWorkflowModel,
+    CallModel,
+    CampaignModel,
+    CampaignContactsModel,
+    CampaignDialerModel,
+    ContactImportJobModel,
+    RetellWebhookEventModel,
+)
+from app.core.constants.choices import (
+    KnowledgeBaseStatusChoices,
+    CampaignDialerStatusChoices,
+    ContactDialStatusChoices,
+    ImportJobStatusChoices,
+    WebhookEventStatusChoices,
+)
+from app.config.database import init_db, sync_indexes
+from app.core.utils.search import search_condition
+
+ID = uuid.uuid4()
+NOW = datetime(2025, 1, 1)
+
+# (description, model, filter, sort); filters use the stored field paths
+QUERY_SHAPES = [
+    # Auth
+    ("user by email", UserModel, {"email": "user@example.com"}, None),
+    ("token by fingerprint", UserWhitelistTokenModel, {"access_token_fingerprint": "f"}, None),
+    ("token by user and fingerprint", UserWhitelistTokenModel,
+     {"user.$id": ID, "access_token_fingerprint": "f"}, None),
+
+    # Knowledge bases
+    ("knowledge base list", KnowledgeBaseModel, {"user.$id": ID}, [("created_at", -1)]),
+    ("knowledge base by Retell id", KnowledgeBaseModel, {"knowledge_base_id": "kb"}, None),
+    ("knowledge bases to sync", KnowledgeBaseModel,
+     {"status": KnowledgeBaseStatusChoices.IN_PROGRESS.value}, None),
+    ("user knowledge bases to sync", KnowledgeBaseModel,
+     {"user.$id": ID, "status": KnowledgeBaseStatusChoices.IN_PROGRESS.value}, None),
+    ("knowledge base sources", KnowledgeBaseSourceModel, {"knowledge_base.$id": {"$in": [ID]}}, [("created_at", -1)]),
+    ("knowledge base source by Retell id", KnowledgeBaseSourceModel, {"source_id": "src"}, None),
+    ("engines using a knowledge base", ResponseEngineModel, {"knowledge_base_ids": "kb"}, None),
+    ("engine by Retell id", ResponseEngineModel, {"engine_id": "engine", "user.$id": ID}, None),
+
+    # Agents
+    ("agent list", AgentModel, {"user.$id": ID}, [("created_at", -1)]),
+    ("agent by Retell id", AgentModel, {"agent_id": "agent", "user.$id": ID}, None),
+    ("agent workflow", MeetingWorkflowModel, {"agent.$id": ID}, None),
+
+    # Calls
+    ("call list", CallModel, {"user.$id": ID}, [("created_at", -1), ("_id", -1)]),
+    ("call list filtered", CallModel,
+     {"user.$id": ID, "call_status": "ended", "direction": "inbound"}, [("created_at", -1), ("_id", -1)]),
+    ("call list after cursor", CallModel,
+     {"user.$id": ID, "$or": [{"created_at": {"$lt": NOW}}, {"created_at": NOW, "_id": {"$lt": ID}}]},
+     [("created_at", -1), ("_id", -1)]),
+    ("call list by number", CallModel,
+     {"user.$id": ID, **search_condition(CallModel, "to_number", "4155550100")}, [("created_at", -1), ("_id", -1)]),
+    ("call list by agent name", CallModel,
+     {"user.$id": ID, **search_condition(CallModel, "agent_name", "sales")}, [("created_at", -1), ("_id", -1)]),
+    ("calls dashboard by date", CallModel,
+     {"user.$id": ID, "start_timestamp": {"$gte": NOW, "$lte": NOW}}, [("created_at", -1), ("_id", -1)]),
+    ("call by Retell id", CallModel, {"call_id": "call"}, None),
+
+    # Campaigns and contacts
+    ("campaign list", CampaignModel, {"user.$id": ID, "is_deleted": False}, [("created_at", -1), ("_id", -1)]),
+    ("contact list", CampaignContactsModel, {"user.$id": ID}, [("created_at", -1), ("_id", -1)]),
+    ("contact list by campaign", CampaignContactsModel,
+     {"user.$id": ID, "campaign.$id": ID}, [("created_at", -1), ("_id", -1)]),
+    ("contact list by phone", CampaignContactsModel,
+     {"user.$id": ID, **search_condition(CampaignContactsModel, "phone_number", "0100")},
+     [("created_at", -1), ("_id", -1)]),
+    ("contact list by name", CampaignContactsModel,
+     {"user.$id": ID, **search_condition(CampaignContactsModel, "first_name", "jo")},
+     [("created_at", -1), ("_id", -1)]),
+    ("contacts of a campaign", CampaignContactsModel, {"campaign.$id": ID}, None),
+    ("contact upsert", CampaignContactsModel,
+     {"campaign": DBRef("campaigns", ID), "phone_number": "+14155550100"}, None),
+    ("contact by last call", CampaignContactsModel,
+     {"last_call_id": "call", "dial_status": ContactDialStatusChoices.IN_CALL.value}, None),
+    ("next contact to dial", CampaignContactsModel,
+     {"campaign.$id": ID, "dial_status": ContactDialStatusChoices.PENDING.value}, [("created_at", 1)]),
+    ("contacts in flight", CampaignContactsModel,
+     {"campaign.$id": ID, "dial_status": {"$in": [ContactDialStatusChoices.DIALING.value]},
+      "last_dialed_at": {"$gte": NOW}}, None),
+    ("campaign dialer", CampaignDialerModel, {"campaign.$id": ID}, None),
+    ("running dialers", CampaignDialerModel, {"status": CampaignDialerStatusChoices.RUNNING.value}, None),
+
+    # Background queues
+    ("import job to claim", ContactImportJobModel,
+     {"$or": [
+         {"status": ImportJobStatusChoices.PENDING.value},
+         {"status": ImportJobStatusChoices.PROCESSING.value, "lease_until": {"$lt": NOW}},
+     ]},
+     [("created_at", 1)]),
+    ("webhooks due", RetellWebhookEventModel,
+     {"$or": [
+         {"status": WebhookEventStatusChoices.PENDING.value, "available_at": {"$lte": NOW}},
+         {"status": WebhookEventStatusChoices.PROCESSING.value, "locked_until": {"$lt": NOW}},
+     ]},
+     None),
+    ("earlier webhooks of a call", RetellWebhookEventModel,
+     {"call_id": "call", "_id": {"$ne": ID}, "created_at": {"$lt": NOW}}, None),
+]
+
+
+def _has_collscan(plan) -> bool:
+    if isinstance(plan, dict):
+        return plan.get("stage") == "COLLSCAN" or any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(value) for value in plan)
+    return False
+
+
+async def check_query_shapes(database) -> list[str]:
+    """Descriptions of the query shapes whose winning plan scans the whole collection."""
+    scans = []
+    for description, model, query, sort in QUERY_SHAPES:
+        cursor = database[model.Settings.name].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+        if _has_collscan(plan):
+            scans.append(f"{model.Settings.name}: {description}")
+    return scans
+
+
+async def main(args) -> int:
+    database = await init_db(require_unique_indexes=False)
+    if args.command == "sync":
+        failures = await sync_indexes(database, prune=args.prune)
+        for failure in failures:
+            print(f"FAILED {failure}")
+        return 1 if failures else 0
+
+    scans = await check_query_shapes(database)
+    for scan in scans:
+        print(f"COLLSCAN {scan}")
+    print(f"{len(QUERY_SHAPES) - len(scans)}/{len(QUERY_SHAPES)} query shapes use an index")
+    return 1 if scans else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync = commands.add_parser("sync", help="build missing declared indexes")
+    sync.add_argument("--prune", action="store_true", help="drop indexes that are no longer declared")
+    commands.add_parser("check", help="fail if any query shape does a COLLSCAN")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -1,6 +1,14 @@
 from contextlib import asynccontextmanager
 from app.config.database import init_db
+from app.config.retell import retell_gateway
+from app.config.process_pool import cpu_pool
+from app.config.settings import settings
+from app.client.calls.webhook_queue import retell_webhook_queue
+from app.client.campaign.dialer import campaign_dialer
+from app.client.campaign.import_jobs import contact_import_worker
+from app.client.counters import counter_reconciler
 from app.core.redis_utils.otp_handler.config import otp_client
+from app.core.redis_utils.webhook_dedup.config import webhook_dedup_client
 from app.config.logger import get_logger
 
 logger = get_logger("lifespan")
@@ -18,7 +26,35 @@ async def lifespan(app):
     await init_db()
     logger.info("✅ MongoDB initialized")
 
+    retell_gateway.connect()
+    logger.info("✅ Retell client initialized")
+
+    cpu_pool.start()
+    logger.info("✅ CPU pool started")
+
+    if settings.RETELL_WEBHOOK_MODE == "queue":
+        await retell_webhook_queue.start()
+        logger.info("✅ Retell webhook queue workers started")
+
+    if settings.CAMPAIGN_DIALER_ENABLED:
+        await campaign_dialer.start()
+        logger.info("✅ Campaign dialer started")
+
+    await contact_import_worker.start()
+    logger.info("✅ Contact import worker started")
+
+    if settings.RECORD_COUNTERS_RECONCILE_ENABLED:
+        await counter_reconciler.start()
+        logger.info("✅ Record counter reconciler started")
+
     yield  # App runs here
 
+    await counter_reconciler.stop()
+    await contact_import_worker.stop()
+    await campaign_dialer.stop()
+    await retell_webhook_queue.stop()
+    await retell_gateway.close()
+    await cpu_pool.stop()
     otp_client.close()
+    await webhook_dedup_client.aclose()
     logger.info("🛑 Application shutting down...")
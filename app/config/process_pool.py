@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from app.config.settings import settings
+from app.core.exceptions.base import AppException, ToManyRequestExeption
+from app.config.logger import get_logger
+
+logger = get_logger("CPU Pool")
+
+
+def _init_worker(niceness: int):
+    # Parsing yields the CPU to the API processes serving requests
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+def _invoke(fn, args):
+    """
+    Runs in the worker process. Reports when the task actually started, and
+    returns AppException as plain values since it does not survive pickling.
+    """
+    started_at = time.time()
+    try:
+        return started_at, fn(*args), None
+    except AppException as e:
+        return started_at, None, (e.message, e.status_code)
+
+
+class CpuPool:
+    """
+    Process pool for CPU-bound work, such as parsing spreadsheets, that
+    would otherwise block the event loop.
+    At most CPU_POOL_WORKERS tasks run at once and CPU_POOL_MAX_QUEUE more
+    may wait; callers beyond that get a 429 instead of piling up.
+    With CPU_POOL_WORKERS=0 tasks run in a thread instead (local debugging).
+    """
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._active = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    @property
+    def workers(self) -> int:
+        return settings.CPU_POOL_WORKERS
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + settings.CPU_POOL_MAX_QUEUE
+
+    def start(self) -> ProcessPoolExecutor | None:
+        if self._executor is None and self.workers:
+            options = {}
+            # Worker recycling needs Python 3.11; older interpreters keep their workers
+            if sys.version_info >= (3, 11):
+                options["max_tasks_per_child"] = settings.CPU_POOL_MAX_TASKS_PER_CHILD
+            # spawn: forking a process that already runs an event loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.CPU_POOL_NICENESS,),
+                **options,
+            )
+            logger.info(f"CPU pool started ({self.workers} workers)")
+        return self._executor
+
+    async def stop(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info("CPU pool stopped")
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` in a worker process and return its result.
+        `fn` must be a module-level function and its arguments and result picklable.
+        """
+        if self._active >= self.capacity:
+            self._metrics["rejected"] += 1
+            raise ToManyRequestExeption("Server is busy processing files, please try again shortly")
+
+        self._active += 1
+        self._metrics["submitted"] += 1
+        submitted_at = time.time()
+        try:
+            # Lazily start so scripts running outside the lifespan still work
+            executor = self.start()
+            if executor:
+                started_at, result, error = await asyncio.wrap_future(executor.submit(_invoke, fn, args))
+            else:
+                started_at, result, error = await asyncio.to_thread(_invoke, fn, args)
+        except BaseException:
+            self._metrics["failed"] += 1
+            raise
+        finally:
+            self._active -= 1
+
+        finished_at = time.time()
+        wait = max(0.0, started_at - submitted_at)
+        self._metrics["wait_seconds"] += wait
+        self._metrics["max_wait_seconds"] = max(self._metrics["max_wait_seconds"], wait)
+        self._metrics["run_seconds"] += finished_at - started_at
+
+        if error:
+            self._metrics["failed"] += 1
+            raise AppException(*error)
+        self._metrics["completed"] += 1
+        return result
+
+    def stats(self) -> dict:
+        metrics = self._metrics
+        finished = (metrics["completed"] + metrics["failed"]) or 1
+        return {
+            "workers": self.workers,
+            "max_queue": settings.CPU_POOL_MAX_QUEUE,
+            "running": min(self._active, self.workers),
+            "queued": max(0, self._active - self.workers),
+            "submitted": metrics["submitted"],
+            "completed": metrics["completed"],
+            "failed": metrics["failed"],
+            "rejected": metrics["rejected"],
+            "avg_wait_ms": round(metrics["wait_seconds"] / finished * 1000, 1),
+            "max_wait_ms": round(metrics["max_wait_seconds"] * 1000, 1),
+            "avg_run_ms": round(metrics["run_seconds"] / finished * 1000, 1),
+        }
+
+
+cpu_pool = CpuPool()
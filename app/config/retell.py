@@ -0,0 +1,62 @@
+import httpx
+from retell import AsyncRetell
+from app.config.settings import settings
+from app.config.logger import get_logger
+
+logger = get_logger("Retell Gateway")
+
+
+class RetellGateway:
+    """
+    Process-wide async Retell client.
+    One keep-alive connection pool shared by every Retell service,
+    opened and closed by the app lifespan.
+    """
+
+    def __init__(self):
+        self._http_client: httpx.AsyncClient | None = None
+        self._client: AsyncRetell | None = None
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.RETELL_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.RETELL_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.RETELL_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.RETELL_HTTP_TIMEOUT,
+                connect=settings.RETELL_HTTP_CONNECT_TIMEOUT,
+            ),
+        )
+
+    def connect(self) -> AsyncRetell:
+        if self._client is None:
+            self._http_client = self._build_http_client()
+            self._client = AsyncRetell(
+                api_key=settings.retell_api_key,
+                http_client=self._http_client,
+                max_retries=settings.RETELL_MAX_RETRIES,
+            )
+            logger.info("Retell connection pool opened")
+        return self._client
+
+    @property
+    def client(self) -> AsyncRetell:
+        # Lazily connect so scripts running outside the lifespan still work
+        return self._client or self.connect()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        self.connect()
+        return self._http_client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._http_client = None
+            logger.info("Retell connection pool closed")
+
+
+retell_gateway = RetellGateway()
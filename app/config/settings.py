@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     mongo_password: str
     mongo_db: str
     mongo_uri: str
+    MONGO_SYNC_INDEXES_ON_STARTUP: bool = False  # otherwise `python -m app.config.indexes sync` on deploy
 
     # Security
     secret_key: str
@@ -37,6 +38,60 @@ class Settings(BaseSettings):
     # Retail API Key
     retell_api_key:str
 
+    # Retell HTTP connection pool
+    RETELL_HTTP_MAX_CONNECTIONS: int = 100
+    RETELL_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    RETELL_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    RETELL_HTTP_TIMEOUT: float = 60.0
+    RETELL_HTTP_CONNECT_TIMEOUT: float = 5.0
+    RETELL_MAX_RETRIES: int = 2
+
+    # Retell webhook ingestion ("inline" handles events in the request, "queue" acks and defers)
+    RETELL_WEBHOOK_MODE: str = "inline"
+    RETELL_WEBHOOK_WORKERS: int = 4
+    RETELL_WEBHOOK_MAX_ATTEMPTS: int = 5
+    RETELL_WEBHOOK_RETRY_BACKOFF: float = 2.0  # seconds, doubled per attempt
+    RETELL_WEBHOOK_LEASE_SECONDS: int = 60
+    RETELL_WEBHOOK_POLL_INTERVAL: float = 5.0
+
+    # Retell webhook de-duplication (Redis)
+    RETELL_WEBHOOK_DEDUP_ENABLED: bool = True
+    RETELL_WEBHOOK_DEDUP_TTL_SECONDS: int = 24 * 60 * 60
+    REDIS_WEBHOOK_DEDUP_DB: int = 2
+
+    # Process pool for CPU-bound file parsing
+    CPU_POOL_WORKERS: int = 2  # 0 runs tasks in a thread instead
+    CPU_POOL_MAX_QUEUE: int = 8  # tasks waiting beyond the running ones before callers get 429
+    CPU_POOL_MAX_TASKS_PER_CHILD: int = 50  # recycle workers so parser memory is returned (Python 3.11+)
+    CPU_POOL_NICENESS: int = 10  # lower worker priority than the API processes
+
+    # /calls/parse-file preview and streaming modes
+    PARSE_FILE_PREVIEW_ROWS: int = 50
+    PARSE_FILE_PREVIEW_MAX_ROWS: int = 1000
+    PARSE_FILE_STREAM_CHUNK_ROWS: int = 5000
+
+    # Campaign contact import
+    CONTACT_IMPORT_MAX_FILE_SIZE_MB: int = 200
+    CONTACT_IMPORT_DIR: str = "uploads/contact_imports"  # private, not under the public media mount
+    CONTACT_IMPORT_WORKERS: int = 1
+    CONTACT_IMPORT_POLL_INTERVAL: float = 2.0
+    CONTACT_IMPORT_LEASE_SECONDS: int = 120
+    CONTACT_IMPORT_MAX_ATTEMPTS: int = 3
+    DEFAULT_PHONE_COUNTRY_CODE: str = "1"  # for numbers given without one
+
+    # Campaign dialer
+    CAMPAIGN_DIALER_ENABLED: bool = True
+    CAMPAIGN_DIALER_TICK_SECONDS: float = 1.0
+    CAMPAIGN_DIALER_LEASE_SECONDS: int = 30
+    CAMPAIGN_DIALER_CALL_TIMEOUT_SECONDS: int = 60 * 60  # calls without an end webhook stop counting as active
+    CAMPAIGN_DIALER_CLAIM_TIMEOUT_SECONDS: int = 5 * 60  # dialing claims without a started call are retried
+    CAMPAIGN_DIALER_CLEANUP_SECONDS: int = 60  # how often the lease holder clears stale contacts
+
+    # List totals kept per user and campaign, recounted in the background to correct drift
+    RECORD_COUNTERS_RECONCILE_ENABLED: bool = True
+    RECORD_COUNTERS_RECONCILE_INTERVAL_SECONDS: int = 6 * 60 * 60
+    RECORD_COUNTERS_RECONCILE_ON_STARTUP: bool = False  # run at first boot instead of one interval later
+
     BACKEND_API_BASE_URL: str = "https://ai-call-assistant-api.devssh.xyz"
 
     # Storage settings
@@ -151,3 +151,48 @@ class UserSentimentChoices(StrEnum):
     NEUTRAL= "Neutral"
     UNKNOWN= "Unknown" 
 
+
+class WebhookEventStatusChoices(StrEnum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DEAD_LETTER = "dead_letter"
+
+
+class CampaignDialerStatusChoices(StrEnum):
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+
+
+class ContactDialStatusChoices(StrEnum):
+    PENDING = "pending"
+    DIALING = "dialing"
+    IN_CALL = "in_call"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ImportJobStatusChoices(StrEnum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class FileColumnTypeChoices(StrEnum):
+    DATE = "date"
+    INTEGER = "integer"
+    FLOAT = "float"
+    PHONE = "phone"
+    TEXT = "text"
+
+
+class SearchFieldTypeChoices(StrEnum):
+    PHONE = "phone"
+    TEXT = "text"
+
+
+class ParseFileModeChoices(StrEnum):
+    FULL = "full"
+    PREVIEW = "preview"
+    STREAM = "stream"
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
 from beanie import Document
+from beanie.odm.actions import ActionDirections, EventTypes, wrap_with_actions
+from beanie.odm.utils.dump import get_dict
 from pydantic import BaseModel, Field
 
 class BaseDocument(Document):
@@ -20,3 +22,61 @@ class BaseDocument(Document):
 
         self.updated_at = datetime.utcnow()
         return await super().save(*args, **kwargs)
+
+    @wrap_with_actions(EventTypes.SAVE)
+    async def save_delta(self, session=None, skip_actions=None):
+        """
+        Write only the fields changed since the document was loaded or last
+        saved, as one $set with `updated_at`, validating just those fields.
+        Runs the model's Save event hooks, as `save()` does.
+
+        Needs `use_state_management = True` in the model's own Settings (Beanie
+        does not inherit the ones above); without saved state (state management
+        off, or never loaded or saved) it goes through `save()` and writes the
+        document whole.
+        """
+        saved = self.get_saved_state()
+        if saved is None:
+            # The hooks have already run
+            return await self.save(session=session, skip_actions=[ActionDirections.BEFORE, ActionDirections.AFTER])
+
+        # Encode the document once; only the changed fields are re-encoded after validation
+        state = self._stored_state()
+        changed = {path.split(".")[0] for path in self._collect_updates(saved, state)}
+        if not changed:
+            return self
+        self.validate_fields(changed)
+
+        self.updated_at = datetime.utcnow()
+        stored_names = {field.alias or name for name, field in self.__class__.model_fields.items()}
+        state.update(self._stored_state(exclude=stored_names - changed - {"updated_at"}))
+        await self.get_motor_collection().update_one(
+            {"_id": self.id},
+            {"$set": self._collect_updates(saved, state)},
+            session=session,
+        )
+        if self.state_management_save_previous():
+            self._previous_saved_state = saved
+        self._saved_state = state
+        return self
+
+    def _stored_state(self, exclude=frozenset()) -> dict:
+        """The document as state management stores it, see Document._save_state."""
+        return get_dict(
+            self,
+            to_db=True,
+            keep_nulls=self.get_settings().keep_nulls,
+            exclude={"revision_id", *exclude},
+        )
+
+    def validate_fields(self, names):
+        """
+        Validate the named fields (stored names, e.g. `_id`) as on assignment
+        and keep the validated values, so e.g. a plain string becomes its enum.
+        """
+        aliases = {field.alias or name: name for name, field in self.__class__.model_fields.items()}
+        validated = self.model_copy()
+        for name in names:
+            name = aliases.get(name, name)
+            self.__pydantic_validator__.validate_assignment(validated, name, getattr(self, name))
+            setattr(self, name, getattr(validated, name))
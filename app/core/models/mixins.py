@@ -1,5 +1,7 @@
 # app/core/mixins/file_handler.py
+from beanie import before_event, Insert, Replace, Save
 from app.core.exceptions.base import AppException
+from app.core.utils.search import search_keys
 from app.core.utils.save_images import save_file_for_field
 from app.config.storage.factory import storage
 from app.config.logger import get_logger
@@ -23,7 +25,7 @@ class FileHandlerMixin:
 
         # assign + persist model
         setattr(self, field_name, new_path)
-        await self.save()
+        await self.save_delta()
 
         if delete_old and old_path and old_path != new_path:
             await self._delete_file_safe(old_path, background=background_delete)
@@ -35,7 +37,7 @@ class FileHandlerMixin:
         if path:
             await self._delete_file_safe(path)
             setattr(self, field_name, None)
-            await self.save()
+            await self.save_delta()
 
     async def _delete_file_safe(self, path: str, background: bool = True):
         try:
@@ -46,3 +48,13 @@ class FileHandlerMixin:
                 await storage.delete(path)
         except Exception as e:
             logger.warning(f"Failed to delete file {path}: {e}")
+
+
+class SearchKeysMixin:
+    """Keeps the `<field>_search` keys of the model's SEARCH_FIELDS in step when it is written whole."""
+
+    @before_event(Insert, Replace, Save)
+    def refresh_search_keys(self):
+        values = {field: getattr(self, field) for field in self.SEARCH_FIELDS}
+        for field, keys in search_keys(self, values).items():
+            setattr(self, field, keys)
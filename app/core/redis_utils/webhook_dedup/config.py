@@ -0,0 +1,14 @@
+from redis import asyncio as aioredis
+from app.config.settings import settings
+
+# Dedicated pool for webhook idempotency keys
+webhook_dedup_pool = aioredis.ConnectionPool(
+    host=settings.redis_host,
+    port=int(settings.redis_port),
+    db=int(settings.REDIS_WEBHOOK_DEDUP_DB),
+    password=settings.redis_password,
+    decode_responses=True,
+    max_connections=100,
+)
+
+webhook_dedup_client = aioredis.Redis(connection_pool=webhook_dedup_pool)
@@ -0,0 +1,70 @@
+# app/core/redis_utils/webhook_dedup/helpers.py
+import hashlib
+from redis.exceptions import RedisError
+from app.config.settings import settings
+from app.config.logger import get_logger
+from .config import webhook_dedup_client
+
+logger = get_logger("webhook dedup")
+
+STATS_KEY = "webhook_dedup:stats"
+
+# Mark (call_id, event, digest) as seen and count the outcome in one round trip
+_CLAIM_SCRIPT = webhook_dedup_client.register_script("""
+if redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[1]) then
+    redis.call('HINCRBY', KEYS[2], 'misses', 1)
+    return 1
+end
+redis.call('HINCRBY', KEYS[2], 'hits', 1)
+redis.call('HINCRBY', KEYS[2], 'bytes_skipped', ARGV[2])
+return 0
+""")
+
+
+def payload_digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _key(call_id: str, event: str, digest: str) -> str:
+    return f"webhook_dedup:{call_id}:{event}:{digest}"
+
+
+async def claim_webhook(call_id: str, event: str, digest: str, size: int = 0) -> bool:
+    """
+    Return True the first time an exact (call_id, event, payload) is seen within the TTL,
+    False for a repeat. Fails open when Redis is unavailable.
+    """
+    if not settings.RETELL_WEBHOOK_DEDUP_ENABLED:
+        return True
+    try:
+        claimed = await _CLAIM_SCRIPT(
+            keys=[_key(call_id, event, digest), STATS_KEY],
+            args=[settings.RETELL_WEBHOOK_DEDUP_TTL_SECONDS, size],
+        )
+        return bool(claimed)
+    except RedisError as e:
+        logger.warning(f"Webhook dedup unavailable, processing anyway: {e}")
+        return True
+
+
+async def release_webhook(call_id: str, event: str, digest: str):
+    """Forget a claimed event so a retry of a failed delivery is processed again."""
+    if not settings.RETELL_WEBHOOK_DEDUP_ENABLED:
+        return
+    try:
+        await webhook_dedup_client.delete(_key(call_id, event, digest))
+    except RedisError as e:
+        logger.warning(f"Failed to release webhook dedup key: {e}")
+
+
+async def get_dedup_stats() -> dict:
+    stats = await webhook_dedup_client.hgetall(STATS_KEY)
+    hits = int(stats.get("hits", 0))
+    misses = int(stats.get("misses", 0))
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+        "bytes_skipped": int(stats.get("bytes_skipped", 0)),
+    }
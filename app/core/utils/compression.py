@@ -0,0 +1,30 @@
+"""
+Compressed storage for large JSON values, such as call transcript arrays.
+
+A value is stored as BSON binary: one version byte naming the codec, then
+the compressed JSON. Version 1 is zlib. `decompress_json` also accepts
+values stored before compression, which it returns unchanged, so existing
+documents need no migration.
+"""
+import zlib
+import msgspec
+from bson import Binary
+
+ZLIB_V1 = 1
+ZLIB_LEVEL = 6
+
+
+def compress_json(value) -> Binary:
+    """Compress a JSON-able value, or a raw JSON slice as received, without re-encoding it."""
+    data = bytes(value) if isinstance(value, msgspec.Raw) else msgspec.json.encode(value)
+    return Binary(bytes([ZLIB_V1]) + zlib.compress(data, ZLIB_LEVEL))
+
+
+def decompress_json(value):
+    """Decode a value written by `compress_json`; any other value passes through unchanged."""
+    if not isinstance(value, bytes):
+        return value
+    version, payload = value[0], value[1:]
+    if version == ZLIB_V1:
+        return msgspec.json.decode(zlib.decompress(payload))
+    raise ValueError(f"Unknown compressed JSON version: {version}")
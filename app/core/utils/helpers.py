@@ -14,10 +14,14 @@ from retell import BadRequestError, APIError
 from app.core.rabbitmq_publisher.core.rabitmq_publisher import (
     get_rabbit_mq_email_send_publisher
 )
+from app.config.settings import settings
 from app.config.logger import get_logger
 
 logger = get_logger("helper")
 
+PHONE_SEPARATORS = r"[\s().\-/]"
+E164_PATTERN = r"^\+[1-9]\d{7,14}$"
+
 
 
 def generate_fingerprint(token: str):
@@ -56,6 +60,23 @@ class UUIDEncoder(json.JSONEncoder):
 
 
 
+def normalize_phone_number(value: str | None, default_country_code: str | None = None) -> str | None:
+    """
+    Convert a phone number to E.164 (`+14155550123`), or None if it cannot be one.
+    Separators are dropped and a `00` prefix becomes `+`; numbers without a
+    country code get `default_country_code` (one leading trunk `0` is removed).
+    """
+    country_code = default_country_code or settings.DEFAULT_PHONE_COUNTRY_CODE
+    number = re.sub(PHONE_SEPARATORS, "", str(value or ""))
+    if number.startswith("00"):
+        number = "+" + number[2:]
+    elif number and not number.startswith("+"):
+        if not (number.startswith(country_code) and len(number) > 10):
+            number = country_code + number.removeprefix("0")
+        number = "+" + number
+    return number if re.match(E164_PATTERN, number) else None
+
+
 def parse_timestamp(ts: int | float | str | None) -> datetime | None:
     """
     Convert a timestamp (in ms or sec) to a Python datetime object.
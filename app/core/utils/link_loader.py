@@ -0,0 +1,62 @@
+"""
+Batched resolution of Link fields, in place of `fetch_links=True`.
+
+`fetch_links` runs a $lookup per link for every document and brings back
+the full linked documents. A LinkLoader instead collects the ids a page
+needs, loads each target collection once with a projected `$in` query,
+and remembers what it loaded, so the same target is never fetched twice
+while the loader lives. Create one per request (or per dialer tick):
+
+    loader = LinkLoader()
+    await loader.resolve(campaigns, "agent", AgentSummaryView)
+    campaign.agent.agent_name  # an AgentSummaryView
+"""
+import uuid
+from typing import Any, Iterable
+from beanie import Document, Link
+from beanie.operators import In
+
+
+class LinkLoader:
+
+    def __init__(self):
+        self._loaded: dict[tuple[type, uuid.UUID], Any] = {}
+
+    async def load_many(self, model: type[Document], ids: Iterable[uuid.UUID], projection_model=None) -> dict:
+        """Documents of `model` by id, as `projection_model` when given; missing ids are left out."""
+        view = projection_model or model
+        ids = set(ids)
+        missing = [id_ for id_ in ids if (view, id_) not in self._loaded]
+        if missing:
+            query = model.find(In(model.id, missing))
+            if projection_model:
+                query = query.project(projection_model)
+            for document in await query.to_list():
+                self._loaded[(view, document.id)] = document
+            for id_ in missing:
+                self._loaded.setdefault((view, id_), None)
+        return {id_: self._loaded[(view, id_)] for id_ in ids if self._loaded[(view, id_)] is not None}
+
+    async def load(self, model: type[Document], id_: uuid.UUID, projection_model=None):
+        return (await self.load_many(model, [id_], projection_model)).get(id_)
+
+    async def resolve(self, documents: list, field: str, projection_model=None) -> list:
+        """
+        Replace the `field` link of each document with its target, as
+        `projection_model` when given. Links whose target is gone stay as they are.
+        """
+        links = [getattr(document, field) for document in documents]
+        by_model: dict[type, set] = {}
+        for link in links:
+            if isinstance(link, Link):
+                by_model.setdefault(link.document_class, set()).add(link.ref.id)
+
+        loaded = {}
+        for model, ids in by_model.items():
+            for id_, target in (await self.load_many(model, ids, projection_model)).items():
+                loaded[(model, id_)] = target
+
+        for document, link in zip(documents, links):
+            if isinstance(link, Link) and (link.document_class, link.ref.id) in loaded:
+                setattr(document, field, loaded[(link.document_class, link.ref.id)])
+        return documents
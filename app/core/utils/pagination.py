@@ -0,0 +1,152 @@
+"""
+Pagination for list endpoints, newest first.
+
+Page mode keeps the original `page`/`page_size` behaviour, which skips over
+every earlier document and so slows down on deep pages. Cursor mode is
+keyset pagination on (created_at, _id): the opaque cursor holds the sort
+key of the last document returned, and the next page starts right after it
+on a matching compound index, at the same cost however deep it is.
+
+Every response carries `next_cursor`, so a client can start with page 1
+and follow the cursor from there.
+
+`paginate_with_facets` returns the page, the total and any extra
+aggregations over the same filter (e.g. counts per status) from a single
+$facet aggregation, for views that would otherwise query once per panel.
+"""
+import uuid
+import base64
+import msgspec
+from datetime import datetime
+from beanie import Document
+from beanie.odm.utils.parsing import parse_obj
+from beanie.odm.utils.projection import get_projection
+from app.core.exceptions.base import AppException
+
+
+def encode_cursor(document: Document) -> str:
+    payload = msgspec.json.encode([document.created_at.isoformat(), str(document.id)])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, document_id = msgspec.json.decode(payload)
+        return datetime.fromisoformat(created_at), uuid.UUID(document_id)
+    except Exception:
+        raise AppException("Invalid cursor")
+
+
+def after_cursor(cursor: str) -> dict:
+    """Filter for the documents that sort after the cursor."""
+    created_at, document_id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": document_id}},
+    ]}
+
+
+async def paginate(
+    model: type[Document],
+    filter_conditions: list,
+    *,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str | None = None,
+    include_total: bool = True,
+    fetch_links: bool = False,
+    projection_model=None,
+    total_records: int | None = None,
+) -> tuple[list, dict]:
+    """
+    One page of `model` matching `filter_conditions` and the pagination meta.
+    With `cursor` the page starts after it and `page` is ignored.
+    A `projection_model` (which must include `id` and `created_at`) loads only its fields.
+    A known `total_records` (e.g. from a record counter) is used instead of counting.
+    """
+    query = model.find(*filter_conditions, after_cursor(cursor) if cursor else {}, fetch_links=fetch_links)
+    query = query.sort(-model.created_at, -model.id)
+    if projection_model:
+        query = query.project(projection_model)
+    if not cursor:
+        query = query.skip((page - 1) * page_size)
+    # One extra document tells whether there is a next page without counting
+    documents = await query.limit(page_size + 1).to_list()
+    is_next = len(documents) > page_size
+    documents = documents[:page_size]
+
+    total_pages = None
+    if not include_total:
+        total_records = None
+    else:
+        if total_records is None:
+            total_records = await model.find(*filter_conditions).count()
+        total_pages = (total_records + page_size - 1) // page_size
+
+    meta = {
+        "page_size": page_size,
+        "page": None if cursor else page,
+        "total_records": total_records,
+        "total_pages": total_pages,
+        "is_next": is_next,
+        "is_previous": bool(cursor) or page > 1,
+        "next_cursor": encode_cursor(documents[-1]) if is_next else None,
+    }
+    return documents, meta
+
+
+async def paginate_with_facets(
+    model: type[Document],
+    filter_conditions: list,
+    facets: dict[str, list],
+    *,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str | None = None,
+    projection_model=None,
+) -> tuple[list, dict, dict]:
+    """
+    Like `paginate`, plus the `facets` sub-pipelines run over every document
+    matching `filter_conditions`, all in one aggregation. Returns the page,
+    the pagination meta and the output of each facet by name. The cursor
+    narrows the page only; the total and the facets cover the whole filter.
+    """
+    page_stages = []
+    if cursor:
+        page_stages.append({"$match": model.find(after_cursor(cursor)).get_filter_query()})
+    else:
+        page_stages.append({"$skip": (page - 1) * page_size})
+    # One extra document tells whether there is a next page
+    page_stages.append({"$limit": page_size + 1})
+    if projection_model:
+        page_stages.append({"$project": get_projection(projection_model)})
+
+    pipeline = [
+        {"$match": model.find(*filter_conditions).get_filter_query()},
+        # Sorted ahead of $facet so the list-page index provides the order
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$facet": {
+            "page": page_stages,
+            "total": [{"$count": "count"}],
+            **facets,
+        }},
+    ]
+    (result,) = await model.get_motor_collection().aggregate(pipeline).to_list(length=None)
+
+    documents = [parse_obj(projection_model or model, document) for document in result.pop("page")]
+    is_next = len(documents) > page_size
+    documents = documents[:page_size]
+    total = result.pop("total")
+    total_records = total[0]["count"] if total else 0
+
+    meta = {
+        "page_size": page_size,
+        "page": None if cursor else page,
+        "total_records": total_records,
+        "total_pages": (total_records + page_size - 1) // page_size,
+        "is_next": is_next,
+        "is_previous": bool(cursor) or page > 1,
+        "next_cursor": encode_cursor(documents[-1]) if is_next else None,
+    }
+    return documents, meta, result
@@ -0,0 +1,95 @@
+"""
+Indexed search on phone and name fields, in place of unanchored regexes.
+
+A model lists its searchable fields in `SEARCH_FIELDS`. Each one is paired
+with a `<field>_search` array of keys, indexed together with the owner:
+
+- phone: every suffix of the digits, so "contains these digits" is a
+  prefix lookup on one of them;
+- text: the lowercased words (runs of letters and digits).
+
+`search_condition` turns the user's input into anchored prefix regexes over
+those keys, which MongoDB answers from the index however large the
+collection grows. Phones match when their digits contain the digits given,
+whatever the formatting on either side; text matches when every word given
+starts one of the words stored. Keys of documents written before the search fields existed are
+filled in with:
+
+    python -m app.core.utils.search
+"""
+import re
+import asyncio
+from pymongo import UpdateOne
+from app.core.constants.choices import SearchFieldTypeChoices
+
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def search_field(field: str) -> str:
+    return f"{field}_search"
+
+
+def phone_search_keys(value: str | None) -> list[str]:
+    digits = re.sub(r"\D", "", value or "")
+    return [digits[start:] for start in range(len(digits))]
+
+
+def text_search_keys(value: str | None) -> list[str]:
+    return sorted(set(WORD_PATTERN.findall((value or "").lower())))
+
+
+def search_keys(model, values: dict) -> dict:
+    """`<field>_search` keys for each searchable field of `model` present in `values`."""
+    builders = {
+        SearchFieldTypeChoices.PHONE: phone_search_keys,
+        SearchFieldTypeChoices.TEXT: text_search_keys,
+    }
+    return {
+        search_field(field): builders[field_type](values[field])
+        for field, field_type in model.SEARCH_FIELDS.items()
+        if field in values
+    }
+
+
+def search_condition(model, field: str, query: str) -> dict:
+    """Filter on `field` of `model` for the user's `query`."""
+    keys = search_field(field)
+    if model.SEARCH_FIELDS[field] == SearchFieldTypeChoices.PHONE:
+        prefixes = [re.sub(r"\D", "", query)]
+    else:
+        prefixes = text_search_keys(query)
+    prefixes = [prefix for prefix in prefixes if prefix]
+    if not prefixes:
+        # Nothing searchable in the input (e.g. only punctuation): no match
+        return {keys: {"$in": []}}
+    return {"$and": [{keys: re.compile("^" + re.escape(prefix))} for prefix in prefixes]}
+
+
+async def backfill_search_keys(model, batch_size: int = 1000) -> int:
+    """Compute the search keys of every document of `model`. Returns the documents updated."""
+    collection = model.get_motor_collection()
+    projection = {field: 1 for field in model.SEARCH_FIELDS}
+    updated = 0
+    batch = []
+    async for document in collection.find({}, projection=projection):
+        values = {field: document.get(field) for field in model.SEARCH_FIELDS}
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": search_keys(model, values)}))
+        if len(batch) == batch_size:
+            updated += (await collection.bulk_write(batch, ordered=False)).matched_count
+            batch = []
+    if batch:
+        updated += (await collection.bulk_write(batch, ordered=False)).matched_count
+    return updated
+
+
+async def main():
+    from app.config.database import init_db, DOCUMENT_MODELS
+
+    await init_db()
+    for model in DOCUMENT_MODELS:
+        if getattr(model, "SEARCH_FIELDS", None):
+            print(f"{model.Settings.name}: {await backfill_search_keys(model)} documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
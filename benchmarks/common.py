@@ -0,0 +1,223 @@
+"""
+Shared setup for the benchmark scripts.
+
+Run benchmarks from the repository root, e.g. `python -m benchmarks.webhook_replay`.
+They need no `.env`: placeholder settings are filled in for anything missing.
+Install their extra dependencies with `pip install -r benchmarks/requirements.txt`.
+Without `--mongo-uri` an in-memory Mongo stand-in (mongomock-motor) is used;
+pass a URI (e.g. the docker-compose mongo) for numbers that reflect a real server.
+"""
+import os
+import time
+import bson
+from pymongo import monitoring
+from bson.codec_options import CodecOptions, UuidRepresentation
+
+ENV_DEFAULTS = {
+    "MONGO_USER": "bench",
+    "MONGO_PASSWORD": "bench",
+    "MONGO_DB": "bench",
+    "MONGO_URI": "mongodb://localhost:27017",
+    "SECRET_KEY": "bench",
+    "USER_JWT_TOKEN_KEY": "bench",
+    "ADMIN_JWT_TOKEN_KEY": "bench",
+    "DEBUG": "false",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASSWORD": "bench",
+    "REDIS_OTP_DB": "0",
+    "REDIS_RATE_LIMIT_DB": "1",
+    "RABBITMQ_HOST": "localhost",
+    "RABBITMQ_PORT": "5672",
+    "RABBITMQ_USER": "bench",
+    "RABBITMQ_PASSWORD": "bench",
+    "RABBITMQ_EMAIL_SENDING_QUEUE": "bench",
+    "RABBITMQ_EMAIL_SENDING_EXCHANGE": "bench",
+    "RABBITMQ_EMAIL_SENDING_ROUTING_KEY": "bench",
+    "OTP_FERNET_KEY": "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg=",
+    "RETELL_API_KEY": "bench",
+}
+
+WRITE_COMMANDS = {"insert", "update", "findAndModify", "delete"}
+STANDARD_UUID = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+
+def load_env():
+    """Fill in placeholder settings so `app.*` can be imported without a .env file."""
+    for key, value in ENV_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+
+
+def quiet_logs(level: str = "WARNING"):
+    """Drop the app's per-request log handlers so they neither flood the output nor skew timings."""
+    import sys
+    from app.config.logger import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=level)
+
+
+class WriteMeter(monitoring.CommandListener):
+    """Counts write commands and the BSON bytes they send to the server."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.bytes_written = 0
+        self.write_ops = 0
+
+    def record(self, document: dict):
+        self.bytes_written += len(bson.encode(document, codec_options=STANDARD_UUID))
+        self.write_ops += 1
+
+    def started(self, event):
+        if event.command_name in WRITE_COMMANDS:
+            self.record(event.command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+_mongomock_meter: WriteMeter | None = None
+
+
+def _meter_mongomock(meter: WriteMeter):
+    """
+    Mongomock has no command monitoring, so meter its write methods instead.
+    Also lets it store native UUIDs, which it otherwise rejects, and match
+    them in queries on link fields (`campaign.$id`).
+    """
+    global _mongomock_meter
+    already_patched = _mongomock_meter is not None
+    _mongomock_meter = meter
+    if already_patched:
+        return
+
+    import uuid
+    from types import SimpleNamespace
+    import mongomock.filtering as mock_filtering
+    import mongomock.collection as mock_collection
+
+    class _Bson:
+        @staticmethod
+        def encode(document, check_keys=False, codec_options=None):
+            return bson.encode(document, check_keys, STANDARD_UUID)
+
+    mock_collection.BSON = _Bson
+
+    iter_key_candidates = mock_filtering.iter_key_candidates
+
+    def uuid_aware_candidates(key, doc):
+        # Beanie sends UUIDs as BSON binaries while mongomock keeps them as uuid.UUID
+        if isinstance(doc, bson.DBRef):
+            doc = {"$ref": doc.collection, "$id": doc.id}
+        candidates = []
+        for value in iter_key_candidates(key, doc):
+            candidates.append(value)
+            if isinstance(value, uuid.UUID):
+                candidates.append(bson.Binary.from_uuid(value))
+            elif isinstance(value, bson.Binary) and value.subtype == bson.binary.UUID_SUBTYPE:
+                candidates.append(value.as_uuid())
+        return candidates
+
+    mock_filtering.iter_key_candidates = uuid_aware_candidates
+    collection = mock_collection.Collection
+
+    def native_uuids(value):
+        if isinstance(value, bson.Binary) and value.subtype == bson.binary.UUID_SUBTYPE:
+            return value.as_uuid()
+        if isinstance(value, dict):
+            return {key: native_uuids(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [native_uuids(item) for item in value]
+        return value
+
+    update = collection._update
+
+    def uuid_aware_update(self, spec, document, *args, **kwargs):
+        # A whole-document $set (Beanie's save) carries _id as a binary, which mongomock sees as a changed _id
+        return update(self, spec, native_uuids(document), *args, **kwargs)
+
+    collection._update = uuid_aware_update
+
+    update_one = collection.update_one
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        # Mongomock's bulk API predates the options current pymongo passes; replay as single updates
+        upserted = matched = modified = 0
+        for request in requests:
+            result = update_one(self, request._filter, request._doc, upsert=request._upsert)
+            upserted += result.upserted_id is not None
+            matched += result.matched_count
+            modified += result.modified_count
+        return SimpleNamespace(upserted_count=upserted, matched_count=matched, modified_count=modified)
+
+    collection.bulk_write = bulk_write
+
+    def metered(name, original):
+        def wrapper(self, *args, **kwargs):
+            if name == "insert_many":
+                sent = list(args[0])
+            elif name == "bulk_write":
+                sent = [{"q": op._filter, "u": op._doc} for op in args[0]]
+            else:
+                sent = list(args[:2])
+            _mongomock_meter.record({name: sent})
+            return original(self, *args, **kwargs)
+        return wrapper
+
+    for name in ("insert_one", "insert_many", "bulk_write", "update_one", "update_many", "replace_one", "find_one_and_update", "delete_one", "delete_many"):
+        setattr(collection, name, metered(name, getattr(collection, name)))
+
+
+async def init_database(mongo_uri: str | None = None, db_name: str = "benchmark") -> tuple[object, WriteMeter]:
+    """
+    Initialise Beanie against a throwaway database.
+    Returns the database handle and a WriteMeter attached to it.
+    """
+    from beanie import init_beanie
+    from app.config.database import DOCUMENT_MODELS
+
+    meter = WriteMeter()
+    if mongo_uri:
+        import motor.motor_asyncio
+
+        client = motor.motor_asyncio.AsyncIOMotorClient(
+            mongo_uri,
+            uuidRepresentation="standard",
+            event_listeners=[meter],
+        )
+        await client.drop_database(db_name)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        _meter_mongomock(meter)
+        client = AsyncMongoMockClient()
+
+    database = client[db_name]
+    await init_beanie(database, document_models=DOCUMENT_MODELS)
+    meter.reset()
+    return database, meter
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Timer:
+    """Context manager measuring wall time in seconds."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
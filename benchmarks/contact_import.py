@@ -0,0 +1,204 @@
+"""
+Import synthetic contact files through CampaignContactImportService and report rows/sec.
+
+Files have phone, first/last name, email and three extra columns that end up
+as dynamic variables; about 2% of rows have no phone number. Peak RSS is the
+API process high-water mark during the import (reset per file on Linux);
+parsing itself runs in the CPU pool. Max loop lag is the longest the event
+loop went without running other tasks during the import.
+
+    python -m benchmarks.contact_import                          # 10k, 100k and 1M rows
+    python -m benchmarks.contact_import --rows 10000 100000
+    python -m benchmarks.contact_import --format xlsx --rows 10000 100000
+    python -m benchmarks.contact_import --no-db                  # parsing and document building only
+    python -m benchmarks.contact_import --mongo-uri mongodb://localhost:27019
+"""
+import gc
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from benchmarks.common import load_env, quiet_logs, init_database, Timer
+
+load_env()
+
+from fastapi import UploadFile  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+
+GENERATE_SLICE = 100_000
+
+FIRST_NAMES = np.array(["Ava", "Liam", "Noah", "Emma", "Mia", "Omar", "Sara", "Ali", "Zoe", "Ivan"])
+LAST_NAMES = np.array(["Khan", "Smith", "Garcia", "Chen", "Brown", "Ahmed", "Lopez", "Kim", "Novak", "Silva"])
+CITIES = np.array(["Austin", "Lahore", "Berlin", "Toronto", "Dubai", "Madrid"])
+PLANS = np.array(["basic", "pro", "enterprise"])
+
+
+def build_frame(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), rows)]
+    index = np.arange(rows).astype(str)
+    phones = pd.Series(rng.integers(2_000_000_000, 9_999_999_999, rows)).astype(str).radd("+1")
+    phones[rng.random(rows) < 0.02] = ""
+
+    return pd.DataFrame({
+        "Phone Number": phones,
+        "First Name": first,
+        "Last Name": last,
+        "Email": pd.Series(first).str.lower() + "." + index + "@example.com",
+        "Company": pd.Series(last) + " Ltd",
+        "City": CITIES[rng.integers(0, len(CITIES), rows)],
+        "Plan": PLANS[rng.integers(0, len(PLANS), rows)],
+    })
+
+
+def write_file(directory: Path, rows: int, file_format: str, rng: np.random.Generator) -> Path:
+    """Write the file in slices so generating it does not dominate peak memory."""
+    path = directory / f"contacts_{rows}.{file_format}"
+    slices = [min(GENERATE_SLICE, rows - start) for start in range(0, rows, GENERATE_SLICE)]
+
+    if file_format == "csv":
+        for index, size in enumerate(slices):
+            build_frame(size, rng).to_csv(path, index=False, mode="a", header=index == 0)
+    elif file_format == "xlsx":
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for index, size in enumerate(slices):
+            frame = build_frame(size, rng)
+            if index == 0:
+                sheet.append(list(frame.columns))
+            for row in frame.itertuples(index=False):
+                sheet.append(list(row))
+        workbook.save(path)
+    else:
+        build_frame(rows, rng).to_excel(path, index=False, engine="odf")
+    return path
+
+
+def reset_peak_rss():
+    """Reset the high-water mark (Linux), so it covers the import and not file generation."""
+    gc.collect()
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _NullResult:
+    def __init__(self, operations):
+        self.upserted_count = len(operations)
+        self.matched_count = 0
+
+
+class _NullCollection:
+    """Stands in for the contacts collection with --no-db."""
+
+    async def bulk_write(self, operations, ordered=True, **kwargs):
+        await asyncio.sleep(0)  # a real write yields to the loop while waiting on the server
+        return _NullResult(operations)
+
+
+async def seed_campaign():
+    from app.auth.models import UserModel
+    from app.client.models import AgentModel, ResponseEngineModel, CampaignModel
+
+    user = UserModel(first_name="Bench", last_name="User", email="bench@example.com", password="bench")
+    await user.insert()
+    engine = ResponseEngineModel(user=user, engine_id="llm_bench")
+    await engine.insert()
+    agent = AgentModel(user=user, response_engine=engine, agent_id="agent_bench", agent_name="bench", voice_id="bench-voice")
+    await agent.insert()
+    campaign = CampaignModel(user=user, agent=agent, name="bench")
+    await campaign.insert()
+    return user, campaign
+
+
+async def measure_loop_lag(interval: float, lags: list):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - started - interval)
+
+
+async def run_import(user, campaign, path: Path) -> tuple[dict, float, float]:
+    from app.client.campaign.services import CampaignContactImportService
+
+    lags = [0.0]
+    probe = asyncio.create_task(measure_loop_lag(0.01, lags))
+    with path.open("rb") as handle:
+        upload = UploadFile(file=handle, filename=path.name)
+        service = CampaignContactImportService(user=user, campaign_uid=campaign.id, file=upload)
+        with Timer() as timer:
+            report = await service.import_contacts()
+    probe.cancel()
+    return report, timer.elapsed, max(lags)
+
+
+async def main(args):
+    quiet_logs()
+    database, meter = await init_database(args.mongo_uri, db_name="benchmark_contact_import")
+
+    from app.client.models import CampaignContactsModel
+
+    if args.no_db:
+        CampaignContactsModel.get_motor_collection = classmethod(lambda cls: _NullCollection())
+
+    user, campaign = await seed_campaign()
+
+    # Spawn the pool's workers up front so the first file does not pay for it
+    from app.config.process_pool import cpu_pool
+    await asyncio.gather(*(cpu_pool.run(time.sleep, 0.5) for _ in range(cpu_pool.workers)))
+    rng = np.random.default_rng(args.seed)
+    store = "none" if args.no_db else "mongo" if args.mongo_uri else "mongomock"
+    print(f"format={args.format} store={store}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            path = write_file(Path(directory), rows, args.format, rng)
+            size_mb = path.stat().st_size / (1024 * 1024)
+
+            meter.reset()
+            reset_peak_rss()
+            report, elapsed, lag = await run_import(user, campaign, path)
+            print(f"  {rows:>9,} rows ({size_mb:6.1f} MB): {report['rows'] / elapsed:>10,.0f} rows/sec  "
+                  f"{elapsed:7.2f}s  inserted={report['inserted']:,}  duplicate={report['duplicate']:,}  "
+                  f"skipped={report['skipped']:,}  write ops={meter.write_ops}  peak RSS={peak_rss_mb():,.0f} MB  "
+                  f"max loop lag={lag * 1000:,.0f} ms")
+
+            if not args.no_db:
+                await CampaignContactsModel.get_motor_collection().delete_many({})
+
+    await cpu_pool.stop()
+
+    if args.mongo_uri:
+        await database.client.drop_database(database.name)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="file sizes to import")
+    parser.add_argument("--format", choices=["csv", "xlsx", "ods"], default="csv")
+    parser.add_argument("--no-db", action="store_true", help="skip the inserts and measure parsing and document building only")
+    parser.add_argument("--mongo-uri", default=None, help="real MongoDB to use instead of the in-memory stand-in")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
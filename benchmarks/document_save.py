@@ -0,0 +1,78 @@
+"""
+Latency of saving a fully populated CallModel after a small edit: `save()`
+(validate and write the whole document) against `save_delta()` (validate and
+$set only the changed fields).
+
+The call is built by replaying the outbound webhook payloads in
+notes/webhook_events, so it carries the real cost, analysis, token usage,
+dynamic variables and transcript. Each round changes two scalar fields, as
+the sync and update flows do.
+
+    python -m benchmarks.document_save
+    python -m benchmarks.document_save --rounds 2000
+    python -m benchmarks.document_save --mongo-uri mongodb://localhost:27019
+"""
+import asyncio
+import argparse
+from benchmarks.common import load_env, quiet_logs, init_database, percentile, Timer
+
+load_env()
+
+from benchmarks.webhook_replay import FIXTURES_DIR, EVENT_ORDER, CallTemplate, seed_agents  # noqa: E402
+
+CALL_ID = "call_bench_save"
+
+
+async def populate_call() -> str:
+    from app.client.calls.services import RetellWebhookService
+    from app.client.calls.webhook_decoder import decode_webhook
+
+    (agent_id,) = await seed_agents(1)
+    template = CallTemplate(FIXTURES_DIR / "outbound")
+    service = RetellWebhookService()
+    for event in EVENT_ORDER:
+        await service.handle_event(decode_webhook(template.render(event, CALL_ID, agent_id, 0)))
+    return CALL_ID
+
+
+async def measure(call, save, rounds: int, meter) -> tuple[list[float], float]:
+    meter.reset()
+    latencies = []
+    for index in range(rounds):
+        call.duration_ms = index
+        call.call_successful = bool(index % 2)
+        with Timer() as timer:
+            await save(call)
+        latencies.append(timer.elapsed)
+    return latencies, meter.bytes_written / rounds
+
+
+async def main(args):
+    quiet_logs()
+    database, meter = await init_database(args.mongo_uri, db_name="benchmark_document_save")
+    from app.client.models import CallModel
+
+    call_id = await populate_call()
+    call = await CallModel.find_one(CallModel.call_id == call_id)
+    size = len(str(call.model_dump()))
+    print(f"CallModel with {size:,} characters of field data, {args.rounds} rounds, "
+          f"store={'mongo' if args.mongo_uri else 'mongomock'}")
+
+    for name, save in [("save()", CallModel.save), ("save_delta()", CallModel.save_delta)]:
+        latencies, written = await measure(call, save, args.rounds, meter)
+        print(f"  {name:<13} p50 {percentile(latencies, 50) * 1e6:>8.0f}us  p99 {percentile(latencies, 99) * 1e6:>8.0f}us  "
+              f"{written:>8,.0f} B written / save")
+
+    if args.mongo_uri:
+        await database.client.drop_database(database.name)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=500, help="saves timed per method")
+    parser.add_argument("--mongo-uri", default=None, help="real MongoDB to use instead of the in-memory stand-in")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
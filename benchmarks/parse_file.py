@@ -0,0 +1,77 @@
+"""
+Parse a synthetic wide call sheet the way /calls/parse-file does and report throughput.
+
+Each row has phone numbers, zero-padded IDs, dates, amounts, counts and free
+text, repeated to the requested width. Parsing runs in-process (not through
+the CPU pool) so the number is the parser's own cost.
+
+    python -m benchmarks.parse_file                            # 10k and 50k rows, 40 columns
+    python -m benchmarks.parse_file --rows 20000 --columns 80
+    python -m benchmarks.parse_file --format xlsx --rows 5000
+"""
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from benchmarks.common import load_env, quiet_logs, Timer
+
+load_env()
+
+NOTES = np.array(["call back after 5pm", "wrong number", "interested in pro plan", "left voicemail", ""])
+
+
+def build_frame(rows: int, columns: int, rng: np.random.Generator) -> pd.DataFrame:
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    groups = {
+        "phone": pd.Series(rng.integers(2_000_000_000, 9_999_999_999, rows)).astype(str).radd("+1"),
+        "account id": pd.Series(rng.integers(0, 99_999, rows)).astype(str).str.zfill(8),
+        "due date": dates.strftime("%Y-%m-%d"),
+        "amount": pd.Series(rng.integers(100, 100_000, rows) / 100).round(2),
+        "visits": rng.integers(0, 50, rows),
+        "notes": NOTES[rng.integers(0, len(NOTES), rows)],
+    }
+    frame = {}
+    for index in range(columns):
+        name = list(groups)[index % len(groups)]
+        frame[f"{name} {index}"] = groups[name]
+    return pd.DataFrame(frame)
+
+
+def to_bytes(frame: pd.DataFrame, file_format: str) -> bytes:
+    buffer = BytesIO()
+    if file_format == "csv":
+        frame.to_csv(buffer, index=False)
+    else:
+        frame.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+async def main(args):
+    quiet_logs()
+    from app.client.calls.file_parser import parse_call_file
+
+    rng = np.random.default_rng(args.seed)
+    print(f"format={args.format} columns={args.columns}")
+    for rows in args.rows:
+        contents = to_bytes(build_frame(rows, args.columns, rng), args.format)
+        with Timer() as timer:
+            columns = parse_call_file(contents, args.format)
+        cells = rows * args.columns
+        sample = {name: values[0] for name, values in list(columns.items())[:6]}
+        print(f"  {rows:>7,} rows: {rows / timer.elapsed:>10,.0f} rows/sec  {cells / timer.elapsed:>12,.0f} cells/sec  "
+              f"{timer.elapsed:7.2f}s")
+        print(f"           first row: {sample}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000], help="sheet lengths to parse")
+    parser.add_argument("--columns", type=int, default=40, help="sheet width")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,90 @@
+"""
+Storage size and encode/decode cost of the compressed transcript arrays.
+
+For every transcript array in the call_ended and call_analyzed payloads in
+notes/webhook_events/{Inbound,outbound}, compares the plain BSON array
+(the storage before compression) with the compressed binary written by
+`compress_json`. Encoding starts from the raw JSON slice, as the webhooks
+do; decoding goes all the way to Python lists, as the call detail view does.
+Other zlib levels are listed for comparison with the one the codec uses.
+
+    python -m benchmarks.transcript_codec
+    python -m benchmarks.transcript_codec --repeat 500 --levels 1 6 9
+"""
+import zlib
+import asyncio
+import argparse
+import bson
+import msgspec
+from pathlib import Path
+from benchmarks.common import load_env, quiet_logs, Timer
+
+load_env()
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "notes" / "webhook_events"
+EVENTS = ["call_ended", "call_analyzed"]
+
+
+def load_arrays() -> list[tuple[str, msgspec.Raw]]:
+    """(label, raw JSON slice) of every non-empty transcript array in the fixtures."""
+    from app.client.models import CallArtifactsModel
+    from app.client.calls.webhook_decoder import decode_webhook
+
+    arrays = []
+    for path in sorted(FIXTURES_DIR.glob("*/*.json")):
+        payload = decode_webhook(path.read_bytes())
+        if payload.event not in EVENTS:
+            continue
+        for field in CallArtifactsModel.FIELDS:
+            raw = getattr(payload.call, field)
+            if bytes(raw):
+                arrays.append((f"{path.parent.name}/{payload.event}.{field}", raw))
+    return arrays
+
+
+def per_call_us(timer: Timer, repeat: int) -> float:
+    return timer.elapsed / repeat * 1e6
+
+
+async def main(args):
+    quiet_logs()
+    from app.core.utils.compression import compress_json, decompress_json, ZLIB_LEVEL
+
+    totals = {"bson": 0, "compressed": 0}
+    print(f"{'array':<62} {'bson':>9} {'zlib-' + str(ZLIB_LEVEL):>9} {'ratio':>6} {'encode':>10} {'decode':>10}")
+    for label, raw in load_arrays():
+        plain = len(bson.encode({"value": msgspec.json.decode(raw)}))
+        compressed = len(bson.encode({"value": compress_json(raw)}))
+        totals["bson"] += plain
+        totals["compressed"] += compressed
+
+        with Timer() as encode:
+            for _ in range(args.repeat):
+                stored = compress_json(raw)
+        with Timer() as decode:
+            for _ in range(args.repeat):
+                decompress_json(stored)
+        print(f"{label:<62} {plain:>9,} {compressed:>9,} {plain / compressed:>5.1f}x "
+              f"{per_call_us(encode, args.repeat):>8.0f}us {per_call_us(decode, args.repeat):>8.0f}us")
+
+        others = []
+        for level in args.levels:
+            with Timer() as timer:
+                for _ in range(args.repeat):
+                    size = len(zlib.compress(bytes(raw), level))
+            others.append(f"level {level}: {size:,} B {per_call_us(timer, args.repeat):.0f}us")
+        print(f"{'':<62} {'; '.join(others)}")
+
+    print(f"total: {totals['bson']:,} B as BSON arrays, {totals['compressed']:,} B compressed "
+          f"({totals['bson'] / totals['compressed']:.1f}x smaller)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="encode/decode rounds per array")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 9], help="other zlib levels to compare")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,230 @@
+"""
+Replay captured Retell webhooks against the FastAPI app, in-process.
+
+Synthesizes distinct calls from the payloads in notes/webhook_events/{Inbound,outbound}
+by rewriting call_id, agent_id and timestamps, posts every event through an ASGI
+transport and reports events/sec, handler latency and bytes written per event.
+
+    python -m benchmarks.webhook_replay --calls 2000 --concurrency 50
+    python -m benchmarks.webhook_replay --calls 2000 --shuffle          # out-of-order arrival
+    python -m benchmarks.webhook_replay --mode queue                    # fast-ack + background workers
+    python -m benchmarks.webhook_replay --mongo-uri mongodb://localhost:27019
+
+Queue mode only shows its fast acks against a real server: the in-memory
+stand-in blocks the event loop on every operation, so acks wait for the workers.
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from benchmarks.common import load_env, quiet_logs, init_database, percentile, Timer
+
+load_env()
+
+import httpx  # noqa: E402
+from app.config.settings import settings  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "notes" / "webhook_events"
+EVENT_ORDER = ["call_started", "call_ended", "call_analyzed"]
+WEBHOOK_PATH = "/api/clientside/calls/retell/webhook"
+
+
+class CallTemplate:
+    """One captured call (three events) that can be re-issued under new identifiers."""
+
+    def __init__(self, directory: Path):
+        self.events: dict[str, bytes] = {}
+        for path in directory.glob("*.json"):
+            raw = path.read_bytes()
+            self.events[json.loads(raw)["event"]] = raw
+
+        call = json.loads(self.events["call_started"])["call"]
+        self.call_id = call["call_id"].encode()
+        self.agent_id = call["agent_id"].encode()
+        self.timestamps = sorted({
+            json.loads(raw)["call"].get(key)
+            for raw in self.events.values()
+            for key in ("start_timestamp", "end_timestamp")
+        } - {None})
+
+    def render(self, event: str, call_id: str, agent_id: str, shift_ms: int) -> bytes:
+        # Byte-level substitution keeps payload generation out of the measured cost
+        body = self.events[event]
+        body = body.replace(self.call_id, call_id.encode())
+        body = body.replace(self.agent_id, agent_id.encode())
+        for ts in self.timestamps:
+            body = body.replace(str(ts).encode(), str(ts + shift_ms).encode())
+        return body
+
+
+def load_templates() -> list[CallTemplate]:
+    return [CallTemplate(path) for path in sorted(FIXTURES_DIR.iterdir()) if path.is_dir()]
+
+
+async def seed_agents(count: int) -> list[str]:
+    from app.auth.models import UserModel
+    from app.client.models import AgentModel, ResponseEngineModel
+
+    user = UserModel(first_name="Bench", last_name="User", email="bench@example.com", password="bench")
+    await user.insert()
+    engine = ResponseEngineModel(user=user, engine_id="llm_bench")
+    await engine.insert()
+
+    agent_ids = []
+    for index in range(count):
+        agent = AgentModel(
+            user=user,
+            response_engine=engine,
+            agent_id=f"agent_bench_{index:04d}",
+            agent_name=f"bench-{index}",
+            voice_id="bench-voice",
+        )
+        await agent.insert()
+        agent_ids.append(agent.agent_id)
+    return agent_ids
+
+
+def build_plan(templates, agent_ids, calls: int, shuffle: bool, rng: random.Random):
+    """Return one (template, call_id, agent_id, shift, events) tuple per synthetic call."""
+    plan = []
+    for index in range(calls):
+        events = list(EVENT_ORDER)
+        if shuffle:
+            rng.shuffle(events)
+        plan.append((
+            templates[index % len(templates)],
+            f"call_bench_{index:07d}",
+            agent_ids[index % len(agent_ids)],
+            index * 1000,
+            events,
+        ))
+    return plan
+
+
+async def replay(client: httpx.AsyncClient, plan, concurrency: int):
+    latencies: list[float] = []
+    failures: list[str] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    async def worker():
+        while not queue.empty():
+            template, call_id, agent_id, shift, events = queue.get_nowait()
+            # Events of one call are sent sequentially, calls run concurrently
+            for event in events:
+                body = template.render(event, call_id, agent_id, shift)
+                start = time.perf_counter()
+                response = await client.post(WEBHOOK_PATH, content=body, headers={"content-type": "application/json"})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 300:
+                    failures.append(f"{call_id}/{event}: {response.status_code} {response.text[:120]}")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, failures
+
+
+async def wait_for_drain(timeout: float = 600):
+    from app.client.models import RetellWebhookEventModel
+    from app.core.constants.choices import WebhookEventStatusChoices
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        pending = await RetellWebhookEventModel.find(
+            RetellWebhookEventModel.status != WebhookEventStatusChoices.DEAD_LETTER
+        ).count()
+        if not pending:
+            return
+        await asyncio.sleep(0.05)
+    raise TimeoutError("Webhook queue did not drain")
+
+
+async def verify(calls: int) -> list[str]:
+    from app.client.models import CallModel
+    from app.core.constants.choices import CallStatusChoices
+
+    problems = []
+    stored = await CallModel.find_all().count()
+    if stored != calls:
+        problems.append(f"expected {calls} calls, found {stored}")
+    not_final = await CallModel.find(CallModel.call_status != CallStatusChoices.ENDED).count()
+    if not_final:
+        problems.append(f"{not_final} calls not in 'ended' state")
+    unanalyzed = await CallModel.find(CallModel.user_sentiment == None).count()  # noqa: E711
+    if unanalyzed:
+        problems.append(f"{unanalyzed} calls missing call_analysis fields")
+    return problems
+
+
+async def main(args):
+    quiet_logs()
+    database, meter = await init_database(args.mongo_uri, db_name="benchmark_webhook_replay")
+
+    from app.main import app
+    from app.client.calls.webhook_queue import retell_webhook_queue
+
+    rng = random.Random(args.seed)
+    templates = load_templates()
+    agent_ids = await seed_agents(args.agents)
+    plan = build_plan(templates, agent_ids, args.calls, args.shuffle, rng)
+    total_events = args.calls * len(EVENT_ORDER)
+
+    settings.RETELL_WEBHOOK_MODE = args.mode
+    # Every replayed event is distinct; keep Redis out of the measured path
+    settings.RETELL_WEBHOOK_DEDUP_ENABLED = False
+    if args.mode == "queue":
+        settings.RETELL_WEBHOOK_POLL_INTERVAL = 0.2
+        await retell_webhook_queue.start()
+
+    meter.reset()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with Timer() as ack_timer:
+            latencies, failures = await replay(client, plan, args.concurrency)
+        with Timer() as drain_timer:
+            if args.mode == "queue":
+                await wait_for_drain()
+                await retell_webhook_queue.stop()
+
+    problems = await verify(args.calls)
+    elapsed = ack_timer.elapsed + drain_timer.elapsed
+
+    print(f"mode={args.mode} shuffle={args.shuffle} calls={args.calls} events={total_events} "
+          f"concurrency={args.concurrency} store={'mongo' if args.mongo_uri else 'mongomock'}")
+    print(f"  events/sec (end to end) : {total_events / elapsed:,.1f}")
+    if args.mode == "queue":
+        print(f"  events/sec (ack only)   : {total_events / ack_timer.elapsed:,.1f}")
+        print(f"  queue drain time        : {drain_timer.elapsed:.2f}s")
+    print(f"  handler latency p50     : {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"  handler latency p99     : {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  bytes written / event   : {meter.bytes_written / total_events:,.0f} B")
+    print(f"  write ops / event       : {meter.write_ops / total_events:.2f}")
+    print(f"  non-2xx responses       : {len(failures)}")
+    for failure in failures[:5]:
+        print(f"    {failure}")
+    print(f"  consistency             : {'ok' if not problems else '; '.join(problems)}")
+    if args.mode == "queue" and not args.mongo_uri:
+        print("  note: mongomock runs every operation synchronously on the event loop, so the")
+        print("        workers drain the queue in between acks and the ack latency matches inline")
+        print("        mode; pass --mongo-uri to measure the fast-ack benefit")
+
+    if args.mongo_uri:
+        await database.client.drop_database(database.name)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000, help="synthetic calls to replay (3 events each)")
+    parser.add_argument("--agents", type=int, default=10, help="distinct agents the calls are spread over")
+    parser.add_argument("--concurrency", type=int, default=20, help="calls in flight at once")
+    parser.add_argument("--shuffle", action="store_true", help="shuffle event order within each call")
+    parser.add_argument("--mode", choices=["inline", "queue"], default="inline", help="webhook ingestion mode")
+    parser.add_argument("--mongo-uri", default=None, help="real MongoDB to use instead of the in-memory stand-in")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))